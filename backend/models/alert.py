@@ -16,6 +16,7 @@ class Alert(BaseModel):
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     last_checked: Optional[datetime] = None
     triggered_at: Optional[datetime] = None
+    trigger: Optional[dict] = None  # Oferta que atingiu o alvo (price, offer_id, supermarket_id, city_id)
 
 
 class AlertCreate(BaseModel):
@@ -30,4 +31,6 @@ class AlertResponse(BaseModel):
     target_price: float
     active: bool
     created_at: datetime
+    triggered_at: Optional[datetime] = None
+    trigger: Optional[dict] = None
     product: Optional[dict] = None
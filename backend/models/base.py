@@ -0,0 +1,29 @@
+from pydantic import BaseModel
+from typing import Any, Optional, Union
+from datetime import datetime, timezone
+
+
+def as_utc(value: Union[datetime, str, None]) -> Optional[datetime]:
+    """Converte datas (BSON date, naive ou ISO string legada) para datetime UTC"""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def _normalize_datetimes(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return as_utc(value)
+    if isinstance(value, dict):
+        return {k: _normalize_datetimes(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_normalize_datetimes(v) for v in value]
+    return value
+
+
+def to_document(model: BaseModel) -> dict:
+    """Serializa um modelo para o MongoDB mantendo datas como BSON date em UTC"""
+    return _normalize_datetimes(model.model_dump())
@@ -0,0 +1,73 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional
+
+
+# Itens por lista (listas típicas têm 30–80 itens)
+MAX_BASKET_ITEMS = 200
+# Lojas por divisão da lista
+MAX_SPLIT_STORES = 5
+
+
+class BasketItem(BaseModel):
+    product_id: str
+    quantity: int = Field(1, ge=1, le=999)
+
+
+class BasketRequest(BaseModel):
+    city_id: str
+    items: List[BasketItem] = Field(min_length=1, max_length=MAX_BASKET_ITEMS)
+
+
+class BasketSplitRequest(BasketRequest):
+    max_stores: int = Field(2, ge=1, le=MAX_SPLIT_STORES)
+    visit_cost: float = Field(0.0, ge=0)  # Custo por loja visitada (deslocamento, tempo)
+
+
+class BasketLine(BaseModel):
+    product_id: str
+    quantity: int
+    unit_price: float
+    subtotal: float
+    is_promotion: bool = False
+    offer_id: Optional[str] = None
+
+
+class BasketStore(BaseModel):
+    supermarket: dict
+    total: float
+    items_found: int
+    missing: List[str]  # product_ids sem oferta atual neste supermercado
+    complete: bool
+
+
+class BasketCheapestStore(BasketStore):
+    items: List[BasketLine]
+
+
+class BasketOptimizeResponse(BaseModel):
+    city_id: str
+    items: int
+    unavailable: List[str]  # product_ids sem oferta em nenhum supermercado da cidade
+    cheapest_store: Optional[BasketCheapestStore] = None
+    stores: List[BasketStore]
+
+
+class BasketSplitStore(BaseModel):
+    supermarket: dict
+    subtotal: float
+    items: List[BasketLine]
+
+
+class BasketSplitResponse(BaseModel):
+    city_id: str
+    items: int
+    max_stores: int
+    visit_cost: float
+    method: str  # exact | heuristic
+    items_total: float
+    visits_total: float
+    total: float
+    savings: Optional[float] = None  # Contra a loja única mais barata com todos os itens
+    unavailable: List[str]
+    missing: List[str]  # Disponíveis na cidade, mas fora das lojas escolhidas
+    stores: List[BasketSplitStore]
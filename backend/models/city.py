@@ -6,7 +6,7 @@ import uuid
 
 class Location(BaseModel):
     type: str = "Point"
-    coordinates: List[float]  # [latitude, longitude]
+    coordinates: List[float]  # [longitude, latitude] (ordem GeoJSON)
 
 
 class City(BaseModel):
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, ConfigDict
-from typing import Optional
+from typing import List, Literal, Optional
 from datetime import datetime, timezone, timedelta
 import uuid
 
@@ -46,3 +46,32 @@ class OfferResponse(BaseModel):
     is_promotion: bool
     stock_status: str
     supermarket: Optional[dict] = None
+
+
+class OfferIngest(BaseModel):
+    """Linha da ingestão em lote (scrapers e feeds de parceiros)"""
+    model_config = ConfigDict(extra="ignore")
+    
+    product_id: str
+    supermarket_id: str
+    price: float = Field(gt=0)
+    unit_price: Optional[float] = Field(None, gt=0)
+    source: Literal["scraping", "api"] = "scraping"
+    collected_at: datetime  # Obrigatório: compõe o id determinístico (reenvios não duplicam)
+    expires_at: Optional[datetime] = None
+    is_promotion: bool = False
+    stock_status: Literal["available", "low", "out_of_stock"] = "available"
+
+
+class IngestError(BaseModel):
+    row: int
+    error: str
+
+
+class BulkIngestResponse(BaseModel):
+    received: int
+    inserted: int
+    duplicates: int
+    rejected: int
+    errors: List[IngestError]
+    errors_truncated: bool = False
@@ -20,6 +20,8 @@ class Product(BaseModel):
     synonyms: List[str] = Field(default_factory=list)
     variants: List[str] = Field(default_factory=list)
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    # Lido pelo refresh incremental do índice de busca: atualize a cada alteração do produto
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 
 class ProductCreate(BaseModel):
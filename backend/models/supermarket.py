@@ -14,7 +14,7 @@ class Address(BaseModel):
 
 class Location(BaseModel):
     type: str = "Point"
-    coordinates: List[float]  # [latitude, longitude]
+    coordinates: List[float]  # [longitude, latitude] (ordem GeoJSON)
 
 
 class Contact(BaseModel):
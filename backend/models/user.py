@@ -26,7 +26,7 @@ class User(UserBase):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     password_hash: str
     reputation_score: int = 0
-    role: str = "user"  # user | moderator | admin
+    role: str = "user"  # user | moderator | admin | partner (ingestão em lote)
     favorites: dict = Field(default_factory=lambda: {"products": [], "supermarkets": []})
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
@@ -39,6 +39,13 @@ class UserResponse(UserBase):
     created_at: datetime
 
 
+class Principal(BaseModel):
+    """Identidade mínima do usuário autenticado (pode vir só das claims do token)"""
+    id: str
+    role: str = "user"
+    city_id: Optional[str] = None
+
+
 class TokenResponse(BaseModel):
     access_token: str
     token_type: str = "bearer"
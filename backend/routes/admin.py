@@ -0,0 +1,37 @@
+from fastapi import APIRouter, HTTPException, Depends
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from models.user import User
+from routes.auth import get_current_user
+from services.auth_service import password_hasher
+from services.scheduler import scheduler
+
+router = APIRouter(prefix="/admin", tags=["Admin"])
+
+
+async def require_admin(current_user: User = Depends(get_current_user)) -> User:
+    # Perfil lido do banco: um token com claims embutidas manteria o perfil antigo por 7 dias
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Admin only")
+    return current_user
+
+
+@router.get("/jobs")
+async def get_jobs(current_user: User = Depends(require_admin)):
+    """Métricas deste worker: jobs periódicos e fila do bcrypt (profundidade e rejeições)"""
+    return {**scheduler.stats(), "password_hasher": password_hasher.stats()}
+
+
+@router.post("/jobs/{job_name}/run")
+async def run_job(job_name: str, current_user: User = Depends(require_admin)):
+    """Executa um job imediatamente (respeita o lease entre workers)"""
+    if job_name not in scheduler.jobs:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    if not scheduler.started:
+        raise HTTPException(status_code=503, detail="Scheduler not running")
+    
+    await scheduler.run_now(job_name)
+    return scheduler.jobs[job_name].stats()
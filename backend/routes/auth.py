@@ -4,21 +4,19 @@ import sys
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from models.user import UserCreate, UserLogin, User, UserResponse, TokenResponse
-from services.auth_service import get_password_hash, verify_password, create_access_token, decode_token
-from motor.motor_asyncio import AsyncIOMotorClient
-import os
+from models.user import UserCreate, UserLogin, User, UserResponse, TokenResponse, Principal
+from models.base import to_document
+from services.auth_service import (
+    create_access_token, decode_token, password_hasher, PasswordHasherBusy,
+    user_cache, EMBED_TOKEN_CLAIMS
+)
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from services.database import get_db
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
-# Database
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
 
-
-async def get_current_user(authorization: Optional[str] = Header(None)) -> User:
-    """Dependency para obter usuário autenticado"""
+def _decode_bearer(authorization: Optional[str]) -> dict:
     if not authorization or not authorization.startswith("Bearer "):
         raise HTTPException(status_code=401, detail="Not authenticated")
     
@@ -28,17 +26,58 @@ async def get_current_user(authorization: Optional[str] = Header(None)) -> User:
     if not payload:
         raise HTTPException(status_code=401, detail="Invalid token")
     
-    user_id = payload.get("sub")
+    return payload
+
+
+async def _load_user(user_id: str, db: AsyncIOMotorDatabase) -> User:
+    """Busca o usuário no cache TTL e, em caso de miss, no banco"""
+    user = user_cache.get(user_id)
+    if user is not None:
+        return user
+    
     user_doc = await db.users.find_one({"id": user_id}, {"_id": 0})
     
     if not user_doc:
         raise HTTPException(status_code=401, detail="User not found")
     
-    return User(**user_doc)
+    user = User(**user_doc)
+    user_cache.set(user_id, user)
+    return user
+
+
+def _issue_token(user: User) -> str:
+    claims = {"sub": user.id}
+    if EMBED_TOKEN_CLAIMS:
+        claims.update({"role": user.role, "city_id": user.city_id})
+    return create_access_token(claims)
+
+
+async def get_current_user(
+    authorization: Optional[str] = Header(None),
+    db: AsyncIOMotorDatabase = Depends(get_db)
+) -> User:
+    """Dependency para obter usuário autenticado"""
+    payload = _decode_bearer(authorization)
+    return await _load_user(payload.get("sub"), db)
+
+
+async def get_current_principal(
+    authorization: Optional[str] = Header(None),
+    db: AsyncIOMotorDatabase = Depends(get_db)
+) -> Principal:
+    """Dependency leve para endpoints que só precisam da identidade do usuário"""
+    payload = _decode_bearer(authorization)
+    
+    # Token com claims embutidas dispensa qualquer consulta
+    if "role" in payload:
+        return Principal(id=payload["sub"], role=payload["role"], city_id=payload.get("city_id"))
+    
+    user = await _load_user(payload.get("sub"), db)
+    return Principal(id=user.id, role=user.role, city_id=user.city_id)
 
 
 @router.post("/register", response_model=TokenResponse)
-async def register(user_data: UserCreate):
+async def register(user_data: UserCreate, db: AsyncIOMotorDatabase = Depends(get_db)):
     """Registra um novo usuário"""
     # Verificar se email já existe
     existing = await db.users.find_one({"email": user_data.email})
@@ -47,16 +86,18 @@ async def register(user_data: UserCreate):
     
     # Criar usuário
     user_dict = user_data.model_dump(exclude={"password"})
-    user_dict["password_hash"] = get_password_hash(user_data.password)
+    try:
+        user_dict["password_hash"] = await password_hasher.hash(user_data.password)
+    except PasswordHasherBusy:
+        raise HTTPException(status_code=503, detail="Server busy, try again")
     
     user = User(**user_dict)
-    user_doc = user.model_dump()
-    user_doc["created_at"] = user_doc["created_at"].isoformat()
+    user_doc = to_document(user)
     
     await db.users.insert_one(user_doc)
     
     # Criar token
-    access_token = create_access_token({"sub": user.id})
+    access_token = _issue_token(user)
     
     return TokenResponse(
         access_token=access_token,
@@ -65,7 +106,7 @@ async def register(user_data: UserCreate):
 
 
 @router.post("/login", response_model=TokenResponse)
-async def login(credentials: UserLogin):
+async def login(credentials: UserLogin, db: AsyncIOMotorDatabase = Depends(get_db)):
     """Faz login de um usuário"""
     user_doc = await db.users.find_one({"email": credentials.email}, {"_id": 0})
     
@@ -74,11 +115,22 @@ async def login(credentials: UserLogin):
     
     user = User(**user_doc)
     
-    if not verify_password(credentials.password, user.password_hash):
+    try:
+        valid, new_hash = await password_hasher.verify_and_update(credentials.password, user.password_hash)
+    except PasswordHasherBusy:
+        raise HTTPException(status_code=503, detail="Server busy, try again")
+    
+    if not valid:
         raise HTTPException(status_code=401, detail="Invalid credentials")
     
+    # Rehash quando o custo do bcrypt mudou
+    if new_hash:
+        await db.users.update_one({"id": user.id}, {"$set": {"password_hash": new_hash}})
+        user.password_hash = new_hash
+        user_cache.invalidate(user.id)
+    
     # Criar token
-    access_token = create_access_token({"sub": user.id})
+    access_token = _issue_token(user)
     
     return TokenResponse(
         access_token=access_token,
@@ -0,0 +1,34 @@
+from fastapi import APIRouter, Depends
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from models.basket import BasketRequest, BasketOptimizeResponse, BasketSplitRequest, BasketSplitResponse
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from services.database import get_db
+from services.basket import merge_items, build_price_matrix, optimize_single_store, optimize_split
+from services.supermarket_directory import supermarket_directory
+
+router = APIRouter(prefix="/baskets", tags=["Baskets"])
+
+
+@router.post("/optimize", response_model=BasketOptimizeResponse)
+async def optimize_basket(
+    basket: BasketRequest,
+    db: AsyncIOMotorDatabase = Depends(get_db)
+):
+    """Custo da lista inteira em cada supermercado da cidade e o mais barato (uma consulta)"""
+    directory = await supermarket_directory.get(db, basket.city_id)
+    matrix = await build_price_matrix(db, merge_items(basket.items), basket.city_id, directory.ids)
+    return optimize_single_store(matrix, directory, basket.city_id)
+
+
+@router.post("/split", response_model=BasketSplitResponse)
+async def split_basket(
+    basket: BasketSplitRequest,
+    db: AsyncIOMotorDatabase = Depends(get_db)
+):
+    """Menor custo comprando a lista em até max_stores supermercados (com custo por visita)"""
+    directory = await supermarket_directory.get(db, basket.city_id)
+    matrix = await build_price_matrix(db, merge_items(basket.items), basket.city_id, directory.ids)
+    return optimize_split(matrix, directory, basket.city_id, basket.max_stores, basket.visit_cost)
@@ -1,41 +1,46 @@
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, Query, Depends, HTTPException, Response
 from typing import List, Optional
 import sys
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from models.city import City, CityResponse
-from motor.motor_asyncio import AsyncIOMotorClient
-import os
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from services.database import get_db
+from services.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, find_page, set_next_cursor
 
 router = APIRouter(prefix="/cities", tags=["Cities"])
 
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
-
 
 @router.get("", response_model=List[CityResponse])
 async def get_cities(
-    search: Optional[str] = Query(None, description="Buscar por nome da cidade")
+    response: Response,
+    search: Optional[str] = Query(None, description="Buscar por nome da cidade"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Itens por página"),
+    cursor: Optional[str] = Query(None, description="Valor de X-Next-Cursor da página anterior"),
+    db: AsyncIOMotorDatabase = Depends(get_db)
 ):
-    """Lista ou busca cidades"""
+    """Lista ou busca cidades (ordem alfabética, paginada por cursor)"""
     query = {"active": True}
     
     if search:
         query["name"] = {"$regex": search, "$options": "i"}
     
-    cities = await db.cities.find(query, {"_id": 0}).to_list(100)
-    return [CityResponse(**city) for city in cities]
+    try:
+        page = await find_page(db.cities, query, [("name", 1), ("id", 1)], limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    set_next_cursor(response, page.next_cursor)
+    return [CityResponse(**city) for city in page.items]
 
 
 @router.get("/{city_id}", response_model=CityResponse)
-async def get_city(city_id: str):
+async def get_city(city_id: str, db: AsyncIOMotorDatabase = Depends(get_db)):
     """Busca cidade por ID"""
     city = await db.cities.find_one({"id": city_id}, {"_id": 0})
     
     if not city:
-        from fastapi import HTTPException
         raise HTTPException(status_code=404, detail="City not found")
     
     return CityResponse(**city)
@@ -1,82 +1,125 @@
-from fastapi import APIRouter, Query, HTTPException, Depends
+from fastapi import APIRouter, Query, HTTPException, Depends, Request, Response
+from fastapi.responses import StreamingResponse
 from typing import List, Optional
 import sys
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from models.offer import Offer, OfferCreate, OfferResponse
-from models.user import User
-from routes.auth import get_current_user
-from motor.motor_asyncio import AsyncIOMotorClient
+from models.offer import Offer, OfferCreate, OfferResponse, BulkIngestResponse
+from models.base import as_utc, to_document
+from models.user import Principal, User
+from routes.auth import get_current_principal, get_current_user
+from services.auth_service import user_cache
+from services.price_view import refresh_for_offers
+from services.price_rollup import record_offers
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from services.database import get_db
+from services.geo import parse_near, attach_distances
+from services.supermarket_directory import supermarket_directory
+from services.response_cache import response_cache
+from services.offer_ingest import ingest_json, ingest_ndjson
+from services.pagination import (
+    DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, NDJSON_MEDIA_TYPE, STREAM_BATCH_SIZE,
+    after_cursor, find_page, ndjson_lines, set_next_cursor
+)
 from datetime import datetime, timezone, timedelta
-import os
 
 router = APIRouter(prefix="/offers", tags=["Offers"])
 
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+# Perfis autorizados a usar a ingestão em lote
+INGEST_ROLES = {"admin", "partner"}
+
+
+# Preço crescente; id desempata para o cursor ser estável
+OFFER_SORT = [("price", 1), ("id", 1)]
+
+
+def _offer_response(offer: dict, supermarket_map: dict, now: datetime) -> OfferResponse:
+    """Oferta enriquecida com os dados do supermercado"""
+    collected_at = as_utc(offer["collected_at"])
+    supermarket = supermarket_map.get(offer["supermarket_id"])
+    
+    return OfferResponse(
+        id=offer["id"],
+        product_id=offer["product_id"],
+        supermarket_id=offer["supermarket_id"],
+        price=offer["price"],
+        collected_at=collected_at,
+        hours_ago=int((now - collected_at).total_seconds() / 3600),
+        is_promotion=offer.get("is_promotion", False),
+        stock_status=offer.get("stock_status", "available"),
+        supermarket={
+            "id": supermarket["id"],
+            "name": supermarket["name"],
+            "address": supermarket["address"],
+            "distance_km": supermarket.get("distance_km", 0)
+        } if supermarket else None
+    )
 
 
 @router.get("", response_model=List[OfferResponse])
 async def get_offers(
+    response: Response,
     product_id: str = Query(..., description="ID do produto"),
-    city_id: str = Query(..., description="ID da cidade")
+    city_id: str = Query(..., description="ID da cidade"),
+    near: Optional[str] = Query(None, description="Ponto de referência no formato lat,lon"),
+    radius_km: Optional[float] = Query(None, gt=0, description="Raio máximo a partir de near"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Itens por página"),
+    cursor: Optional[str] = Query(None, description="Valor de X-Next-Cursor da página anterior"),
+    format: str = Query("json", pattern="^(json|ndjson)$", description="ndjson: todas as ofertas em streaming"),
+    db: AsyncIOMotorDatabase = Depends(get_db)
 ):
-    """Lista ofertas de um produto em uma cidade"""
-    # Buscar supermercados da cidade
-    supermarkets = await db.supermarkets.find(
-        {"city_id": city_id}, 
-        {"_id": 0}
-    ).to_list(100)
-    supermarket_ids = [s["id"] for s in supermarkets]
-    supermarket_map = {s["id"]: s for s in supermarkets}
+    """Lista ofertas de um produto em uma cidade (paginada por cursor ou em NDJSON)"""
+    point = None
+    if near:
+        try:
+            point = parse_near(near)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    elif radius_km is not None:
+        raise HTTPException(status_code=400, detail="radius_km requires near")
     
-    # Buscar ofertas recentes (últimos 7 dias)
-    seven_days_ago = datetime.now(timezone.utc) - timedelta(days=7)
+    # Supermercados da cidade (diretório em cache; com near, filtrados pelo raio)
+    directory = await supermarket_directory.get(db, city_id)
+    supermarket_map = directory.supermarkets
+    supermarket_ids = list(directory.ids)
+    if point:
+        nearby = attach_distances(supermarket_map.values(), *point, radius_km)
+        supermarket_map = {s["id"]: s for s in nearby}
+        supermarket_ids = list(supermarket_map)
     
-    offers = await db.offers.find(
-        {
-            "product_id": product_id,
-            "supermarket_id": {"$in": supermarket_ids},
-            "collected_at": {"$gte": seven_days_ago.isoformat()}
-        },
-        {"_id": 0}
-    ).sort("price", 1).to_list(100)
+    # Ofertas recentes (últimos 7 dias)
+    now = datetime.now(timezone.utc)
+    query = {
+        "product_id": product_id,
+        "supermarket_id": {"$in": supermarket_ids},
+        "collected_at": {"$gte": now - timedelta(days=7)}
+    }
     
-    # Enriquecer com dados do supermercado
-    results = []
-    for offer in offers:
-        collected_at = datetime.fromisoformat(offer["collected_at"])
-        hours_ago = int((datetime.now(timezone.utc) - collected_at).total_seconds() / 3600)
-        
-        supermarket = supermarket_map.get(offer["supermarket_id"])
+    try:
+        if format == "ndjson":
+            # Exportação completa: lê o cursor do Motor em lotes, sem montar a lista
+            rows = db.offers.find(
+                after_cursor(query, OFFER_SORT, cursor), {"_id": 0}
+            ).sort(OFFER_SORT).batch_size(STREAM_BATCH_SIZE)
+            return StreamingResponse(
+                ndjson_lines(rows, lambda offer: _offer_response(offer, supermarket_map, now)),
+                media_type=NDJSON_MEDIA_TYPE
+            )
         
-        offer_response = OfferResponse(
-            id=offer["id"],
-            product_id=offer["product_id"],
-            supermarket_id=offer["supermarket_id"],
-            price=offer["price"],
-            collected_at=collected_at,
-            hours_ago=hours_ago,
-            is_promotion=offer.get("is_promotion", False),
-            stock_status=offer.get("stock_status", "available"),
-            supermarket={
-                "id": supermarket["id"],
-                "name": supermarket["name"],
-                "address": supermarket["address"],
-                "distance_km": 0  # Mock por enquanto
-            } if supermarket else None
-        )
-        results.append(offer_response)
+        page = await find_page(db.offers, query, OFFER_SORT, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
-    return results
+    set_next_cursor(response, page.next_cursor)
+    return [_offer_response(offer, supermarket_map, now) for offer in page.items]
 
 
 @router.post("", response_model=OfferResponse)
 async def create_offer(
     offer_data: OfferCreate,
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncIOMotorDatabase = Depends(get_db)
 ):
     """Cria uma nova oferta (crowdsourcing)"""
     # Verificar se produto existe
@@ -100,17 +143,22 @@ async def create_offer(
     }
     
     offer = Offer(**offer_dict)
-    offer_doc = offer.model_dump()
-    offer_doc["collected_at"] = offer_doc["collected_at"].isoformat()
-    offer_doc["expires_at"] = offer_doc["expires_at"].isoformat()
+    offer_doc = to_document(offer)
     
     await db.offers.insert_one(offer_doc)
     
+    # Atualizar a visão materializada de melhores preços, os agregados diários/semanais
+    # e descartar as buscas em cache (que trazem a melhor oferta)
+    await refresh_for_offers(db, [offer_doc])
+    await record_offers(db, [offer_doc])
+    await response_cache.invalidate("prices")
+    
     # Atualizar reputação do usuário (+10 pontos)
     await db.users.update_one(
         {"id": current_user.id},
         {"$inc": {"reputation_score": 10}}
     )
+    user_cache.invalidate(current_user.id)
     
     return OfferResponse(
         id=offer.id,
@@ -122,3 +170,24 @@ async def create_offer(
         is_promotion=offer.is_promotion,
         stock_status=offer.stock_status
     )
+
+
+@router.post("/bulk", response_model=BulkIngestResponse)
+async def ingest_offers(
+    request: Request,
+    # Perfil lido do banco: um token com claims embutidas manteria o perfil antigo por 7 dias
+    current_user: User = Depends(get_current_user),
+    db: AsyncIOMotorDatabase = Depends(get_db)
+):
+    """Ingestão em lote (scrapers/feeds): array JSON ou NDJSON, com erros por linha"""
+    if current_user.role not in INGEST_ROLES:
+        raise HTTPException(status_code=403, detail="Not allowed to ingest offers")
+    
+    content_type = request.headers.get("content-type", "")
+    try:
+        if "ndjson" in content_type:
+            # Processado conforme o corpo chega: envios grandes não ficam inteiros em memória
+            return await ingest_ndjson(db, current_user.id, request.stream())
+        return await ingest_json(db, current_user.id, await request.body())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
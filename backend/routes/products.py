@@ -1,4 +1,5 @@
-from fastapi import APIRouter, Query, HTTPException
+from fastapi import APIRouter, Query, HTTPException, Depends, Response
+from fastapi.responses import StreamingResponse
 from typing import List, Optional
 import sys
 from pathlib import Path
@@ -6,91 +7,93 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from models.product import Product, ProductResponse
 from services.search_service import normalize_text
-from motor.motor_asyncio import AsyncIOMotorClient
+from services.search_index import product_index
+from services.offer_service import attach_best_offers
+from services.price_view import (
+    best_prices_marker, find_city_best_prices, find_live_best_prices, find_nearby_best_prices
+)
+from services.geo import parse_near, attach_distances
+from services.supermarket_directory import supermarket_directory
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from services.database import get_db
+from services.offer_archive import HISTORY_COLLECTION
+from services.price_rollup import choose_resolution, find_rollups, rollups_marker
+from services.pagination import (
+    NDJSON_MEDIA_TYPE, STREAM_BATCH_SIZE,
+    after_cursor, merge_sorted, ndjson_lines, paginate_sorted, set_next_cursor
+)
 from datetime import datetime, timedelta, timezone
-import os
+import asyncio
+import heapq
 
 router = APIRouter(prefix="/products", tags=["Products"])
 
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+# Histórico raw: ordem cronológica; id desempata para o cursor ser estável
+HISTORY_SORT = [("collected_at", 1), ("id", 1)]
+HISTORY_PAGE_SIZE = 1000
+HISTORY_MAX_PAGE_SIZE = 5000
 
 
 @router.get("/search", response_model=List[ProductResponse])
 async def search_products(
     q: str = Query(..., description="Query de busca"),
-    city_id: str = Query(..., description="ID da cidade")
+    city_id: str = Query(..., description="ID da cidade"),
+    near: Optional[str] = Query(None, description="Ponto de referência no formato lat,lon"),
+    radius_km: Optional[float] = Query(None, gt=0, description="Considerar só supermercados neste raio"),
+    db: AsyncIOMotorDatabase = Depends(get_db)
 ):
     """Busca produtos por nome"""
-    normalized = normalize_text(q)
-    
-    # Buscar produtos que contenham a query normalizada
-    products = await db.products.find({
-        "$or": [
-            {"canonical_name": {"$regex": normalized, "$options": "i"}},
-            {"display_name": {"$regex": q, "$options": "i"}},
-            {"brand": {"$regex": q, "$options": "i"}},
-            {"synonyms": {"$in": [normalized]}}
-        ]
-    }, {"_id": 0}).limit(20).to_list(20)
+    point = None
+    if near:
+        try:
+            point = parse_near(near)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    elif radius_km is not None:
+        raise HTTPException(status_code=400, detail="radius_km requires near")
+    
+    if product_index.ready:
+        # Índice invertido em memória: candidatos ranqueados sem consultar o MongoDB
+        products = product_index.search(q, limit=20)
+    else:
+        # Fallback enquanto o índice não foi construído
+        normalized = normalize_text(q)
+        products = await db.products.find({
+            "$or": [
+                {"canonical_name": {"$regex": normalized, "$options": "i"}},
+                {"display_name": {"$regex": q, "$options": "i"}},
+                {"brand": {"$regex": q, "$options": "i"}},
+                {"synonyms": {"$in": [normalized]}}
+            ]
+        }, {"_id": 0}).limit(20).to_list(20)
     
     if not products:
         return []
     
-    # Obter supermercados da cidade
-    supermarkets = await db.supermarkets.find(
-        {"city_id": city_id}, 
-        {"_id": 0, "id": 1}
-    ).to_list(100)
-    supermarket_ids = [s["id"] for s in supermarkets]
-    
-    # Para cada produto, buscar a melhor oferta
-    results = []
-    for product in products:
-        # Buscar melhor oferta (menor preço) nos últimos 7 dias
-        seven_days_ago = datetime.now(timezone.utc) - timedelta(days=7)
-        
-        best_offer = await db.offers.find(
-            {
-                "product_id": product["id"],
-                "supermarket_id": {"$in": supermarket_ids},
-                "collected_at": {"$gte": seven_days_ago.isoformat()}
-            },
-            {"_id": 0}
-        ).sort("price", 1).limit(1).to_list(1)  # Ordenar por preço crescente e pegar o primeiro
-        
-        if best_offer:
-            best_offer = best_offer[0]
-        
-        if best_offer:
-            # Buscar dados do supermercado
-            supermarket = await db.supermarkets.find_one(
-                {"id": best_offer["supermarket_id"]},
-                {"_id": 0, "id": 1, "name": 1, "location": 1}
-            )
-            
-            # Calcular horas atrás
-            collected_at = datetime.fromisoformat(best_offer["collected_at"])
-            hours_ago = int((datetime.now(timezone.utc) - collected_at).total_seconds() / 3600)
-            
-            product["best_offer"] = {
-                "price": best_offer["price"],
-                "is_promotion": best_offer.get("is_promotion", False),
-                "hours_ago": hours_ago,
-                "supermarket": {
-                    "id": supermarket["id"],
-                    "name": supermarket["name"],
-                    "distance_km": 0  # Mock por enquanto
-                }
-            }
-            results.append(ProductResponse(**product))
+    # Supermercados da cidade (id, nome e localização em um único mapa, em cache)
+    supermarket_map = (await supermarket_directory.get(db, city_id)).supermarkets
+    if point:
+        nearby = attach_distances(supermarket_map.values(), *point, radius_km)
+        supermarket_map = {s["id"]: s for s in nearby}
+    
+    # Melhor oferta (menor preço) dos últimos 7 dias, lida da visão materializada
+    product_ids = [p["id"] for p in products]
+    if not await best_prices_marker.is_built(db):
+        # Primeira construção da visão ainda em andamento (job best_prices_bootstrap)
+        best_prices = await find_live_best_prices(db, product_ids, supermarket_map)
+    elif point and radius_km is not None:
+        # "Mais barato a até N km": visões por supermercado dos que estão no raio
+        best_prices = await find_nearby_best_prices(db, product_ids, city_id, supermarket_map)
+    else:
+        best_prices = await find_city_best_prices(db, product_ids, city_id)
+    best_offers = {product_id: doc["best_offer"] for product_id, doc in best_prices.items()}
     
-    return results
+    products = attach_best_offers(products, best_offers, supermarket_map)
+    return [ProductResponse(**product) for product in products]
 
 
 @router.get("/{product_id}", response_model=ProductResponse)
-async def get_product(product_id: str):
+async def get_product(product_id: str, db: AsyncIOMotorDatabase = Depends(get_db)):
     """Busca produto por ID"""
     product = await db.products.find_one({"id": product_id}, {"_id": 0})
     
@@ -102,9 +105,19 @@ async def get_product(product_id: str):
 
 @router.get("/{product_id}/history")
 async def get_product_history(
+    response: Response,
     product_id: str,
     city_id: str = Query(..., description="ID da cidade"),
-    days: int = Query(30, description="Número de dias de histórico")
+    days: int = Query(30, ge=1, description="Número de dias de histórico"),
+    resolution: Optional[str] = Query(
+        None,
+        pattern="^(raw|daily|weekly)$",
+        description="raw, daily ou weekly (padrão: escolhida a partir de days)"
+    ),
+    limit: int = Query(HISTORY_PAGE_SIZE, ge=1, le=HISTORY_MAX_PAGE_SIZE, description="Pontos por página (raw)"),
+    cursor: Optional[str] = Query(None, description="Valor de X-Next-Cursor da página anterior (raw)"),
+    format: str = Query("json", pattern="^(json|ndjson)$", description="ndjson: histórico raw completo em streaming"),
+    db: AsyncIOMotorDatabase = Depends(get_db)
 ):
     """Retorna histórico de preços do produto"""
     product = await db.products.find_one({"id": product_id}, {"_id": 0})
@@ -112,37 +125,79 @@ async def get_product_history(
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
     
-    # Buscar supermercados da cidade
-    supermarkets = await db.supermarkets.find(
-        {"city_id": city_id}, 
-        {"_id": 0, "id": 1, "name": 1}
-    ).to_list(100)
-    supermarket_ids = [s["id"] for s in supermarkets]
-    supermarket_map = {s["id"]: s["name"] for s in supermarkets}
+    # Supermercados da cidade (diretório em cache)
+    directory = await supermarket_directory.get(db, city_id)
+    supermarket_ids = list(directory.ids)
     
     # Buscar ofertas dos últimos N dias
     since_date = datetime.now(timezone.utc) - timedelta(days=days)
+    resolution = resolution or choose_resolution(days)
+    if format == "ndjson":
+        resolution = "raw"
+    elif resolution != "raw" and not await rollups_marker.is_built(db):
+        # Agregados ainda não construídos (job rollup_bootstrap): lê as ofertas direto
+        resolution = "raw"
+    
+    if resolution != "raw":
+        # Agregados pré-calculados: o custo não cresce com o número de ofertas
+        rollups = await find_rollups(db, product_id, supermarket_ids, since_date, resolution)
+        history = [
+            {
+                "date": point["period_start"],
+                "price": round(point["sum"] / point["count"], 2),
+                "min_price": point["min"],
+                "max_price": point["max"],
+                "offer_count": point["count"],
+                "supermarket_id": point["supermarket_id"],
+                "supermarket_name": directory.name_of(point["supermarket_id"])
+            }
+            for point in rollups
+        ]
+        return {
+            "product": ProductResponse(**product),
+            "resolution": resolution,
+            "history": history
+        }
+    
+    # Ofertas expiradas ficam em offers_history; as atuais, em offers
+    query = {
+        "product_id": product_id,
+        "supermarket_id": {"$in": supermarket_ids},
+        "collected_at": {"$gte": since_date}
+    }
     
-    offers = await db.offers.find(
-        {
-            "product_id": product_id,
-            "supermarket_id": {"$in": supermarket_ids},
-            "collected_at": {"$gte": since_date.isoformat()}
-        },
-        {"_id": 0}
-    ).sort("collected_at", 1).to_list(1000)
-    
-    # Agrupar por data e supermercado
-    history = []
-    for offer in offers:
-        history.append({
+    def to_point(offer: dict) -> dict:
+        return {
             "date": offer["collected_at"],
             "price": offer["price"],
             "supermarket_id": offer["supermarket_id"],
-            "supermarket_name": supermarket_map.get(offer["supermarket_id"], "Desconhecido")
-        })
+            "supermarket_name": directory.name_of(offer["supermarket_id"])
+        }
+    
+    try:
+        query = after_cursor(query, HISTORY_SORT, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if format == "ndjson":
+        # Exportação completa: as duas coleções são lidas em lotes e intercaladas por data
+        cursors = [
+            db[collection].find(query, {"_id": 0}).sort(HISTORY_SORT).batch_size(STREAM_BATCH_SIZE)
+            for collection in (HISTORY_COLLECTION, "offers")
+        ]
+        rows = merge_sorted(cursors, key=lambda o: (o["collected_at"], o["id"]))
+        return StreamingResponse(ndjson_lines(rows, to_point), media_type=NDJSON_MEDIA_TYPE)
+    
+    archived, current = await asyncio.gather(
+        db[HISTORY_COLLECTION].find(query, {"_id": 0}).sort(HISTORY_SORT).to_list(limit + 1),
+        db.offers.find(query, {"_id": 0}).sort(HISTORY_SORT).to_list(limit + 1)
+    )
+    offers = list(heapq.merge(archived, current, key=lambda o: (o["collected_at"], o["id"])))
+    page = paginate_sorted(offers, HISTORY_SORT, limit)
+    set_next_cursor(response, page.next_cursor)
     
     return {
         "product": ProductResponse(**product),
-        "history": history
+        "resolution": resolution,
+        "history": [to_point(offer) for offer in page.items]
     }
@@ -1,35 +1,73 @@
-from fastapi import APIRouter, Query, HTTPException
+from fastapi import APIRouter, Query, HTTPException, Depends, Response
 from typing import List, Optional
 import sys
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from models.supermarket import Supermarket, SupermarketResponse
-from motor.motor_asyncio import AsyncIOMotorClient
-import os
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from services.database import get_db
+from services.geo import parse_near, geo_near_stage
+from services.pagination import (
+    DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, after_cursor, decode_cursor, find_page, paginate_sorted, set_next_cursor
+)
 
 router = APIRouter(prefix="/supermarkets", tags=["Supermarkets"])
 
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+# Ordem por distância ao ponto near (metros, calculada pelo $geoNear); id desempata
+NEAR_SORT = [("distance_m", 1), ("id", 1)]
 
 
 @router.get("", response_model=List[SupermarketResponse])
 async def get_supermarkets(
-    city_id: Optional[str] = Query(None, description="Filtrar por cidade")
+    response: Response,
+    city_id: Optional[str] = Query(None, description="Filtrar por cidade"),
+    near: Optional[str] = Query(None, description="Ponto de referência no formato lat,lon"),
+    radius_km: Optional[float] = Query(None, gt=0, description="Raio máximo a partir de near"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Itens por página"),
+    cursor: Optional[str] = Query(None, description="Valor de X-Next-Cursor da página anterior"),
+    db: AsyncIOMotorDatabase = Depends(get_db)
 ):
-    """Lista supermercados"""
+    """Lista supermercados (ordenados por distância quando near é informado), paginada por cursor"""
     query = {}
     if city_id:
         query["city_id"] = city_id
     
-    supermarkets = await db.supermarkets.find(query, {"_id": 0}).to_list(100)
-    return [SupermarketResponse(**s) for s in supermarkets]
+    if not near:
+        if radius_km is not None:
+            raise HTTPException(status_code=400, detail="radius_km requires near")
+        try:
+            page = await find_page(db.supermarkets, query, [("id", 1)], limit, cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        set_next_cursor(response, page.next_cursor)
+        return [SupermarketResponse(**s) for s in page.items]
+    
+    try:
+        lat, lon = parse_near(near)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    # $geoNear no índice 2dsphere: só a página é lida, já ordenada por distância
+    try:
+        after = decode_cursor(cursor, NEAR_SORT) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    pipeline = [geo_near_stage(lat, lon, query, radius_km, min_distance_m=after[0] if after else None)]
+    if after:
+        # minDistance pula os mais próximos; o $match desempata por id na mesma distância
+        pipeline.append({"$match": after_cursor({}, NEAR_SORT, cursor)})
+    pipeline += [{"$limit": limit + 1}, {"$project": {"_id": 0}}]
+    supermarkets = await db.supermarkets.aggregate(pipeline).to_list(limit + 1)
+    supermarkets.sort(key=lambda s: (s["distance_m"], s["id"]))
+    
+    page = paginate_sorted(supermarkets, NEAR_SORT, limit)
+    set_next_cursor(response, page.next_cursor)
+    return [SupermarketResponse(**s, distance_km=round(s["distance_m"] / 1000, 2)) for s in page.items]
 
 
 @router.get("/{supermarket_id}", response_model=SupermarketResponse)
-async def get_supermarket(supermarket_id: str):
+async def get_supermarket(supermarket_id: str, db: AsyncIOMotorDatabase = Depends(get_db)):
     """Busca supermercado por ID"""
     supermarket = await db.supermarkets.find_one({"id": supermarket_id}, {"_id": 0})
     
@@ -1,60 +1,54 @@
-from fastapi import APIRouter, HTTPException, Depends
-from typing import List
+from fastapi import APIRouter, HTTPException, Depends, Query, Response
+from typing import List, Optional
 import sys
 from pathlib import Path
+import asyncio
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from models.user import User
+from models.user import User, Principal
 from models.alert import Alert, AlertCreate, AlertResponse
-from routes.auth import get_current_user
-from motor.motor_asyncio import AsyncIOMotorClient
-from datetime import datetime, timezone
-import os
+from models.base import as_utc, to_document
+from routes.auth import get_current_user, get_current_principal
+from services.auth_service import user_cache
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from services.database import get_db
+from services.price_view import find_product_best_price
+from services.alert_engine import evaluate_new_alert
+from services.favorites import find_favorite_products
+from services.supermarket_directory import supermarket_directory
+from services.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, find_page, set_next_cursor
 
 router = APIRouter(prefix="/users/me", tags=["User"])
 
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
-
 
 # ========== FAVORITOS ==========
 
 @router.get("/favorites")
-async def get_favorites(current_user: User = Depends(get_current_user)):
-    """Retorna favoritos do usuário"""
-    # Buscar produtos favoritos
-    product_favorites = []
-    if current_user.favorites.get("products"):
-        products = await db.products.find(
-            {"id": {"$in": current_user.favorites["products"]}},
-            {"_id": 0}
-        ).to_list(100)
-        
-        # Adicionar melhor preço de cada produto
-        for product in products:
-            best_offer = await db.offers.find_one(
-                {"product_id": product["id"]},
-                {"_id": 0}
-            ).sort("price", 1)
-            
-            if best_offer:
-                product["current_price"] = best_offer["price"]
-            
-            product_favorites.append(product)
-    
-    # Buscar supermercados favoritos
-    supermarket_favorites = []
-    if current_user.favorites.get("supermarkets"):
-        supermarkets = await db.supermarkets.find(
-            {"id": {"$in": current_user.favorites["supermarkets"]}},
-            {"_id": 0}
-        ).to_list(100)
-        supermarket_favorites = supermarkets
+async def get_favorites(
+    city_id: Optional[str] = Query(None, description="Cidade dos preços (padrão: cidade do usuário)"),
+    current_user: User = Depends(get_current_user),
+    db: AsyncIOMotorDatabase = Depends(get_db)
+):
+    """Retorna favoritos do usuário com melhor preço atual, promoção e tendência"""
+    city_id = city_id or current_user.city_id
+    product_ids = current_user.favorites.get("products", [])
+    supermarket_ids = current_user.favorites.get("supermarkets", [])
+    
+    async def load_products():
+        # Sem cidade, o melhor preço é o menor entre todas as cidades
+        city_supermarkets = list((await supermarket_directory.get(db, city_id)).ids) if city_id else None
+        return await find_favorite_products(db, product_ids, city_id, city_supermarkets)
+    
+    async def load_supermarkets():
+        if not supermarket_ids:
+            return []
+        return await db.supermarkets.find({"id": {"$in": supermarket_ids}}, {"_id": 0}).to_list(None)
+    
+    products, supermarkets = await asyncio.gather(load_products(), load_supermarkets())
     
     return {
-        "products": product_favorites,
-        "supermarkets": supermarket_favorites
+        "products": products,
+        "supermarkets": supermarkets
     }
 
 
@@ -62,7 +56,8 @@ async def get_favorites(current_user: User = Depends(get_current_user)):
 async def add_favorite(
     entity_type: str,  # "product" ou "supermarket"
     entity_id: str,
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncIOMotorDatabase = Depends(get_db)
 ):
     """Adiciona item aos favoritos"""
     if entity_type not in ["product", "supermarket"]:
@@ -84,6 +79,7 @@ async def add_favorite(
         {"id": current_user.id},
         {"$push": {field: entity_id}}
     )
+    user_cache.invalidate(current_user.id)
     
     return {"message": "Added to favorites"}
 
@@ -92,7 +88,8 @@ async def add_favorite(
 async def remove_favorite(
     entity_type: str,
     entity_id: str,
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncIOMotorDatabase = Depends(get_db)
 ):
     """Remove item dos favoritos"""
     if entity_type not in ["product", "supermarket"]:
@@ -104,6 +101,7 @@ async def remove_favorite(
         {"id": current_user.id},
         {"$pull": {field: entity_id}}
     )
+    user_cache.invalidate(current_user.id)
     
     return {"message": "Removed from favorites"}
 
@@ -111,27 +109,45 @@ async def remove_favorite(
 # ========== ALERTAS ==========
 
 @router.get("/alerts", response_model=List[AlertResponse])
-async def get_alerts(current_user: User = Depends(get_current_user)):
-    """Lista alertas do usuário"""
-    alerts = await db.alerts.find(
-        {"user_id": current_user.id, "active": True},
-        {"_id": 0}
-    ).to_list(100)
+async def get_alerts(
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Itens por página"),
+    cursor: Optional[str] = Query(None, description="Valor de X-Next-Cursor da página anterior"),
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncIOMotorDatabase = Depends(get_db)
+):
+    """Lista alertas do usuário (mais recentes primeiro, paginada por cursor)"""
+    try:
+        page = await find_page(
+            db.alerts,
+            {"user_id": current_user.id, "active": True},
+            [("created_at", -1), ("id", -1)],
+            limit,
+            cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    set_next_cursor(response, page.next_cursor)
+    
+    # Enriquecer com dados do produto (uma consulta para a página inteira)
+    products = await db.products.find(
+        {"id": {"$in": list({alert["product_id"] for alert in page.items})}},
+        {"_id": 0, "id": 1, "display_name": 1, "image_url": 1}
+    ).to_list(None)
+    product_map = {product["id"]: product for product in products}
     
-    # Enriquecer com dados do produto
     results = []
-    for alert in alerts:
-        product = await db.products.find_one(
-            {"id": alert["product_id"]},
-            {"_id": 0, "id": 1, "display_name": 1, "image_url": 1}
-        )
+    for alert in page.items:
+        product = product_map.get(alert["product_id"])
         
         alert_response = AlertResponse(
             id=alert["id"],
             product_id=alert["product_id"],
             target_price=alert["target_price"],
             active=alert["active"],
-            created_at=datetime.fromisoformat(alert["created_at"]),
+            created_at=as_utc(alert["created_at"]),
+            triggered_at=as_utc(alert.get("triggered_at")),
+            trigger=alert.get("trigger"),
             product=product
         )
         results.append(alert_response)
@@ -142,7 +158,8 @@ async def get_alerts(current_user: User = Depends(get_current_user)):
 @router.post("/alerts", response_model=AlertResponse)
 async def create_alert(
     alert_data: AlertCreate,
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncIOMotorDatabase = Depends(get_db)
 ):
     """Cria um novo alerta de preço"""
     # Verificar se produto existe
@@ -155,17 +172,23 @@ async def create_alert(
     alert_dict["user_id"] = current_user.id
     
     alert = Alert(**alert_dict)
-    alert_doc = alert.model_dump()
-    alert_doc["created_at"] = alert_doc["created_at"].isoformat()
+    alert_doc = to_document(alert)
     
     await db.alerts.insert_one(alert_doc)
     
+    # O alvo pode já estar atingido pelo melhor preço atual
+    best_price = await find_product_best_price(db, alert.product_id, alert.city_id)
+    if await evaluate_new_alert(db, alert_doc, best_price):
+        alert_doc = await db.alerts.find_one({"id": alert.id}, {"_id": 0})
+    
     return AlertResponse(
         id=alert.id,
         product_id=alert.product_id,
         target_price=alert.target_price,
         active=alert.active,
         created_at=alert.created_at,
+        triggered_at=as_utc(alert_doc.get("triggered_at")),
+        trigger=alert_doc.get("trigger"),
         product={
             "id": product["id"],
             "display_name": product["display_name"],
@@ -177,7 +200,8 @@ async def create_alert(
 @router.delete("/alerts/{alert_id}")
 async def delete_alert(
     alert_id: str,
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncIOMotorDatabase = Depends(get_db)
 ):
     """Deleta um alerta"""
     result = await db.alerts.update_one(
@@ -0,0 +1,246 @@
+"""
+Benchmark dos caminhos críticos da API contra um mongod local, em processo (cliente ASGI)
+Executar: python -m scripts.benchmark [--scales small,medium] [--requests 200] [--skip-seed]
+          [--baseline benchmark_results/anterior.json] [--max-regression 0.2]
+
+Para cada escala o banco de benchmark é populado pelo gerador (scripts.generate_data)
+e cada cenário é medido em duas passadas: latência (p50/p95/p99) e consultas ao
+MongoDB por requisição, depois alocações por requisição (tracemalloc, que distorce
+a latência e por isso roda separado). O resultado é salvo em JSON para comparação.
+
+ATENÇÃO: o gerador substitui os dados do banco usado; por padrão é BENCHMARK_DB_NAME.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import List, Optional
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import httpx
+import numpy as np
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import monitoring
+
+load_dotenv(Path(__file__).parent.parent / '.env')
+
+import server
+from services.database import database
+from services.auth_service import password_hasher, user_cache
+from services.response_cache import response_cache
+from services.supermarket_directory import supermarket_directory
+from scripts.generate_data import SCALES, generate
+from scripts.traffic import SCENARIOS, Scenario, TrafficContext
+
+RESULTS_DIR = Path(__file__).parent.parent / "benchmark_results"
+BENCHMARK_DB_NAME = os.environ.get("BENCHMARK_DB_NAME", "melhorpreco_benchmark")
+BENCHMARK_SEED = 42
+
+# Comandos de infraestrutura do driver que não são consultas da aplicação
+IGNORED_COMMANDS = {"hello", "ismaster", "isMaster", "ping", "endSessions", "saslStart", "saslContinue",
+                    "buildInfo", "getLastError"}
+
+
+class CommandCounter(monitoring.CommandListener):
+    """Conta os comandos enviados ao MongoDB (find, aggregate, getMore, insert...)"""
+
+    def __init__(self):
+        self.commands: Counter = Counter()
+
+    def started(self, event):
+        if event.command_name not in IGNORED_COMMANDS:
+            self.commands[event.command_name] += 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+    def snapshot(self) -> Counter:
+        return Counter(self.commands)
+
+
+def percentile(values: List[float], q: float) -> float:
+    return round(float(np.percentile(values, q)), 3) if values else 0.0
+
+
+async def run_scenario(ctx: TrafficContext, scenario: Scenario, counter: CommandCounter, requests: int, warmup: int) -> dict:
+    for _ in range(warmup):
+        await scenario(ctx)
+
+    # Passada 1: latência e consultas por requisição
+    latencies: List[float] = []
+    errors: Counter = Counter()
+    before = counter.snapshot()
+    for _ in range(requests):
+        started = time.perf_counter()
+        response = await scenario(ctx)
+        latencies.append((time.perf_counter() - started) * 1000)
+        if response.status_code >= 400:
+            errors[str(response.status_code)] += 1
+    commands = counter.snapshot() - before
+
+    # Passada 2: memória alocada (pico) por requisição
+    allocations: List[int] = []
+    tracemalloc.start()
+    try:
+        for _ in range(max(requests // 4, 1)):
+            tracemalloc.reset_peak()
+            baseline, _ = tracemalloc.get_traced_memory()
+            await scenario(ctx)
+            _, peak = tracemalloc.get_traced_memory()
+            allocations.append(peak - baseline)
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "requests": requests,
+        "errors": dict(errors),
+        "mean_ms": round(float(np.mean(latencies)), 3),
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "p99_ms": percentile(latencies, 99),
+        "max_ms": round(max(latencies), 3),
+        "queries_per_request": round(sum(commands.values()) / requests, 2),
+        "commands_per_request": {name: round(count / requests, 2) for name, count in sorted(commands.items())},
+        "alloc_peak_kb_per_request": round(float(np.mean(allocations)) / 1024, 1),
+    }
+
+
+async def run_scale(scale_name: str, db, counter: CommandCounter, args) -> dict:
+    if not args.skip_seed:
+        await generate(db, SCALES[scale_name], seed=BENCHMARK_SEED)
+
+    # Estado em memória do processo recomeça a cada escala
+    supermarket_directory.invalidate()
+    user_cache.clear()
+    await server.startup_db_client(db)
+
+    transport = httpx.ASGITransport(app=server.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        ctx = TrafficContext(client, np.random.default_rng(BENCHMARK_SEED))
+        await ctx.load(db)
+        results = {}
+        for name in args.scenarios:
+            print(f"   ⏱️  {scale_name}/{name}...")
+            results[name] = await run_scenario(ctx, SCENARIOS[name], counter, args.requests, args.warmup)
+    return results
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True, cwd=Path(__file__).parent).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current: dict, baseline: dict, max_regression: Optional[float]) -> bool:
+    """Imprime a variação contra o baseline; False se algum p95 piorou além do limite"""
+    ok = True
+    print(f"\n📊 Comparação com o baseline ({baseline['meta'].get('commit')} em {baseline['meta'].get('started_at')})")
+    print(f"   {'cenário':<34} {'p50 (ms)':>22} {'p95 (ms)':>22} {'consultas':>14}")
+    for scale_name, scenarios in current["results"].items():
+        for name, result in scenarios.items():
+            previous = baseline["results"].get(scale_name, {}).get(name)
+            if not previous:
+                continue
+            changes = {
+                key: (result[key] - previous[key]) / previous[key] if previous[key] else 0.0
+                for key in ("p50_ms", "p95_ms")
+            }
+            regressed = max_regression is not None and changes["p95_ms"] > max_regression
+            ok = ok and not regressed
+            print(
+                f"   {scale_name + '/' + name:<34}"
+                f" {previous['p50_ms']:>8.2f} → {result['p50_ms']:>7.2f} ({changes['p50_ms']:+.0%})"
+                f" {previous['p95_ms']:>8.2f} → {result['p95_ms']:>7.2f} ({changes['p95_ms']:+.0%})"
+                f" {previous['queries_per_request']:>5} → {result['queries_per_request']:<5}"
+                f"{'  ⚠️' if regressed else ''}"
+            )
+    return ok
+
+
+async def main(args) -> int:
+    counter = CommandCounter()
+    client = AsyncIOMotorClient(os.environ["MONGO_URL"], tz_aware=True, event_listeners=[counter])
+    db = client[args.db_name]
+    database.use(db, client)
+    # Mede os handlers, não o cache de respostas (a menos que pedido)
+    response_cache.enabled = args.response_cache
+
+    report = {
+        "meta": {
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "requests": args.requests,
+            "warmup": args.warmup,
+            "seed": BENCHMARK_SEED,
+            "response_cache": args.response_cache,
+        },
+        "results": {},
+    }
+    try:
+        for scale_name in args.scales:
+            print(f"\n🏁 Escala {scale_name}")
+            report["results"][scale_name] = await run_scale(scale_name, db, counter, args)
+    finally:
+        password_hasher.shutdown()
+        database.close()
+
+    output = Path(args.output) if args.output else RESULTS_DIR / f"{datetime.now(timezone.utc):%Y%m%dT%H%M%SZ}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2, ensure_ascii=False))
+
+    print()
+    for scale_name, scenarios in report["results"].items():
+        for name, result in scenarios.items():
+            print(f"   {scale_name + '/' + name:<34} p50 {result['p50_ms']:>8.2f} ms  p95 {result['p95_ms']:>8.2f} ms"
+                  f"  p99 {result['p99_ms']:>8.2f} ms  {result['queries_per_request']:>5} consultas"
+                  f"  {result['alloc_peak_kb_per_request']:>8.1f} KB  erros {sum(result['errors'].values())}")
+    print(f"\n💾 Resultados salvos em {output}")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())
+        if not compare(report, baseline, args.max_regression):
+            print("\n❌ Regressão de p95 acima do limite")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark dos caminhos críticos da API")
+    parser.add_argument("--scales", type=lambda value: value.split(","), default=["small", "medium"],
+                        help=f"Escalas separadas por vírgula ({', '.join(SCALES)})")
+    parser.add_argument("--scenarios", type=lambda value: value.split(","), default=list(SCENARIOS),
+                        help="Cenários separados por vírgula (padrão: todos)")
+    parser.add_argument("--requests", type=int, default=200, help="Requisições medidas por cenário")
+    parser.add_argument("--warmup", type=int, default=20, help="Requisições descartadas antes da medição")
+    parser.add_argument("--db-name", default=BENCHMARK_DB_NAME, help="Banco usado (os dados são substituídos)")
+    parser.add_argument("--skip-seed", action="store_true", help="Reutiliza os dados já gerados no banco")
+    parser.add_argument("--response-cache", action="store_true", help="Mantém o cache de respostas ligado")
+    parser.add_argument("--output", default=None, help="Arquivo JSON de saída (padrão: benchmark_results/<data>.json)")
+    parser.add_argument("--baseline", default=None, help="JSON de uma execução anterior para comparação")
+    parser.add_argument("--max-regression", type=float, default=None,
+                        help="Falha (exit 1) se o p95 de algum cenário piorar mais que essa fração (ex.: 0.2)")
+    args = parser.parse_args()
+
+    unknown = [name for name in args.scenarios if name not in SCENARIOS] + [s for s in args.scales if s not in SCALES]
+    if unknown:
+        parser.error(f"Desconhecido(s): {', '.join(unknown)}")
+    sys.exit(asyncio.run(main(args)))
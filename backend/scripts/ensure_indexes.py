@@ -0,0 +1,45 @@
+"""
+Script para criar os índices do banco de dados (idempotente)
+Executar: python -m scripts.ensure_indexes [--report]
+"""
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from dotenv import load_dotenv
+
+load_dotenv(Path(__file__).parent.parent / '.env')
+
+from services.database import database
+from services.indexes import ensure_indexes, report_indexes
+
+
+async def main(report_only: bool):
+    db = database.connect()
+
+    if not report_only:
+        created = await ensure_indexes(db)
+        for collection, names in created.items():
+            print(f"✅ {collection}: {', '.join(names) or 'nenhum índice aplicado'}")
+
+    print("\n📊 Relatório de índices:")
+    report = await report_indexes(db)
+    for collection, status in report.items():
+        print(f"   - {collection}:")
+        print(f"       faltando: {', '.join(status['missing']) or '-'}")
+        print(f"       extras:   {', '.join(status['extra']) or '-'}")
+        print(f"       sem uso:  {', '.join(status['unused']) or '-'}")
+
+    database.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cria e audita os índices do MongoDB")
+    parser.add_argument("--report", action="store_true", help="Apenas exibe o relatório, sem criar índices")
+    args = parser.parse_args()
+    asyncio.run(main(args.report))
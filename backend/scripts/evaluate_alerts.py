@@ -0,0 +1,34 @@
+"""
+Script para avaliar todos os alertas pendentes contra os melhores preços atuais
+(ex.: após o deploy do motor de alertas ou uma reconstrução de best_prices)
+Executar: python -m scripts.evaluate_alerts [--batch-size 1000]
+"""
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from dotenv import load_dotenv
+
+load_dotenv(Path(__file__).parent.parent / '.env')
+
+from services.database import database
+from services.alert_engine import evaluate_all_alerts
+
+
+async def main(batch_size: int):
+    db = database.connect()
+    triggered = await evaluate_all_alerts(db, batch_size)
+    print(f"✅ {triggered} alerta(s) disparado(s)")
+    database.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Avalia alertas pendentes contra best_prices")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Grupos de preço por bulk_write")
+    args = parser.parse_args()
+    asyncio.run(main(args.batch_size))
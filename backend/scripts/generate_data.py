@@ -0,0 +1,510 @@
+"""
+Gerador determinístico de dados sintéticos (cidades, supermercados, catálogo, ofertas,
+histórico, usuários e alertas) em escala configurável
+Executar: python -m scripts.generate_data [--scale small|medium|large] [--seed 42]
+          [--cities N] [--supermarkets-per-city N] [--products N] [--offers-per-product-per-day X]
+          [--history-months X] [--users N] [--alerts N] [--end 2026-01-31T12:00:00Z]
+
+A mesma semente, escala e data final produzem exatamente os mesmos documentos.
+As ofertas são geradas dia a dia e gravadas em lotes (insert_many), então o
+volume (10M+ na escala large) não fica em memória.
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+import unicodedata
+from dataclasses import dataclass, fields, replace
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import List, Optional
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv(Path(__file__).parent.parent / '.env')
+
+from models.base import as_utc, to_document
+from models.city import City
+from models.product import Product
+from models.supermarket import Supermarket
+from services.database import database
+from services.indexes import ensure_indexes
+from services.auth_service import get_password_hash
+from services.offer_archive import HISTORY_COLLECTION, to_history_document
+from services.price_view import BEST_PRICES_COLLECTION, CURRENT_WINDOW, rebuild_best_prices
+from services.price_rollup import ROLLUP_COLLECTIONS, rebuild_rollups
+from services.alert_engine import evaluate_all_alerts
+
+CATALOG_PATH = Path(__file__).parent / "data" / "seed_catalog.json"
+
+# Senha de todos os usuários gerados (o hash bcrypt é calculado uma única vez)
+GENERATED_PASSWORD = "senha123"
+GENERATED_PREFIX = "gen-"
+
+OFFER_TTL = timedelta(days=7)
+INFLATION_PER_MONTH = 0.004
+PROMOTION_RATE = 0.12
+# Popularidade dos produtos ~ 1 / (posição + 1)^expoente (os do catálogo fixo primeiro)
+POPULARITY_EXPONENT = 0.5
+# Categorias com variação sazonal de preço mais forte
+SEASONAL_CATEGORIES = {"hortifruti": 0.08, "carnes": 0.05}
+
+OPENING_HOURS = {
+    "monday": "07:00-22:00",
+    "tuesday": "07:00-22:00",
+    "wednesday": "07:00-22:00",
+    "thursday": "07:00-22:00",
+    "friday": "07:00-22:00",
+    "saturday": "07:00-22:00",
+    "sunday": "08:00-20:00",
+}
+
+
+@dataclass(frozen=True)
+class Scale:
+    cities: int
+    supermarkets_per_city: int
+    products: int
+    offers_per_product_per_day: float
+    history_months: float
+    users: int
+    alerts: int
+
+    @property
+    def days(self) -> int:
+        return max(1, round(self.history_months * 30))
+
+    @property
+    def expected_offers(self) -> int:
+        return round(self.products * self.offers_per_product_per_day * self.days)
+
+
+SCALES = {
+    # Equivalente ao seed antigo: São Paulo, 5 supermercados, 50 produtos, ~200 ofertas
+    "small": Scale(cities=1, supermarkets_per_city=5, products=50, offers_per_product_per_day=1.5,
+                   history_months=0.1, users=10, alerts=20),
+    "medium": Scale(cities=5, supermarkets_per_city=20, products=2000, offers_per_product_per_day=1.0,
+                    history_months=3, users=5000, alerts=10000),
+    # ~10,8M ofertas (a maior parte já arquivada em offers_history)
+    "large": Scale(cities=20, supermarkets_per_city=50, products=20000, offers_per_product_per_day=1.0,
+                   history_months=18, users=200000, alerts=500000),
+}
+
+
+def load_catalog() -> dict:
+    with open(CATALOG_PATH, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def normalize(text: str) -> str:
+    """Minúsculas sem acentos, como os canonical_name do catálogo"""
+    text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode()
+    return " ".join(text.lower().split())
+
+
+def ean13(number: int) -> str:
+    """EAN-13 com prefixo Brasil (789) e dígito verificador"""
+    digits = f"789{number:09d}"
+    checksum = (10 - sum(int(d) * (3 if i % 2 else 1) for i, d in enumerate(digits)) % 10) % 10
+    return digits + str(checksum)
+
+
+class BatchWriter:
+    """insert_many em lotes; o lote seguinte é montado enquanto o anterior é gravado"""
+
+    def __init__(self, db, collection: str, batch_size: int):
+        self.collection = db[collection]
+        self.batch_size = batch_size
+        self.written = 0
+        self._batch: List[dict] = []
+        self._pending: Optional[asyncio.Task] = None
+
+    async def add(self, doc: dict):
+        self._batch.append(doc)
+        if len(self._batch) >= self.batch_size:
+            await self._flush()
+
+    async def _flush(self):
+        if self._pending:
+            await self._pending
+        batch, self._batch = self._batch, []
+        if batch:
+            self._pending = asyncio.create_task(self.collection.insert_many(batch, ordered=False))
+            self.written += len(batch)
+
+    async def close(self) -> int:
+        await self._flush()
+        if self._pending:
+            await self._pending
+            self._pending = None
+        return self.written
+
+
+class DataGenerator:
+    def __init__(self, db, scale: Scale, seed: int = 42, end: Optional[datetime] = None, batch_size: int = 10000):
+        self.db = db
+        self.scale = scale
+        self.seed = seed
+        self.rng = np.random.default_rng(seed)
+        self.end = as_utc(end) if end else datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+        self.batch_size = batch_size
+        self.catalog = load_catalog()
+
+        self.cities: List[dict] = []
+        self.supermarkets: List[dict] = []
+        self.products: List[dict] = []
+        self.store_city = np.empty(0, dtype=np.intp)
+        self.store_levels = np.empty(0)
+        self.base_prices = np.empty(0)
+        self.seasonality = np.empty(0)
+        self.phases = np.empty(0)
+
+    # ---------- Catálogo ----------
+
+    def build_cities(self):
+        templates = self.catalog["cities"] + [
+            {
+                "name": city["name"],
+                "state": city["state"],
+                "state_code": city["state_code"],
+                "location": {"type": "Point", "coordinates": city["coordinates"]},
+                "population": city["population"],
+                "active": True,
+            }
+            for city in self.catalog["extra_cities"]
+        ]
+        for index in range(self.scale.cities):
+            template = templates[index % len(templates)]
+            cycle = index // len(templates)
+            city = {**template, "created_at": self.end}
+            if index >= len(self.catalog["cities"]):
+                city["id"] = f"city-{template['state_code'].lower()}-{index + 1:03d}"
+            if cycle:
+                city["name"] = f"{template['name']} {cycle + 1}"
+            # Pelos modelos: campos opcionais ausentes no catálogo ganham os valores padrão
+            self.cities.append(to_document(City(**city)))
+
+    def build_supermarkets(self):
+        chains = {chain["name"]: chain for chain in self.catalog["chains"]}
+        chain_list = self.catalog["chains"]
+        fixed = [s for s in self.catalog["supermarkets"]]
+        cities, levels = [], []
+        number = len(fixed)
+
+        for city_index, city in enumerate(self.cities):
+            lon, lat = city["location"]["coordinates"]
+            for position in range(self.scale.supermarkets_per_city):
+                if fixed and fixed[0]["city_id"] == city["id"]:
+                    supermarket = {**fixed.pop(0), "created_at": self.end}
+                    chain = chains.get(supermarket["name"], {"price_level": 1.0})
+                else:
+                    number += 1
+                    chain = chain_list[int(self.rng.integers(len(chain_list)))]
+                    supermarket = self._supermarket(number, chain, city, lat, lon)
+                self.supermarkets.append(to_document(Supermarket(**supermarket)))
+                cities.append(city_index)
+                levels.append(chain["price_level"] * float(self.rng.lognormal(0.0, 0.03)))
+
+        self.store_city = np.array(cities, dtype=np.intp)
+        self.store_levels = np.array(levels)
+
+    def _supermarket(self, number: int, chain: dict, city: dict, lat: float, lon: float) -> dict:
+        rng = self.rng
+        neighborhood = self.catalog["neighborhoods"][int(rng.integers(len(self.catalog["neighborhoods"])))]
+        street = self.catalog["streets"][int(rng.integers(len(self.catalog["streets"])))]
+        return {
+            "id": f"market-{number:03d}",
+            "name": chain["name"],
+            "chain": chain["chain"],
+            "city_id": city["id"],
+            "address": {
+                "street": f"{street}, {int(rng.integers(10, 4000))}",
+                "neighborhood": neighborhood,
+                "zip_code": f"{int(rng.integers(10000, 99999)):05d}-{int(rng.integers(0, 999)):03d}",
+                "city": city["name"],
+                "state": city["state_code"],
+            },
+            "location": {
+                "type": "Point",
+                # [longitude, latitude], espalhados a alguns km do centro
+                "coordinates": [round(lon + float(rng.normal(0, 0.05)), 4), round(lat + float(rng.normal(0, 0.05)), 4)],
+            },
+            "contact": {"phone": f"+55{int(rng.integers(1100000000, 9999999999))}"},
+            "opening_hours": OPENING_HOURS,
+            "rating": round(float(rng.uniform(3.6, 4.9)), 1),
+            "total_reviews": int(rng.integers(20, 3000)),
+            "created_at": self.end,
+        }
+
+    def build_products(self):
+        templates = self.catalog["products"]
+        base_prices = self.catalog["base_prices"]
+        brands = self.catalog["brands"]
+        variants = self.catalog["variants"]
+        prices = []
+
+        for index in range(self.scale.products):
+            template = templates[index % len(templates)]
+            if index < len(templates):
+                product = {**template, "created_at": self.end}
+                price = base_prices.get(template["id"], 10.0)
+            else:
+                brand = brands[template["category"]][int(self.rng.integers(len(brands[template["category"]])))]
+                variant = variants[int(self.rng.integers(len(variants)))]
+                display_name = template["display_name"].replace(template["brand"], brand)
+                if variant["label"]:
+                    display_name = f"{display_name} {variant['label']}"
+                product = {
+                    "id": f"prod-{index + 1:03d}",
+                    "canonical_name": normalize(display_name),
+                    "display_name": display_name,
+                    "category": template["category"],
+                    "subcategory": template.get("subcategory"),
+                    "brand": brand,
+                    "size": template["size"],
+                    "unit": template["unit"],
+                    "ean": ean13(index + 1),
+                    "image_url": template.get("image_url"),
+                    "synonyms": [],
+                    "variants": [],
+                    "created_at": self.end,
+                }
+                price = base_prices.get(template["id"], 10.0) * variant["factor"] * float(self.rng.lognormal(0.0, 0.15))
+            self.products.append(to_document(Product(**product)))
+            prices.append(price)
+
+        self.base_prices = np.array(prices)
+        self.seasonality = np.array([SEASONAL_CATEGORIES.get(p["category"], 0.02) for p in self.products])
+        self.phases = self.rng.uniform(0, 2 * np.pi, len(self.products))
+
+    # ---------- Ofertas ----------
+
+    def _cdf(self, weights: np.ndarray) -> np.ndarray:
+        cdf = np.cumsum(weights)
+        return cdf / cdf[-1]
+
+    def _sample(self, cdf: np.ndarray, size: int) -> np.ndarray:
+        return np.minimum(np.searchsorted(cdf, self.rng.random(size)), len(cdf) - 1)
+
+    def _popularity(self) -> np.ndarray:
+        weights = 1.0 / np.arange(1, len(self.products) + 1) ** POPULARITY_EXPONENT
+        return weights / weights.mean()
+
+    def offer_prices(self, products: np.ndarray, stores: np.ndarray, days_ago: np.ndarray) -> tuple:
+        """Preço = base x nível da loja x inflação x sazonalidade x ruído (com promoções)"""
+        rng = self.rng
+        inflation = (1 + INFLATION_PER_MONTH) ** (-days_ago / 30)
+        season = 1 + self.seasonality[products] * np.sin(2 * np.pi * days_ago / 365 + self.phases[products])
+        prices = (self.base_prices[products] * self.store_levels[stores] * inflation * season
+                  * rng.lognormal(0.0, 0.04, len(products)))
+        promotions = rng.random(len(products)) < PROMOTION_RATE
+        prices = np.where(promotions, prices * rng.uniform(0.70, 0.90, len(products)), prices)
+        # Preços "quebrados" como nas gôndolas (R$ x,x9)
+        prices = np.maximum(np.floor(prices * 10) / 10 + 0.09, 0.49)
+        return np.round(prices, 2), promotions
+
+    async def generate_offers(self) -> tuple:
+        rng = self.rng
+        popularity = self._popularity()
+        # Lojas de cidades maiores recebem mais ofertas
+        populations = np.array([max(city["population"], 1) for city in self.cities], dtype=np.float64)
+        store_cdf = self._cdf(np.sqrt(populations)[self.store_city])
+        archived_before = self.end - CURRENT_WINDOW
+        user_ids = [f"{GENERATED_PREFIX}user-{i:07d}" for i in range(min(self.scale.users, 1000))]
+
+        offers = BatchWriter(self.db, "offers", self.batch_size)
+        history = BatchWriter(self.db, HISTORY_COLLECTION, self.batch_size)
+        sequence = 0
+        started = time.perf_counter()
+
+        for day in range(self.scale.days):
+            days_ago = self.scale.days - day
+            day_start = self.end - timedelta(days=days_ago)
+            counts = rng.poisson(self.scale.offers_per_product_per_day * popularity)
+            products = np.repeat(np.arange(len(self.products)), counts)
+            total = len(products)
+            if not total:
+                continue
+
+            stores = self._sample(store_cdf, total)
+            seconds = rng.uniform(0, 86400, total)
+            prices, promotions = self.offer_prices(products, stores, days_ago - seconds / 86400)
+            sources = rng.choice(["crowdsourced", "scraping", "api"], size=total, p=[0.5, 0.4, 0.1])
+            confidence = rng.uniform(0.85, 0.99, total)
+            stock = rng.choice(["available", "low", "out_of_stock"], size=total, p=[0.85, 0.12, 0.03])
+            reporters = rng.integers(0, max(len(user_ids), 1), total)
+
+            for i in range(total):
+                collected_at = day_start + timedelta(seconds=float(seconds[i]))
+                price = float(prices[i])
+                source = str(sources[i])
+                offer = {
+                    "id": f"offer-{sequence:010d}",
+                    "product_id": self.products[products[i]]["id"],
+                    "supermarket_id": self.supermarkets[stores[i]]["id"],
+                    "price": price,
+                    "unit_price": price,
+                    "currency": "BRL",
+                    "source": source,
+                    "confidence_score": round(float(confidence[i]), 3),
+                    "collected_at": collected_at,
+                    "expires_at": collected_at + OFFER_TTL,
+                    "is_promotion": bool(promotions[i]),
+                    "stock_status": str(stock[i]),
+                    "metadata": {
+                        "user_id": user_ids[reporters[i]] if source == "crowdsourced" and user_ids else None,
+                        "photo_url": None,
+                        "ocr_verified": False,
+                    },
+                }
+                sequence += 1
+                # Ofertas fora da janela atual vão direto para o histórico (como se já arquivadas)
+                if collected_at < archived_before:
+                    await history.add(to_history_document(offer))
+                else:
+                    await offers.add(offer)
+
+            if day % 30 == 29 or day == self.scale.days - 1:
+                rate = sequence / max(time.perf_counter() - started, 1e-9)
+                print(f"   ... dia {day + 1}/{self.scale.days}: {sequence} ofertas ({rate:,.0f}/s)")
+
+        return await offers.close(), await history.close()
+
+    # ---------- Usuários e alertas ----------
+
+    async def generate_users(self) -> int:
+        rng = self.rng
+        password_hash = get_password_hash(GENERATED_PASSWORD)
+        product_cdf = self._cdf(self._popularity())
+        city_stores = {i: np.flatnonzero(self.store_city == i) for i in range(len(self.cities))}
+        first_names, last_names = self.catalog["first_names"], self.catalog["last_names"]
+
+        writer = BatchWriter(self.db, "users", self.batch_size)
+        for i in range(self.scale.users):
+            city_index = int(rng.integers(len(self.cities)))
+            favorites = self._sample(product_cdf, int(rng.poisson(8)))
+            stores = city_stores[city_index]
+            favorite_stores = rng.choice(stores, size=min(int(rng.integers(0, 4)), len(stores)), replace=False)
+            await writer.add({
+                "id": f"{GENERATED_PREFIX}user-{i:07d}",
+                "email": f"usuario{i}@example.com",
+                "name": f"{first_names[i % len(first_names)]} {last_names[int(rng.integers(len(last_names)))]}",
+                "phone": None,
+                "city_id": self.cities[city_index]["id"],
+                "password_hash": password_hash,
+                "reputation_score": int(rng.geometric(0.05)) - 1,
+                "role": "user",
+                "favorites": {
+                    "products": list(dict.fromkeys(self.products[p]["id"] for p in favorites)),
+                    "supermarkets": [self.supermarkets[s]["id"] for s in favorite_stores],
+                },
+                "created_at": self.end - timedelta(days=float(rng.uniform(0, self.scale.days))),
+            })
+        return await writer.close()
+
+    async def generate_alerts(self) -> int:
+        rng = self.rng
+        if not self.scale.users:
+            return 0
+        product_cdf = self._cdf(self._popularity())
+        writer = BatchWriter(self.db, "alerts", self.batch_size)
+        for i in range(self.scale.alerts):
+            product = int(self._sample(product_cdf, 1)[0])
+            city = self.cities[int(rng.integers(len(self.cities)))]["id"] if rng.random() < 0.8 else None
+            await writer.add({
+                "id": f"{GENERATED_PREFIX}alert-{i:08d}",
+                "user_id": f"{GENERATED_PREFIX}user-{int(rng.integers(self.scale.users)):07d}",
+                "product_id": self.products[product]["id"],
+                "city_id": city,
+                "target_price": round(float(self.base_prices[product] * rng.uniform(0.55, 0.9)), 2),
+                "active": bool(rng.random() < 0.9),
+                "created_at": self.end - timedelta(days=float(rng.uniform(0, 30))),
+                "last_checked": None,
+                "triggered_at": None,
+            })
+        return await writer.close()
+
+    # ---------- Execução ----------
+
+    async def clear(self):
+        """Remove os dados gerados anteriormente (usuários e alertas reais são preservados)"""
+        for collection in ["cities", "supermarkets", "products", "offers", HISTORY_COLLECTION,
+                           BEST_PRICES_COLLECTION, *ROLLUP_COLLECTIONS.values()]:
+            await self.db[collection].drop()
+        generated = {"id": {"$regex": f"^{GENERATED_PREFIX}"}}
+        await self.db.users.delete_many(generated)
+        await self.db.alerts.delete_many(generated)
+
+    async def run(self) -> dict:
+        scale = self.scale
+        print(f"🌱 Gerando dados (semente {self.seed}, fim {self.end.isoformat()})")
+        print(f"   {scale.cities} cidade(s), {scale.supermarkets_per_city} supermercado(s)/cidade, "
+              f"{scale.products} produto(s), {scale.days} dia(s), ~{scale.expected_offers:,} oferta(s)\n")
+
+        await self.clear()
+        self.build_cities()
+        self.build_supermarkets()
+        self.build_products()
+        await self.db.cities.insert_many(self.cities)
+        await self.db.supermarkets.insert_many(self.supermarkets)
+        for start in range(0, len(self.products), self.batch_size):
+            await self.db.products.insert_many(self.products[start:start + self.batch_size])
+        print(f"✅ {len(self.cities)} cidade(s), {len(self.supermarkets)} supermercado(s), {len(self.products)} produto(s)")
+
+        current, archived = await self.generate_offers()
+        print(f"✅ {current} oferta(s) atuais e {archived} no histórico")
+        users = await self.generate_users()
+        alerts = await self.generate_alerts()
+        print(f"✅ {users} usuário(s) (senha: {GENERATED_PASSWORD}) e {alerts} alerta(s)")
+
+        # Índices depois da carga (mais rápido que mantê-los a cada insert) e visões derivadas
+        await ensure_indexes(self.db)
+        await rebuild_best_prices(self.db)
+        await rebuild_rollups(self.db)
+        triggered = await evaluate_all_alerts(self.db)
+        print(f"✅ Índices, best_prices e agregados reconstruídos; {triggered} alerta(s) disparado(s)")
+
+        return {
+            "cities": len(self.cities),
+            "supermarkets": len(self.supermarkets),
+            "products": len(self.products),
+            "offers": current,
+            "offers_history": archived,
+            "users": users,
+            "alerts": alerts,
+        }
+
+
+async def generate(db, scale: Scale, seed: int = 42, end: Optional[datetime] = None, batch_size: int = 10000) -> dict:
+    return await DataGenerator(db, scale, seed, end, batch_size).run()
+
+
+async def main(scale: Scale, seed: int, end: Optional[datetime], batch_size: int):
+    db = database.connect()
+    started = time.perf_counter()
+    await generate(db, scale, seed, end, batch_size)
+    print(f"\n✨ Dados gerados em {time.perf_counter() - started:.1f}s")
+    database.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gera dados sintéticos determinísticos em escala")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small", help="Preset de volume")
+    parser.add_argument("--seed", type=int, default=42, help="Semente do gerador")
+    parser.add_argument("--end", type=datetime.fromisoformat, default=None,
+                        help="Data final das ofertas (padrão: hora atual); fixe para reproduzir datas")
+    parser.add_argument("--batch-size", type=int, default=10000, help="Documentos por insert_many")
+    for option in fields(Scale):
+        parser.add_argument(f"--{option.name.replace('_', '-')}", type=option.type, default=None,
+                            help=f"Sobrescreve {option.name} do preset")
+    args = parser.parse_args()
+
+    overrides = {option.name: getattr(args, option.name) for option in fields(Scale)
+                 if getattr(args, option.name) is not None}
+    asyncio.run(main(replace(SCALES[args.scale], **overrides), args.seed, args.end, args.batch_size))
@@ -0,0 +1,362 @@
+"""
+Teste de carga HTTP em malha fechada contra um uvicorn local, com mix de tráfego realista
+Executar: python -m scripts.load_test [--url http://127.0.0.1:8001 | --workers 1,2,4]
+          [--rates 25,50,100,200,400] [--duration 30] [--concurrency 100] [--slo-p99-ms 500]
+
+Cada degrau mantém uma taxa alvo (RPS) com `concurrency` clientes virtuais: cada
+cliente espera a resposta antes de pegar o próximo horário agendado, então, quando
+o servidor satura, a vazão alcançada fica abaixo do alvo. A latência é medida a
+partir do horário agendado (inclui a espera na fila do próprio gerador e evita a
+omissão coordenada); o tempo de serviço (envio -> resposta) é reportado à parte.
+
+O ponto de saturação é a maior vazão sustentada antes do primeiro degrau que não
+atinge 95% do alvo, passa do SLO de p99 ou tem mais de 1% de erros. Com --workers,
+o uvicorn é iniciado pelo próprio script para cada número de workers.
+
+Requer o banco populado pelo gerador (usuários gen-*): python -m scripts.generate_data --scale medium
+ATENÇÃO: o cenário create_offer grava ofertas no banco usado pelo servidor.
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import subprocess
+import sys
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import httpx
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv(Path(__file__).parent.parent / '.env')
+
+from services.database import database
+from scripts.traffic import SCENARIOS, Scenario, TrafficContext, login
+
+BACKEND_DIR = Path(__file__).parent.parent
+RESULTS_DIR = BACKEND_DIR / "load_results"
+LOAD_SEED = 42
+
+# Pesos do mix (buscas dominam; logins também chegam em rajadas, ver --login-burst-*)
+DEFAULT_MIX = {
+    "search_products": 50,
+    "get_offers": 20,
+    "get_product_history": 10,
+    "get_favorites": 10,
+    "create_offer": 5,
+    "login": 5,
+}
+
+# Limites superiores (ms) dos baldes do histograma de latência
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+
+# Rajadas de login somam-se à taxa alvo e não entram na vazão alcançada
+LOGIN_BURST = "login_burst"
+
+MIN_THROUGHPUT_RATIO = 0.95
+MAX_ERROR_RATE = 0.01
+
+
+@dataclass
+class Sample:
+    endpoint: str
+    second: int
+    latency_ms: float   # desde o horário agendado
+    service_ms: float   # desde o envio
+    status: Union[int, str]
+
+    @property
+    def ok(self) -> bool:
+        return isinstance(self.status, int) and self.status < 400
+
+
+def histogram(latencies: List[float]) -> Dict[str, int]:
+    counts = np.histogram(latencies, bins=(0, *LATENCY_BUCKETS_MS, np.inf))[0]
+    labels = [f"<={bound}ms" for bound in LATENCY_BUCKETS_MS] + [f">{LATENCY_BUCKETS_MS[-1]}ms"]
+    return {label: int(count) for label, count in zip(labels, counts)}
+
+
+def percentiles(latencies: List[float]) -> Dict[str, float]:
+    if not latencies:
+        return {"p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0}
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    return {"p50_ms": round(float(p50), 2), "p95_ms": round(float(p95), 2), "p99_ms": round(float(p99), 2)}
+
+
+@dataclass
+class StepResult:
+    target_rps: float
+    duration: float  # Tempo real do degrau (inclui respostas que chegaram após o fim)
+    samples: List[Sample] = field(default_factory=list)
+
+    def summary(self) -> dict:
+        ok = [s for s in self.samples if s.ok]
+        errors = Counter(str(s.status) for s in self.samples if not s.ok)
+        total = len(self.samples)
+
+        by_endpoint: Dict[str, List[Sample]] = defaultdict(list)
+        by_second: Dict[int, List[Sample]] = defaultdict(list)
+        for sample in self.samples:
+            by_endpoint[sample.endpoint].append(sample)
+            by_second[sample.second].append(sample)
+
+        return {
+            "target_rps": self.target_rps,
+            "achieved_rps": round(sum(s.endpoint != LOGIN_BURST for s in self.samples) / self.duration, 2),
+            "duration": round(self.duration, 2),
+            "requests": total,
+            "error_rate": round(sum(errors.values()) / total, 4) if total else 0.0,
+            "errors": dict(errors),
+            "latency": percentiles([s.latency_ms for s in ok]),
+            "service_time": percentiles([s.service_ms for s in ok]),
+            "histogram": histogram([s.latency_ms for s in ok]),
+            "endpoints": {
+                name: {
+                    "requests": len(samples),
+                    "errors": sum(not s.ok for s in samples),
+                    **percentiles([s.latency_ms for s in samples if s.ok]),
+                    "histogram": histogram([s.latency_ms for s in samples if s.ok]),
+                }
+                for name, samples in sorted(by_endpoint.items())
+            },
+            # Evolução segundo a segundo (para ver aquecimento, filas e picos de erro)
+            "timeline": [
+                {
+                    "second": second,
+                    "requests": len(samples),
+                    "errors": sum(not s.ok for s in samples),
+                    **percentiles([s.latency_ms for s in samples if s.ok]),
+                }
+                for second, samples in sorted(by_second.items())
+            ],
+        }
+
+
+async def _timed(ctx: TrafficContext, name: str, scenario: Scenario, scheduled: float, started: float, result: StepResult):
+    loop = asyncio.get_running_loop()
+    sent = loop.time()
+    try:
+        response = await scenario(ctx)
+        status: Union[int, str] = response.status_code
+    except httpx.HTTPError as e:
+        status = type(e).__name__
+    done = loop.time()
+    result.samples.append(Sample(
+        endpoint=name,
+        second=int(scheduled - started),
+        latency_ms=(done - scheduled) * 1000,
+        service_ms=(done - sent) * 1000,
+        status=status,
+    ))
+
+
+async def run_step(
+    ctx: TrafficContext,
+    rate: float,
+    duration: float,
+    concurrency: int,
+    mix: Dict[str, float],
+    burst_every: float,
+    burst_size: int
+) -> StepResult:
+    """Um degrau de carga: `concurrency` clientes dividem os horários agendados a 1/rate s"""
+    loop = asyncio.get_running_loop()
+    names = list(mix)
+    cdf = np.cumsum([mix[name] for name in names])
+    cdf = cdf / cdf[-1]
+    result = StepResult(target_rps=rate, duration=duration)
+    started = loop.time() + 0.1
+    end = started + duration
+    slots = itertools.count()
+
+    async def client():
+        while True:
+            scheduled = started + next(slots) / rate
+            # Horários não atendidos até o fim do degrau contam como vazão perdida
+            if scheduled >= end or loop.time() >= end:
+                return
+            delay = scheduled - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            name = names[min(int(np.searchsorted(cdf, ctx.rng.random())), len(names) - 1)]
+            await _timed(ctx, name, SCENARIOS[name], scheduled, started, result)
+
+    async def login_bursts():
+        # Rajadas de login (ex.: notificação push abrindo o app de muitos usuários ao mesmo tempo)
+        scheduled = started + burst_every
+        while scheduled < end:
+            await asyncio.sleep(max(0.0, scheduled - loop.time()))
+            await asyncio.gather(*(_timed(ctx, LOGIN_BURST, login, scheduled, started, result) for _ in range(burst_size)))
+            scheduled += burst_every
+
+    tasks = [client() for _ in range(concurrency)]
+    if burst_every > 0 and burst_size > 0:
+        tasks.append(login_bursts())
+    await asyncio.gather(*tasks)
+    result.duration = loop.time() - started
+    return result
+
+
+def saturated(summary: dict, slo_p99_ms: float) -> Optional[str]:
+    """Motivo pelo qual o degrau não foi sustentado (None se foi)"""
+    if summary["achieved_rps"] < summary["target_rps"] * MIN_THROUGHPUT_RATIO:
+        return "vazão abaixo do alvo"
+    if summary["error_rate"] > MAX_ERROR_RATE:
+        return "erros acima de 1%"
+    if summary["latency"]["p99_ms"] > slo_p99_ms:
+        return "p99 acima do SLO"
+    return None
+
+
+async def sweep(url: str, args) -> dict:
+    """Degraus crescentes de RPS até a saturação, contra um servidor já no ar"""
+    limits = httpx.Limits(max_connections=args.concurrency + args.login_burst_size,
+                          max_keepalive_connections=args.concurrency + args.login_burst_size)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=args.timeout) as client:
+        ctx = TrafficContext(client, np.random.default_rng(LOAD_SEED))
+        await ctx.load(database.connect(), users=args.users)
+
+        if args.warmup > 0:
+            print(f"   🔥 aquecimento ({args.warmup:g}s a {args.rates[0]:g} rps)")
+            await run_step(ctx, args.rates[0], args.warmup, args.concurrency, args.mix, 0, 0)
+
+        steps: List[dict] = []
+        sustained: Optional[float] = None
+        for rate in args.rates:
+            summary = (await run_step(ctx, rate, args.duration, args.concurrency, args.mix,
+                                      args.login_burst_every, args.login_burst_size)).summary()
+            reason = saturated(summary, args.slo_p99_ms)
+            summary["saturated"] = reason
+            steps.append(summary)
+            latency = summary["latency"]
+            print(f"   alvo {rate:>7g} rps → {summary['achieved_rps']:>8.1f} rps"
+                  f"  p50 {latency['p50_ms']:>8.1f}  p95 {latency['p95_ms']:>8.1f}  p99 {latency['p99_ms']:>8.1f} ms"
+                  f"  erros {summary['error_rate']:.1%}  {'❌ ' + reason if reason else '✅'}")
+            if reason:
+                if not args.no_stop:
+                    break
+            elif sustained is None or summary["achieved_rps"] > sustained:
+                sustained = summary["achieved_rps"]
+            await asyncio.sleep(args.cooldown)
+
+    return {"saturation_rps": sustained, "steps": steps}
+
+
+def start_server(workers: int, port: int) -> subprocess.Popen:
+    command = [sys.executable, "-m", "uvicorn", "server:app", "--host", "127.0.0.1", "--port", str(port),
+               "--workers", str(workers), "--no-access-log", "--log-level", "warning"]
+    return subprocess.Popen(command, cwd=BACKEND_DIR, env=os.environ.copy())
+
+
+async def wait_ready(url: str, process: subprocess.Popen, timeout: float = 60.0):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=url, timeout=2.0) as client:
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise RuntimeError(f"uvicorn encerrou com código {process.returncode}")
+            try:
+                if (await client.get("/api/")).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.5)
+    raise RuntimeError(f"uvicorn não respondeu em {timeout:g}s")
+
+
+def stop_server(process: subprocess.Popen):
+    process.terminate()
+    try:
+        process.wait(timeout=15)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+
+async def main(args) -> dict:
+    report = {
+        "meta": {
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "url": args.url,
+            "rates": args.rates,
+            "duration": args.duration,
+            "concurrency": args.concurrency,
+            "mix": args.mix,
+            "login_burst": {"every": args.login_burst_every, "size": args.login_burst_size},
+            "slo_p99_ms": args.slo_p99_ms,
+        },
+        "runs": {},
+    }
+    try:
+        if not args.workers:
+            print(f"\n🚦 {args.url}")
+            report["runs"]["external"] = await sweep(args.url, args)
+        for workers in args.workers:
+            url = f"http://127.0.0.1:{args.port}"
+            print(f"\n🚦 uvicorn com {workers} worker(s) em {url}")
+            process = start_server(workers, args.port)
+            try:
+                await wait_ready(url, process)
+                report["runs"][str(workers)] = await sweep(url, args)
+            finally:
+                stop_server(process)
+    finally:
+        database.close()
+
+    output = Path(args.output) if args.output else RESULTS_DIR / f"{datetime.now(timezone.utc):%Y%m%dT%H%M%SZ}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2, ensure_ascii=False))
+
+    print()
+    for name, run in report["runs"].items():
+        label = "servidor externo" if name == "external" else f"{name} worker(s)"
+        print(f"   {label:<18} saturação em ~{run['saturation_rps'] or 0:g} rps")
+    print(f"\n💾 Resultados salvos em {output}")
+    return report
+
+
+def parse_mix(value: str) -> Dict[str, float]:
+    """"search_products=50,get_offers=20,..." -> pesos"""
+    mix: Dict[str, float] = {}
+    for item in value.split(","):
+        name, _, weight = item.partition("=")
+        if name not in SCENARIOS:
+            raise argparse.ArgumentTypeError(f"Cenário desconhecido: {name}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def parse_numbers(value: str, kind=float) -> Tuple:
+    return tuple(kind(item) for item in value.split(","))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Teste de carga em malha fechada com mix de tráfego realista")
+    parser.add_argument("--url", default="http://127.0.0.1:8001", help="Servidor já em execução (ignorado com --workers)")
+    parser.add_argument("--workers", type=lambda value: parse_numbers(value, int), default=(),
+                        help="Inicia o uvicorn com cada número de workers (ex.: 1,2,4)")
+    parser.add_argument("--port", type=int, default=8765, help="Porta do uvicorn iniciado com --workers")
+    parser.add_argument("--rates", type=parse_numbers, default=(25, 50, 100, 200, 400, 800),
+                        help="Degraus de RPS alvo, em ordem crescente")
+    parser.add_argument("--duration", type=float, default=30.0, help="Segundos por degrau")
+    parser.add_argument("--warmup", type=float, default=5.0, help="Segundos de aquecimento (não medidos)")
+    parser.add_argument("--cooldown", type=float, default=2.0, help="Pausa entre degraus")
+    parser.add_argument("--concurrency", type=int, default=100, help="Clientes virtuais (conexões)")
+    parser.add_argument("--timeout", type=float, default=10.0, help="Timeout por requisição (s)")
+    parser.add_argument("--users", type=int, default=10, help="Usuários gerados usados nos cenários autenticados")
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX, help="Pesos por cenário (nome=peso,...)")
+    parser.add_argument("--login-burst-every", type=float, default=10.0, help="Intervalo entre rajadas de login (0 desliga)")
+    parser.add_argument("--login-burst-size", type=int, default=20, help="Logins simultâneos por rajada")
+    parser.add_argument("--slo-p99-ms", type=float, default=500.0, help="p99 máximo para considerar o degrau sustentado")
+    parser.add_argument("--no-stop", action="store_true", help="Executa todos os degraus mesmo após a saturação")
+    parser.add_argument("--output", default=None, help="Arquivo JSON de saída (padrão: load_results/<data>.json)")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,85 @@
+"""
+Script para converter datas gravadas como ISO string em BSON date (UTC)
+Executar: python -m scripts.migrate_datetimes [--batch-size 1000] [--dry-run]
+"""
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from dotenv import load_dotenv
+
+load_dotenv(Path(__file__).parent.parent / '.env')
+
+from pymongo import UpdateOne
+from services.database import database
+from models.base import as_utc
+
+# Campos de data por coleção
+DATE_FIELDS = {
+    "offers": ["collected_at", "expires_at"],
+    "alerts": ["created_at", "last_checked", "triggered_at"],
+    "users": ["created_at"],
+    "cities": ["created_at"],
+    "supermarkets": ["created_at"],
+    "products": ["created_at", "updated_at"],
+}
+
+
+async def migrate_collection(db, collection: str, fields: list, batch_size: int, dry_run: bool) -> int:
+    """Converte em lotes os documentos que ainda têm datas como string"""
+    query = {"$or": [{field: {"$type": "string"}} for field in fields]}
+    projection = {field: 1 for field in fields}
+
+    converted = 0
+    batch = []
+    cursor = db[collection].find(query, projection).batch_size(batch_size)
+
+    async for doc in cursor:
+        updates = {
+            field: as_utc(doc[field])
+            for field in fields
+            if isinstance(doc.get(field), str)
+        }
+        if not updates:
+            continue
+        batch.append(UpdateOne({"_id": doc["_id"]}, {"$set": updates}))
+
+        if len(batch) >= batch_size:
+            converted += await _flush(db, collection, batch, dry_run)
+            batch = []
+
+    if batch:
+        converted += await _flush(db, collection, batch, dry_run)
+
+    return converted
+
+
+async def _flush(db, collection: str, batch: list, dry_run: bool) -> int:
+    if not dry_run:
+        await db[collection].bulk_write(batch, ordered=False)
+    return len(batch)
+
+
+async def main(batch_size: int, dry_run: bool):
+    db = database.connect()
+
+    print("🕒 Convertendo datas ISO string para BSON date...\n")
+    for collection, fields in DATE_FIELDS.items():
+        converted = await migrate_collection(db, collection, fields, batch_size, dry_run)
+        action = "seriam convertidos" if dry_run else "convertidos"
+        print(f"✅ {collection}: {converted} documento(s) {action}")
+
+    database.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Migra datas ISO string para BSON date")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Documentos por bulk_write")
+    parser.add_argument("--dry-run", action="store_true", help="Apenas conta os documentos a converter")
+    args = parser.parse_args()
+    asyncio.run(main(args.batch_size, args.dry_run))
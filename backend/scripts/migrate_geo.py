@@ -0,0 +1,97 @@
+"""
+Script para inverter as coordenadas de cidades e supermercados de [lat, lon] para [lon, lat] (GeoJSON)
+Executar: python -m scripts.migrate_geo [--dry-run] [--force]
+"""
+
+import argparse
+import asyncio
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from dotenv import load_dotenv
+
+load_dotenv(Path(__file__).parent.parent / '.env')
+
+from services.database import database
+from services.indexes import ensure_indexes
+
+MIGRATION_ID = "geo_coordinates_lon_lat"
+COLLECTIONS = ["cities", "supermarkets"]
+
+# Latitudes plausíveis no Brasil (-33,8 a 5,3). As longitudes do continente (-74 a -34,8)
+# ficam fora dessa faixa, mas as das ilhas oceânicas não (Fernando de Noronha ~-32,4,
+# Trindade ~-29,3): por isso os dois elementos do par são verificados
+MIN_LATITUDE, MAX_LATITUDE = -34.0, 6.0
+
+
+def _latitude(position: int) -> dict:
+    return {f"location.coordinates.{position}": {"$gte": MIN_LATITUDE, "$lte": MAX_LATITUDE}}
+
+
+def _not_latitude(position: int) -> dict:
+    field = f"location.coordinates.{position}"
+    return {"$or": [{field: {"$lt": MIN_LATITUDE}}, {field: {"$gt": MAX_LATITUDE}}]}
+
+
+# Ainda em [lat, lon]: só o primeiro elemento é uma latitude plausível
+SWAP_QUERY = {"$and": [_latitude(0), _not_latitude(1)]}
+# Os dois elementos cabem na faixa de latitude (ilhas oceânicas): a ordem não pode ser
+# inferida, então o documento não é alterado e é listado para correção manual
+AMBIGUOUS_QUERY = {"$and": [_latitude(0), _latitude(1)]}
+
+# Troca [a, b] por [b, a] no próprio servidor, sem trazer os documentos
+SWAP_PIPELINE = [
+    {"$set": {"location.coordinates": [
+        {"$arrayElemAt": ["$location.coordinates", 1]},
+        {"$arrayElemAt": ["$location.coordinates", 0]},
+    ]}}
+]
+
+
+async def main(dry_run: bool, force: bool):
+    db = database.connect()
+
+    # Só documentos ainda em [lat, lon] são trocados (dados já em GeoJSON, como os do
+    # gerador, ficam intactos); o marcador apenas evita reler as coleções
+    applied = await db.migrations.find_one({"id": MIGRATION_ID})
+    if applied and not force:
+        print(f"⏭️  Migração já aplicada em {applied['applied_at']} (use --force para verificar de novo)")
+        database.close()
+        return
+
+    print("🌎 Convertendo coordenadas para [longitude, latitude]...\n")
+    for collection in COLLECTIONS:
+        ambiguous = await db[collection].find(AMBIGUOUS_QUERY, {"_id": 0, "id": 1}).to_list(None)
+        if ambiguous:
+            ids = ", ".join(doc.get("id", "?") for doc in ambiguous)
+            print(f"⚠️  {collection}: {len(ambiguous)} documento(s) com ordem ambígua, não alterados: {ids}")
+        if dry_run:
+            count = await db[collection].count_documents(SWAP_QUERY)
+            print(f"✅ {collection}: {count} documento(s) seriam convertidos")
+            continue
+        result = await db[collection].update_many(SWAP_QUERY, SWAP_PIPELINE)
+        print(f"✅ {collection}: {result.modified_count} documento(s) convertidos")
+
+    if not dry_run:
+        await db.migrations.update_one(
+            {"id": MIGRATION_ID},
+            {"$set": {"applied_at": datetime.now(timezone.utc)}},
+            upsert=True
+        )
+        # Índices 2dsphere dependem da ordem correta das coordenadas
+        await ensure_indexes(db)
+        print("\n📇 Índices geoespaciais garantidos")
+
+    database.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Migra coordenadas para a ordem GeoJSON")
+    parser.add_argument("--dry-run", action="store_true", help="Apenas conta os documentos a converter")
+    parser.add_argument("--force", action="store_true", help="Verifica as coleções mesmo se já registrada como aplicada")
+    args = parser.parse_args()
+    asyncio.run(main(args.dry_run, args.force))
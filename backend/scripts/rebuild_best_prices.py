@@ -0,0 +1,29 @@
+"""
+Script para reconstruir a visão materializada de melhores preços
+Executar: python -m scripts.rebuild_best_prices
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from dotenv import load_dotenv
+
+load_dotenv(Path(__file__).parent.parent / '.env')
+
+from services.database import database
+from services.price_view import rebuild_best_prices
+
+
+async def main():
+    db = database.connect()
+    written = await rebuild_best_prices(db)
+    print(f"✅ {written} grupo(s) de melhor preço atualizado(s)")
+    database.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
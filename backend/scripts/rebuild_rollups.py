@@ -0,0 +1,35 @@
+"""
+Script para reconstruir os agregados diários e semanais de preço
+Executar: python -m scripts.rebuild_rollups [--days 30]
+"""
+
+import argparse
+import asyncio
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from dotenv import load_dotenv
+
+load_dotenv(Path(__file__).parent.parent / '.env')
+
+from services.database import database
+from services.price_rollup import rebuild_rollups
+
+
+async def main(days):
+    db = database.connect()
+    since = datetime.now(timezone.utc) - timedelta(days=days) if days else None
+    await rebuild_rollups(db, since)
+    print("✅ Agregados de preço reconstruídos" + (f" (últimos {days} dias)" if days else ""))
+    database.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Reconstrói price_daily e price_weekly")
+    parser.add_argument("--days", type=int, default=None, help="Reprocessar apenas os últimos N dias")
+    args = parser.parse_args()
+    asyncio.run(main(args.days))
@@ -0,0 +1,110 @@
+"""
+Tráfego sintético compartilhado pelo benchmark (scripts.benchmark) e pelo teste de carga
+(scripts.load_test): amostras determinísticas do banco gerado e um cenário por endpoint
+"""
+
+from typing import Awaitable, Callable, Dict, List
+
+import httpx
+import numpy as np
+
+from scripts.generate_data import GENERATED_PASSWORD
+
+# Popularidade das buscas ~ 1 / posição^expoente (poucos termos concentram o tráfego)
+QUERY_ZIPF_EXPONENT = 1.1
+
+
+class TrafficContext:
+    """Amostras determinísticas de ids, termos e usuários do banco gerado"""
+
+    def __init__(self, client: httpx.AsyncClient, rng: np.random.Generator):
+        self.client = client
+        self.rng = rng
+        self.product_ids: List[str] = []
+        self.city_ids: List[str] = []
+        self.supermarkets_by_city: Dict[str, List[str]] = {}
+        self.terms: List[str] = []
+        self.users: List[dict] = []
+        self.tokens: List[str] = []
+        self._term_cdf = np.empty(0)
+
+    async def load(self, db, users: int = 10):
+        products = await db.products.find({}, {"_id": 0, "id": 1, "display_name": 1}).to_list(None)
+        self.product_ids = [p["id"] for p in products]
+        async for s in db.supermarkets.find({}, {"_id": 0, "id": 1, "city_id": 1}):
+            self.supermarkets_by_city.setdefault(s["city_id"], []).append(s["id"])
+        self.city_ids = sorted(self.supermarkets_by_city)
+
+        # Termos reais do catálogo: palavras inteiras, prefixos (digitação) e erros de digitação,
+        # em ordem de popularidade aleatória (mas fixa pela semente)
+        words = sorted({w.lower() for p in products for w in p["display_name"].split() if len(w) >= 4})
+        for word in words:
+            self.terms.extend([word, word[:3], word[:-2] + word[-1] if len(word) > 5 else word])
+        self.rng.shuffle(self.terms)
+        weights = 1.0 / np.arange(1, len(self.terms) + 1) ** QUERY_ZIPF_EXPONENT
+        self._term_cdf = np.cumsum(weights) / weights.sum()
+
+        self.users = await db.users.find(
+            {"id": {"$regex": "^gen-"}}, {"_id": 0, "id": 1, "email": 1, "city_id": 1}
+        ).sort("id", 1).limit(users).to_list(users)
+        for user in self.users:
+            response = await self.client.post("/api/auth/login", json={"email": user["email"], "password": GENERATED_PASSWORD})
+            response.raise_for_status()
+            self.tokens.append(response.json()["access_token"])
+
+    def pick(self, items: list):
+        return items[int(self.rng.integers(len(items)))]
+
+    def search_term(self) -> str:
+        index = int(np.searchsorted(self._term_cdf, self.rng.random()))
+        return self.terms[min(index, len(self.terms) - 1)]
+
+    def auth(self) -> dict:
+        return {"Authorization": f"Bearer {self.pick(self.tokens)}"}
+
+
+Scenario = Callable[[TrafficContext], Awaitable[httpx.Response]]
+
+
+async def search_products(ctx: TrafficContext) -> httpx.Response:
+    return await ctx.client.get("/api/products/search", params={"q": ctx.search_term(), "city_id": ctx.pick(ctx.city_ids)})
+
+
+async def get_offers(ctx: TrafficContext) -> httpx.Response:
+    return await ctx.client.get("/api/offers", params={"product_id": ctx.pick(ctx.product_ids), "city_id": ctx.pick(ctx.city_ids)})
+
+
+async def get_product_history(ctx: TrafficContext) -> httpx.Response:
+    days = int(ctx.pick([7, 30, 90, 180]))
+    return await ctx.client.get(
+        f"/api/products/{ctx.pick(ctx.product_ids)}/history",
+        params={"city_id": ctx.pick(ctx.city_ids), "days": days}
+    )
+
+
+async def get_favorites(ctx: TrafficContext) -> httpx.Response:
+    return await ctx.client.get("/api/users/me/favorites", headers=ctx.auth())
+
+
+async def login(ctx: TrafficContext) -> httpx.Response:
+    user = ctx.pick(ctx.users)
+    return await ctx.client.post("/api/auth/login", json={"email": user["email"], "password": GENERATED_PASSWORD})
+
+
+async def create_offer(ctx: TrafficContext) -> httpx.Response:
+    city_id = ctx.pick(ctx.city_ids)
+    return await ctx.client.post("/api/offers", headers=ctx.auth(), json={
+        "product_id": ctx.pick(ctx.product_ids),
+        "supermarket_id": ctx.pick(ctx.supermarkets_by_city[city_id]),
+        "price": round(float(ctx.rng.uniform(1, 50)), 2),
+    })
+
+
+SCENARIOS: Dict[str, Scenario] = {
+    "search_products": search_products,
+    "get_offers": get_offers,
+    "get_product_history": get_product_history,
+    "get_favorites": get_favorites,
+    "login": login,
+    "create_offer": create_offer,
+}
@@ -1,7 +1,7 @@
 from fastapi import FastAPI, APIRouter
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
 import os
 import logging
 from pathlib import Path
@@ -9,23 +9,70 @@ from pathlib import Path
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# MongoDB connection
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+# MongoDB connection (pool único compartilhado por todos os routers)
+from services.database import database
+from services.indexes import ensure_indexes
+from services.search_index import product_index
+from services.auth_service import password_hasher
+from services.response_cache import ResponseCacheMiddleware, response_cache
+from services.pagination import NEXT_CURSOR_HEADER
+from services.scheduler import scheduler
+from services.jobs import register_jobs
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+async def startup_db_client(db):
+    # Índices declarados em services/indexes.py (idempotente)
+    if os.environ.get('MONGO_ENSURE_INDEXES', 'true').lower() == 'true':
+        try:
+            await ensure_indexes(db)
+        except Exception:
+            logger.exception("Não foi possível aplicar os índices na inicialização")
+    
+    # Índice de busca de produtos em memória
+    try:
+        await product_index.build(db)
+    except Exception:
+        logger.exception("Não foi possível construir o índice de busca; usando $regex")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    db = database.connect()
+    await startup_db_client(db)
+    
+    # Jobs periódicos (índice de busca, arquivamento, agregados, alertas)
+    if os.environ.get('SCHEDULER_ENABLED', 'true').lower() == 'true':
+        scheduler.start(db)
+    
+    yield
+    
+    await scheduler.stop()
+    password_hasher.shutdown()
+    database.close()
+
+
+register_jobs(scheduler)
 
 # Create the main app without a prefix
 app = FastAPI(
     title="MelhorPreço API",
     description="API para comparação de preços de supermercados",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
 
 # Import routes
-from routes import auth, cities, products, supermarkets, offers, users
+from routes import auth, cities, products, supermarkets, offers, baskets, users, admin
 
 # Root endpoint
 @api_router.get("/")
@@ -42,26 +89,21 @@ api_router.include_router(cities.router)
 api_router.include_router(products.router)
 api_router.include_router(supermarkets.router)
 api_router.include_router(offers.router)
+api_router.include_router(baskets.router)
 api_router.include_router(users.router)
+api_router.include_router(admin.router)
 
 # Include the router in the main app
 app.include_router(api_router)
 
+# Cache de respostas GET do catálogo (ETag / 304); registrado antes do CORS para ficar por dentro dele
+app.add_middleware(ResponseCacheMiddleware, cache=response_cache)
+
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
     allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
-logger = logging.getLogger(__name__)
-
-@app.on_event("shutdown")
-async def shutdown_db_client():
-    client.close()
\ No newline at end of file
@@ -0,0 +1,91 @@
+from datetime import datetime, timezone
+from typing import Iterable, List, Optional
+from pymongo import UpdateMany
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def _pending_alerts(product_id: str, city_id: Optional[str], price: float) -> dict:
+    """Alertas ativos e ainda não disparados cujo alvo foi atingido.
+
+    Resolvido pelo índice (product_id, active, triggered_at, city_id, target_price):
+    só os alertas com target_price >= price são lidos, qualquer que seja o total.
+    Alertas sem cidade valem para todas.
+    """
+    return {
+        "product_id": product_id,
+        "active": True,
+        "triggered_at": None,
+        "city_id": {"$in": [city_id, None]},
+        "target_price": {"$gte": price},
+    }
+
+
+def _trigger(best_offer: dict, city_id: Optional[str], now: datetime) -> dict:
+    return {"$set": {
+        "triggered_at": now,
+        "last_checked": now,
+        "trigger": {
+            "price": best_offer["price"],
+            "offer_id": best_offer.get("id"),
+            "supermarket_id": best_offer["supermarket_id"],
+            "city_id": city_id,
+        },
+    }}
+
+
+async def evaluate_alerts(db, best_prices: Iterable[dict], now: Optional[datetime] = None) -> int:
+    """Dispara, em um único bulk_write, os alertas atingidos pelos novos melhores preços.
+
+    `best_prices` são documentos da visão best_prices (escopo cidade) recém-calculados.
+    """
+    now = now or datetime.now(timezone.utc)
+    # Mais baratos primeiro: um alerta sem cidade registra o menor preço entre as cidades do lote
+    best_prices = sorted(best_prices, key=lambda doc: doc["best_offer"]["price"])
+    operations: List[UpdateMany] = [
+        UpdateMany(
+            _pending_alerts(doc["product_id"], doc["city_id"], doc["best_offer"]["price"]),
+            _trigger(doc["best_offer"], doc["city_id"], now)
+        )
+        for doc in best_prices
+    ]
+    if not operations:
+        return 0
+
+    # ordered=True: o servidor aplica as operações na ordem da lista (ordered=False não garante)
+    result = await db.alerts.bulk_write(operations, ordered=True)
+    if result.modified_count:
+        logger.info("%d alerta(s) de preço disparado(s)", result.modified_count)
+    return result.modified_count
+
+
+async def evaluate_new_alert(db, alert: dict, best_price: Optional[dict], now: Optional[datetime] = None) -> bool:
+    """Dispara um alerta recém-criado se o melhor preço atual já atinge o alvo"""
+    if not best_price or best_price["best_offer"]["price"] > alert["target_price"]:
+        return False
+    now = now or datetime.now(timezone.utc)
+    result = await db.alerts.update_one(
+        {"id": alert["id"], "triggered_at": None},
+        _trigger(best_price["best_offer"], best_price["city_id"], now)
+    )
+    return result.modified_count == 1
+
+
+async def evaluate_all_alerts(db, batch_size: int = 1000) -> int:
+    """Avalia todos os alertas pendentes contra a visão best_prices inteira, em lotes.
+
+    Os lotes só são cortados entre produtos, para que todas as cidades de um produto
+    sejam avaliadas juntas (alertas sem cidade disparam no menor preço).
+    """
+    triggered = 0
+    batch: List[dict] = []
+    cursor = db.best_prices.find({"scope": "city"}, {"_id": 0}).sort("product_id", 1).batch_size(batch_size)
+    async for doc in cursor:
+        if len(batch) >= batch_size and doc["product_id"] != batch[-1]["product_id"]:
+            triggered += await evaluate_alerts(db, batch)
+            batch = []
+        batch.append(doc)
+    if batch:
+        triggered += await evaluate_alerts(db, batch)
+    return triggered
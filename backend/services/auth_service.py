@@ -1,24 +1,114 @@
 from passlib.context import CryptContext
 from jose import JWTError, jwt
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+import asyncio
 import os
+import time
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from services.cache import TTLCache
+
+# Alterar BCRYPT_ROUNDS faz os hashes antigos serem refeitos no próximo login
+BCRYPT_ROUNDS = int(os.environ.get("BCRYPT_ROUNDS", 12))
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
 
 SECRET_KEY = os.environ.get("SECRET_KEY", "your-secret-key-change-in-production-123456789")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24 * 7  # 7 days
 
+# Embute role/city_id no token para endpoints que só precisam da identidade
+EMBED_TOKEN_CLAIMS = os.environ.get("AUTH_EMBED_CLAIMS", "false").lower() == "true"
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+# Cache de usuários autenticados por id (por processo; invalidado nas escritas locais
+# e, entre workers, pela expiração do TTL)
+user_cache = TTLCache(
+    maxsize=int(os.environ.get("USER_CACHE_MAX_SIZE", 10000)),
+    ttl=float(os.environ.get("USER_CACHE_TTL_SECONDS", 60))
+)
 
 
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+class PasswordHasherBusy(Exception):
+    """Fila de hashing cheia: o chamador deve responder 503"""
+
+
+class PasswordHasher:
+    """Executa o bcrypt fora do event loop, em um pool de threads limitado"""
+
+    def __init__(self, context: CryptContext, max_workers: int, max_pending: int):
+        self.context = context
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor: Optional[ThreadPoolExecutor] = None
+        # Métricas
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.total_wait_seconds = 0.0
+        self.total_run_seconds = 0.0
+
+    async def _run(self, fn, *args):
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise PasswordHasherBusy()
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix="bcrypt")
+
+        queued_at = time.perf_counter()
+
+        def job():
+            started_at = time.perf_counter()
+            return fn(*args), started_at, time.perf_counter()
+
+        self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            result, started_at, finished_at = await loop.run_in_executor(self._executor, job)
+        finally:
+            self.pending -= 1
+
+        self.completed += 1
+        self.total_wait_seconds += started_at - queued_at
+        self.total_run_seconds += finished_at - started_at
+        return result
+
+    async def hash(self, password: str) -> str:
+        return await self._run(self.context.hash, password)
+
+    async def verify_and_update(self, password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+        """Verifica a senha; retorna também um novo hash se os parâmetros de custo mudaram"""
+        return await self._run(self.context.verify_and_update, password, hashed)
+
+    def stats(self) -> dict:
+        completed = self.completed or 1
+        return {
+            "workers": self.max_workers,
+            "pending": self.pending,
+            "queued": max(0, self.pending - self.max_workers),
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "avg_wait_ms": round(self.total_wait_seconds / completed * 1000, 2),
+            "avg_run_ms": round(self.total_run_seconds / completed * 1000, 2),
+        }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+password_hasher = PasswordHasher(
+    pwd_context,
+    max_workers=int(os.environ.get("PASSWORD_HASH_WORKERS", min(4, os.cpu_count() or 1))),
+    max_pending=int(os.environ.get("PASSWORD_HASH_MAX_PENDING", 64))
+)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     if expires_delta:
@@ -0,0 +1,334 @@
+from dataclasses import dataclass
+from itertools import combinations, islice
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import math
+import numpy as np
+
+from models.basket import (
+    BasketItem, BasketLine, BasketStore, BasketCheapestStore, BasketOptimizeResponse,
+    BasketSplitStore, BasketSplitResponse
+)
+from services.price_view import BEST_PRICES_COLLECTION, best_prices_marker, find_live_supermarket_best_prices
+from services.supermarket_directory import CityDirectory
+
+# Busca exata enquanto o número de combinações de supermercados couber nesse limite;
+# acima disso, seleção gulosa refinada por trocas (busca local)
+EXACT_COMBINATION_LIMIT = 25000
+# Combinações avaliadas por vez na busca exata (limita a matriz intermediária)
+COMBINATION_CHUNK = 2048
+# Poda de dominados só quando a comparação par a par (itens x lojas x lojas) é pequena
+DOMINANCE_MAX_CELLS = 8_000_000
+MAX_SWAP_ROUNDS = 20
+
+
+@dataclass(frozen=True)
+class PriceMatrix:
+    """Preços atuais produtos x supermercados (NaN: sem oferta naquele supermercado)"""
+    product_ids: Tuple[str, ...]
+    supermarket_ids: Tuple[str, ...]
+    quantities: np.ndarray  # (produtos,)
+    prices: np.ndarray      # (produtos, supermercados)
+    offers: Dict[Tuple[int, int], dict]  # (linha, coluna) -> best_offer da visão
+
+    @property
+    def available(self) -> np.ndarray:
+        return ~np.isnan(self.prices)
+
+    @property
+    def costs(self) -> np.ndarray:
+        """Custo de cada item em cada supermercado (preço x quantidade; NaN onde falta)"""
+        return self.prices * self.quantities[:, None]
+
+
+def merge_items(items: Iterable[BasketItem]) -> Dict[str, int]:
+    """Soma as quantidades de produtos repetidos, preservando a ordem da lista"""
+    quantities: Dict[str, int] = {}
+    for item in items:
+        quantities[item.product_id] = quantities.get(item.product_id, 0) + item.quantity
+    return quantities
+
+
+async def build_price_matrix(db, quantities: Dict[str, int], city_id: str, supermarket_ids: Sequence[str]) -> PriceMatrix:
+    """Monta a matriz em uma única consulta à visão best_prices (escopo supermercado)
+    ou, enquanto ela não foi construída, às ofertas atuais"""
+    product_ids = tuple(quantities)
+    supermarket_ids = tuple(supermarket_ids)
+    rows = {product_id: index for index, product_id in enumerate(product_ids)}
+    columns = {supermarket_id: index for index, supermarket_id in enumerate(supermarket_ids)}
+
+    prices = np.full((len(product_ids), len(supermarket_ids)), np.nan)
+    offers: Dict[Tuple[int, int], dict] = {}
+    if product_ids and supermarket_ids:
+        if await best_prices_marker.is_built(db):
+            docs = await db[BEST_PRICES_COLLECTION].find(
+                {"product_id": {"$in": list(product_ids)}, "city_id": city_id, "scope": "supermarket"},
+                {"_id": 0, "product_id": 1, "supermarket_id": 1, "best_offer": 1}
+            ).to_list(None)
+        else:
+            # Primeira construção da visão ainda em andamento (job best_prices_bootstrap)
+            live = await find_live_supermarket_best_prices(db, product_ids, supermarket_ids)
+            docs = [
+                {"product_id": product_id, "supermarket_id": supermarket_id, "best_offer": summary["best_offer"]}
+                for (product_id, supermarket_id), summary in live.items()
+            ]
+        for doc in docs:
+            column = columns.get(doc["supermarket_id"])
+            if column is None:
+                continue
+            row = rows[doc["product_id"]]
+            prices[row, column] = doc["best_offer"]["price"]
+            offers[row, column] = doc["best_offer"]
+
+    return PriceMatrix(
+        product_ids=product_ids,
+        supermarket_ids=supermarket_ids,
+        quantities=np.array([quantities[product_id] for product_id in product_ids], dtype=np.float64),
+        prices=prices,
+        offers=offers,
+    )
+
+
+def store_totals(matrix: PriceMatrix) -> Tuple[np.ndarray, np.ndarray]:
+    """Total da lista (só itens encontrados) e número de itens encontrados por supermercado"""
+    available = matrix.available
+    totals = np.where(available, matrix.prices * matrix.quantities[:, None], 0.0).sum(axis=0)
+    return totals, available.sum(axis=0)
+
+
+def _supermarket_summary(directory: CityDirectory, supermarket_id: str) -> dict:
+    supermarket = directory.get(supermarket_id) or {"id": supermarket_id, "name": "Desconhecido"}
+    return {"id": supermarket["id"], "name": supermarket["name"], "address": supermarket.get("address")}
+
+
+def basket_lines(matrix: PriceMatrix, column: int, rows: Optional[np.ndarray] = None) -> List[BasketLine]:
+    if rows is None:
+        rows = np.flatnonzero(matrix.available[:, column])
+    lines = []
+    for row in rows:
+        offer = matrix.offers[int(row), column]
+        quantity = int(matrix.quantities[row])
+        lines.append(BasketLine(
+            product_id=matrix.product_ids[row],
+            quantity=quantity,
+            unit_price=offer["price"],
+            subtotal=round(offer["price"] * quantity, 2),
+            is_promotion=offer.get("is_promotion", False),
+            offer_id=offer.get("id"),
+        ))
+    return lines
+
+
+def optimize_single_store(matrix: PriceMatrix, directory: CityDirectory, city_id: str) -> BasketOptimizeResponse:
+    """Total por supermercado e o mais barato para comprar a lista inteira em um só lugar.
+
+    Supermercados com mais itens vêm primeiro; entre os que têm os mesmos
+    itens, o menor total. Supermercados sem nenhum item da lista são omitidos.
+    """
+    totals, found = store_totals(matrix)
+    available = matrix.available
+    product_count = len(matrix.product_ids)
+
+    stores = []
+    for column in np.lexsort((totals, -found)):
+        if found[column] == 0:
+            break
+        stores.append((int(column), BasketStore(
+            supermarket=_supermarket_summary(directory, matrix.supermarket_ids[column]),
+            total=round(float(totals[column]), 2),
+            items_found=int(found[column]),
+            missing=[matrix.product_ids[row] for row in np.flatnonzero(~available[:, column])],
+            complete=bool(found[column] == product_count),
+        )))
+
+    cheapest = None
+    if stores:
+        column, store = stores[0]
+        cheapest = BasketCheapestStore(**store.model_dump(), items=basket_lines(matrix, column))
+
+    return BasketOptimizeResponse(
+        city_id=city_id,
+        items=product_count,
+        unavailable=[matrix.product_ids[row] for row in np.flatnonzero(~available.any(axis=1))],
+        cheapest_store=cheapest,
+        stores=[store for _, store in stores],
+    )
+
+
+@dataclass(frozen=True)
+class SplitSolution:
+    columns: Tuple[int, ...]   # supermercados escolhidos (colunas da matriz)
+    assignment: np.ndarray     # coluna escolhida por item (-1: item sem oferta nos escolhidos)
+    method: str                # exact | heuristic
+
+
+def _penalized_costs(matrix: PriceMatrix, max_stores: int, visit_cost: float) -> np.ndarray:
+    """Custos com falta = penalidade maior que qualquer diferença de preço.
+
+    Assim, cobrir mais itens sempre vence, e entre soluções com a mesma
+    cobertura vence o menor total (itens + visitas).
+    """
+    costs = matrix.costs
+    available = matrix.available
+    row_max = np.where(available, costs, 0.0).max(axis=1)
+    penalty = row_max.sum() + visit_cost * max_stores + 1.0
+    return np.where(available, costs, penalty)
+
+
+def _undominated(costs: np.ndarray) -> np.ndarray:
+    """Colunas não dominadas: descarta a loja se outra é tão barata ou mais em todos os itens.
+
+    Trocar uma loja dominada pela dominante nunca piora a solução, então a
+    poda preserva o ótimo da busca exata. Em empates, fica a de menor índice.
+    """
+    items, stores = costs.shape
+    if items * stores * stores > DOMINANCE_MAX_CELLS:
+        return np.arange(stores)
+    # dominates[t, s]: t custa <= s em todos os itens
+    dominates = (costs[:, :, None] <= costs[:, None, :]).all(axis=0)
+    np.fill_diagonal(dominates, False)
+    ties = dominates & dominates.T
+    earlier = np.tri(stores, k=-1, dtype=bool).T  # earlier[t, s]: t < s
+    removed = ((dominates & ~ties) | (ties & earlier)).any(axis=0)
+    return np.flatnonzero(~removed)
+
+
+def _objective(costs: np.ndarray, columns: Sequence[int], visit_cost: float) -> float:
+    return float(costs[:, list(columns)].min(axis=1).sum() + visit_cost * len(columns))
+
+
+def _solve_exact(costs: np.ndarray, max_stores: int, visit_cost: float) -> Tuple[int, ...]:
+    """Avalia todas as combinações de 1..max_stores lojas, em blocos vetorizados"""
+    best, best_total = (), math.inf
+    stores = costs.shape[1]
+    for size in range(1, min(max_stores, stores) + 1):
+        combos = combinations(range(stores), size)
+        while True:
+            chunk = np.array(list(islice(combos, COMBINATION_CHUNK)), dtype=np.intp)
+            if not len(chunk):
+                break
+            # (itens, combinações, size) -> menor custo por item em cada combinação
+            totals = costs[:, chunk].min(axis=2).sum(axis=0) + visit_cost * size
+            index = int(totals.argmin())
+            if totals[index] < best_total:
+                best, best_total = tuple(int(c) for c in chunk[index]), float(totals[index])
+    return best
+
+
+def _solve_greedy(costs: np.ndarray, max_stores: int, visit_cost: float) -> Tuple[int, ...]:
+    """Adiciona a loja que mais reduz o total; depois troca/remove lojas enquanto houver ganho"""
+    chosen: List[int] = []
+    current = np.full(costs.shape[0], np.inf)
+    current_total = math.inf
+    while len(chosen) < max_stores:
+        totals = np.minimum(current[:, None], costs).sum(axis=0) + visit_cost * (len(chosen) + 1)
+        totals[chosen] = np.inf
+        column = int(totals.argmin())
+        if totals[column] >= current_total:
+            break
+        chosen.append(column)
+        current = np.minimum(current, costs[:, column])
+        current_total = float(totals[column])
+
+    for _ in range(MAX_SWAP_ROUNDS):
+        improved = False
+        for position in range(len(chosen)):
+            others = chosen[:position] + chosen[position + 1:]
+            base = costs[:, others].min(axis=1) if others else np.full(costs.shape[0], np.inf)
+            # Substituir a loja da posição por qualquer outra (vetorizado) ...
+            totals = np.minimum(base[:, None], costs).sum(axis=0) + visit_cost * len(chosen)
+            totals[others] = np.inf
+            column = int(totals.argmin())
+            candidate, candidate_total = others + [column], float(totals[column])
+            # ... ou simplesmente removê-la (a visita pode custar mais que a economia)
+            if others:
+                removal_total = float(base.sum() + visit_cost * len(others))
+                if removal_total < candidate_total:
+                    candidate, candidate_total = others, removal_total
+            if candidate_total < current_total - 1e-9:
+                chosen, current_total, improved = candidate, candidate_total, True
+                break
+        if not improved:
+            break
+    return tuple(sorted(chosen))
+
+
+def solve_split(matrix: PriceMatrix, max_stores: int, visit_cost: float = 0.0) -> SplitSolution:
+    """Menor custo para comprar a lista em até `max_stores` supermercados.
+
+    Objetivo: soma, por item, do menor custo entre as lojas escolhidas, mais
+    `visit_cost` por loja visitada (pode compensar usar menos lojas que o máximo).
+    Exata quando as combinações cabem em EXACT_COMBINATION_LIMIT; senão, heurística.
+    """
+    assignment = np.full(len(matrix.product_ids), -1, dtype=np.intp)
+    covered = np.flatnonzero(matrix.available.any(axis=1))
+    if not len(covered):
+        return SplitSolution((), assignment, "exact")
+
+    costs = _penalized_costs(matrix, max_stores, visit_cost)[covered]
+    candidates = _undominated(costs)
+    costs = costs[:, candidates]
+
+    combos = sum(math.comb(len(candidates), size) for size in range(1, min(max_stores, len(candidates)) + 1))
+    if combos <= EXACT_COMBINATION_LIMIT:
+        chosen, method = _solve_exact(costs, max_stores, visit_cost), "exact"
+    else:
+        chosen, method = _solve_greedy(costs, max_stores, visit_cost), "heuristic"
+
+    columns = candidates[list(chosen)]
+    best = matrix.costs[covered][:, columns]
+    best = np.where(np.isnan(best), np.inf, best)
+    picks = best.argmin(axis=1)
+    found = np.isfinite(best[np.arange(len(covered)), picks])
+    assignment[covered[found]] = columns[picks[found]]
+    return SplitSolution(tuple(int(c) for c in columns), assignment, method)
+
+
+def optimize_split(
+    matrix: PriceMatrix,
+    directory: CityDirectory,
+    city_id: str,
+    max_stores: int,
+    visit_cost: float = 0.0
+) -> BasketSplitResponse:
+    """Resposta da divisão da lista entre lojas, comparada com a melhor loja única completa"""
+    solution = solve_split(matrix, max_stores, visit_cost)
+    available = matrix.available
+
+    stores = []
+    for column in solution.columns:
+        rows = np.flatnonzero(solution.assignment == column)
+        if not len(rows):
+            continue
+        lines = basket_lines(matrix, column, rows)
+        stores.append(BasketSplitStore(
+            supermarket=_supermarket_summary(directory, matrix.supermarket_ids[column]),
+            subtotal=round(sum(line.subtotal for line in lines), 2),
+            items=lines,
+        ))
+
+    items_total = round(sum(store.subtotal for store in stores), 2)
+    visits_total = round(visit_cost * len(stores), 2)
+
+    # Economia contra a loja única mais barata que tem todos os itens disponíveis na cidade
+    savings = None
+    covered = available.any(axis=1)
+    complete = available[covered].all(axis=0) if covered.any() else np.zeros(available.shape[1], dtype=bool)
+    if complete.any():
+        totals, _ = store_totals(matrix)
+        single = float(totals[complete].min()) + visit_cost
+        savings = round(single - items_total - visits_total, 2)
+
+    return BasketSplitResponse(
+        city_id=city_id,
+        items=len(matrix.product_ids),
+        max_stores=max_stores,
+        visit_cost=visit_cost,
+        method=solution.method,
+        items_total=items_total,
+        visits_total=visits_total,
+        total=round(items_total + visits_total, 2),
+        savings=savings,
+        unavailable=[matrix.product_ids[row] for row in np.flatnonzero(~covered)],
+        missing=[matrix.product_ids[row] for row in np.flatnonzero(covered & (solution.assignment < 0))],
+        stores=stores,
+    )
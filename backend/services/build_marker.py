@@ -0,0 +1,39 @@
+from datetime import datetime, timezone
+import time
+
+# Mesma coleção dos marcadores de migração (scripts/migrate_geo.py)
+MARKERS_COLLECTION = "migrations"
+
+
+class BuildMarker:
+    """Marcador de que uma coleção derivada já foi construída por completo.
+
+    A construção roda em um único worker (job com lease); os demais consultam o
+    marcador no máximo a cada `recheck_seconds` e guardam em memória o resultado
+    positivo.
+    """
+
+    def __init__(self, marker_id: str, recheck_seconds: float = 10.0):
+        self.marker_id = marker_id
+        self.recheck_seconds = recheck_seconds
+        self._built = False
+        self._checked_at = float("-inf")
+
+    async def is_built(self, db) -> bool:
+        if self._built or time.monotonic() - self._checked_at < self.recheck_seconds:
+            return self._built
+        self._checked_at = time.monotonic()
+        self._built = await db[MARKERS_COLLECTION].find_one({"id": self.marker_id}, {"_id": 1}) is not None
+        return self._built
+
+    async def mark(self, db):
+        await db[MARKERS_COLLECTION].update_one(
+            {"id": self.marker_id},
+            {"$set": {"applied_at": datetime.now(timezone.utc)}},
+            upsert=True
+        )
+        self._built = True
+
+    def reset(self):
+        self._built = False
+        self._checked_at = float("-inf")
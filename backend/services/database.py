@@ -0,0 +1,61 @@
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from typing import Optional
+import os
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class Database:
+    """Provedor único do cliente MongoDB compartilhado por todos os routers"""
+
+    def __init__(self):
+        self.client: Optional[AsyncIOMotorClient] = None
+        self.db: Optional[AsyncIOMotorDatabase] = None
+
+    def connect(self, mongo_url: Optional[str] = None, db_name: Optional[str] = None) -> AsyncIOMotorDatabase:
+        """Abre o pool de conexões (idempotente)"""
+        if self.db is not None:
+            return self.db
+
+        mongo_url = mongo_url or os.environ['MONGO_URL']
+        db_name = db_name or os.environ['DB_NAME']
+
+        self.client = AsyncIOMotorClient(
+            mongo_url,
+            maxPoolSize=int(os.environ.get('MONGO_MAX_POOL_SIZE', 100)),
+            minPoolSize=int(os.environ.get('MONGO_MIN_POOL_SIZE', 0)),
+            maxIdleTimeMS=int(os.environ.get('MONGO_MAX_IDLE_TIME_MS', 60000)),
+            serverSelectionTimeoutMS=int(os.environ.get('MONGO_SERVER_SELECTION_TIMEOUT_MS', 5000)),
+            connectTimeoutMS=int(os.environ.get('MONGO_CONNECT_TIMEOUT_MS', 5000)),
+            socketTimeoutMS=int(os.environ.get('MONGO_SOCKET_TIMEOUT_MS', 30000)),
+            readPreference=os.environ.get('MONGO_READ_PREFERENCE', 'primary'),
+            # Datas BSON retornam como datetime UTC com timezone
+            tz_aware=True,
+        )
+        self.db = self.client[db_name]
+        logger.info("MongoDB pool aberto (db=%s)", db_name)
+        return self.db
+
+    def use(self, db: AsyncIOMotorDatabase, client: Optional[AsyncIOMotorClient] = None):
+        """Substitui o banco em uso (ex.: testes com um banco isolado ou mock)"""
+        self.db = db
+        self.client = client
+
+    def close(self):
+        """Fecha o pool de conexões"""
+        if self.client is not None:
+            self.client.close()
+            logger.info("MongoDB pool fechado")
+        self.client = None
+        self.db = None
+
+
+database = Database()
+
+
+def get_db() -> AsyncIOMotorDatabase:
+    """Dependency que injeta o banco compartilhado nos endpoints"""
+    if database.db is None:
+        return database.connect()
+    return database.db
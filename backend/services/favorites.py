@@ -0,0 +1,152 @@
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+from services.offer_service import build_best_offer
+from services.price_view import BEST_PRICES_COLLECTION, best_prices_marker, find_live_best_prices
+from services.price_rollup import ROLLUP_COLLECTIONS, period_start
+
+# Tendência: média dos últimos 7 dias contra a dos 7 anteriores
+TREND_WINDOW = timedelta(days=7)
+# Variações menores que isso são consideradas estáveis
+TREND_STABLE_THRESHOLD = 0.02
+
+
+def favorites_pipeline(
+    product_ids: List[str],
+    city_id: Optional[str],
+    supermarket_ids: Optional[List[str]],
+    now: datetime,
+    include_prices: bool = True
+) -> List[dict]:
+    """Produtos favoritos com melhor preço atual (best_prices), supermercado e tendência (price_daily).
+
+    Com `include_prices` False os preços ficam de fora (resolvidos das ofertas pelo chamador).
+    """
+    price_match = {"scope": "city"}
+    rollup_match = {"period_start": {"$gte": period_start(now - 2 * TREND_WINDOW, "daily")}}
+    if city_id:
+        price_match["city_id"] = city_id
+        rollup_match["supermarket_id"] = {"$in": supermarket_ids or []}
+    recent_start = period_start(now - TREND_WINDOW, "daily")
+
+    pipeline = [
+        {"$match": {"id": {"$in": product_ids}}},
+        {"$project": {"_id": 0}},
+    ]
+    if include_prices:
+        pipeline.extend([
+            # Melhor preço atual: visão materializada (na cidade ou o menor entre as cidades)
+            {"$lookup": {
+                "from": BEST_PRICES_COLLECTION,
+                "localField": "id",
+                "foreignField": "product_id",
+                "pipeline": [
+                    {"$match": price_match},
+                    {"$sort": {"best_offer.price": 1}},
+                    {"$limit": 1},
+                    {"$project": {"_id": 0, "best_offer": 1, "min": 1, "max": 1, "count": 1}},
+                ],
+                "as": "price",
+            }},
+            {"$unwind": {"path": "$price", "preserveNullAndEmptyArrays": True}},
+            {"$lookup": {
+                "from": "supermarkets",
+                "localField": "price.best_offer.supermarket_id",
+                "foreignField": "id",
+                "pipeline": [{"$project": {"_id": 0, "id": 1, "name": 1}}],
+                "as": "supermarket",
+            }},
+            {"$unwind": {"path": "$supermarket", "preserveNullAndEmptyArrays": True}},
+        ])
+    pipeline.extend([
+        # Tendência a partir dos agregados diários (duas janelas, um único $group)
+        {"$lookup": {
+            "from": ROLLUP_COLLECTIONS["daily"],
+            "localField": "id",
+            "foreignField": "product_id",
+            "pipeline": [
+                {"$match": rollup_match},
+                {"$group": {
+                    "_id": None,
+                    "recent_sum": {"$sum": {"$cond": [{"$gte": ["$period_start", recent_start]}, "$sum", 0]}},
+                    "recent_count": {"$sum": {"$cond": [{"$gte": ["$period_start", recent_start]}, "$count", 0]}},
+                    "previous_sum": {"$sum": {"$cond": [{"$lt": ["$period_start", recent_start]}, "$sum", 0]}},
+                    "previous_count": {"$sum": {"$cond": [{"$lt": ["$period_start", recent_start]}, "$count", 0]}},
+                }},
+            ],
+            "as": "trend",
+        }},
+        {"$unwind": {"path": "$trend", "preserveNullAndEmptyArrays": True}},
+    ])
+    return pipeline
+
+
+def price_trend(trend: Optional[dict]) -> Optional[dict]:
+    """Direção e variação percentual entre as duas janelas (None sem dados nas duas)"""
+    if not trend or not trend.get("recent_count") or not trend.get("previous_count"):
+        return None
+    recent = trend["recent_sum"] / trend["recent_count"]
+    previous = trend["previous_sum"] / trend["previous_count"]
+    change = recent / previous - 1
+    if abs(change) < TREND_STABLE_THRESHOLD:
+        direction = "stable"
+    else:
+        direction = "down" if change < 0 else "up"
+    return {
+        "direction": direction,
+        "change_pct": round(change * 100, 1),
+        "recent_avg": round(recent, 2),
+        "previous_avg": round(previous, 2),
+    }
+
+
+async def _attach_live_prices(db, docs: List[dict], supermarket_ids: Optional[List[str]]):
+    """Preenche `price` e `supermarket` como a agregação faria, a partir das ofertas atuais"""
+    prices = await find_live_best_prices(db, [doc["id"] for doc in docs], supermarket_ids)
+    supermarkets = await db.supermarkets.find(
+        {"id": {"$in": list({price["best_offer"]["supermarket_id"] for price in prices.values()})}},
+        {"_id": 0, "id": 1, "name": 1}
+    ).to_list(None)
+    supermarket_of = {supermarket["id"]: supermarket for supermarket in supermarkets}
+    for doc in docs:
+        price = prices.get(doc["id"])
+        if price:
+            doc["price"] = price
+            doc["supermarket"] = supermarket_of.get(price["best_offer"]["supermarket_id"])
+
+
+async def find_favorite_products(
+    db,
+    product_ids: List[str],
+    city_id: Optional[str] = None,
+    supermarket_ids: Optional[List[str]] = None
+) -> List[dict]:
+    """Favoritos enriquecidos em uma única agregação, na ordem em que foram favoritados"""
+    if not product_ids:
+        return []
+    now = datetime.now(timezone.utc)
+    view_built = await best_prices_marker.is_built(db)
+    docs = await db.products.aggregate(
+        favorites_pipeline(product_ids, city_id, supermarket_ids, now, include_prices=view_built)
+    ).to_list(None)
+    if not view_built:
+        # Primeira construção da visão ainda em andamento (job best_prices_bootstrap)
+        await _attach_live_prices(db, docs, (supermarket_ids or []) if city_id else None)
+
+    results = {}
+    for doc in docs:
+        price = doc.pop("price", None)
+        supermarket = doc.pop("supermarket", None)
+        trend = doc.pop("trend", None)
+        if price:
+            offer = price["best_offer"]
+            doc["best_offer"] = build_best_offer(offer, supermarket, now)
+            doc["current_price"] = offer["price"]
+            doc["is_promotion"] = offer.get("is_promotion", False)
+        else:
+            doc["best_offer"] = None
+            doc["current_price"] = None
+            doc["is_promotion"] = False
+        doc["price_trend"] = price_trend(trend)
+        results[doc["id"]] = doc
+    return [results[product_id] for product_id in product_ids if product_id in results]
@@ -0,0 +1,85 @@
+from typing import Dict, Iterable, List, Sequence, Set, Tuple
+import numpy as np
+
+DEFAULT_NGRAM_SIZE = 2
+DEFAULT_THRESHOLD = 0.6
+
+
+def char_ngrams(text: str, n: int = DEFAULT_NGRAM_SIZE) -> Set[str]:
+    """N-gramas de caracteres por palavra, com bordas marcadas (" leite " -> " l", "le", ...)"""
+    grams = set()
+    for word in text.split():
+        padded = f" {word} "
+        grams.update(padded[i:i + n] for i in range(len(padded) - n + 1))
+    return grams
+
+
+def ngram_similarity(str1: str, str2: str, n: int = DEFAULT_NGRAM_SIZE) -> float:
+    """Coeficiente de Dice entre os n-gramas de duas strings (0-1)"""
+    a, b = char_ngrams(str1, n), char_ngrams(str2, n)
+    if not a or not b:
+        return 0.0
+    return 2 * len(a & b) / (len(a) + len(b))
+
+
+class FuzzyMatcher:
+    """Pontua uma busca contra todos os textos de uma vez usando postings de n-gramas em NumPy"""
+
+    def __init__(self, keys: Sequence[str], texts: Sequence[str], n: int = DEFAULT_NGRAM_SIZE):
+        self.keys = list(keys)
+        self.n = n
+        vocabulary: Dict[str, int] = {}
+        rows: List[int] = []
+        cols: List[int] = []
+        sizes = np.zeros(len(self.keys), dtype=np.float32)
+
+        for row, text in enumerate(texts):
+            grams = char_ngrams(text, n)
+            sizes[row] = len(grams)
+            for gram in grams:
+                cols.append(vocabulary.setdefault(gram, len(vocabulary)))
+                rows.append(row)
+
+        # Layout CSR invertido: para cada n-grama, as linhas (textos) que o contêm
+        cols_array = np.asarray(cols, dtype=np.int32)
+        order = np.argsort(cols_array, kind="stable")
+        self._rows = np.asarray(rows, dtype=np.int32)[order]
+        self._indptr = np.zeros(len(vocabulary) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(cols_array, minlength=len(vocabulary)), out=self._indptr[1:])
+        self._vocabulary = vocabulary
+        self._sizes = sizes
+
+    def __len__(self):
+        return len(self.keys)
+
+    def scores(self, query: str) -> np.ndarray:
+        """Vetor de similaridade de Dice (0-1) da busca contra todos os textos"""
+        grams = char_ngrams(query, self.n)
+        empty = np.zeros(len(self.keys), dtype=np.float32)
+        if not grams or not self.keys:
+            return empty
+
+        slices = [
+            self._rows[self._indptr[i]:self._indptr[i + 1]]
+            for i in (self._vocabulary.get(g) for g in grams) if i is not None
+        ]
+        if not slices:
+            return empty
+
+        overlap = np.bincount(np.concatenate(slices), minlength=len(self.keys)).astype(np.float32)
+        return 2 * overlap / (len(grams) + self._sizes)
+
+    def top(self, query: str, limit: int = 20, threshold: float = DEFAULT_THRESHOLD) -> List[Tuple[str, float]]:
+        """Melhores (chave, score) acima do limiar, em ordem decrescente"""
+        scores = self.scores(query)
+        candidates = np.flatnonzero(scores >= threshold)
+        if candidates.size > limit:
+            candidates = candidates[np.argpartition(-scores[candidates], limit - 1)[:limit]]
+        candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return [(self.keys[i], float(scores[i])) for i in candidates]
+
+    @classmethod
+    def from_texts(cls, texts: Iterable[str], n: int = DEFAULT_NGRAM_SIZE) -> "FuzzyMatcher":
+        """Matcher em que cada texto é a própria chave (ex.: vocabulário de tokens)"""
+        texts = list(texts)
+        return cls(texts, texts, n)
@@ -0,0 +1,75 @@
+from typing import Iterable, List, Optional, Tuple
+import numpy as np
+
+# Raio equatorial usado pelo MongoDB em $centerSphere
+EARTH_RADIUS_KM = 6378.1
+
+
+def parse_near(value: str) -> Tuple[float, float]:
+    """Converte "lat,lon" em (latitude, longitude), validando os limites"""
+    try:
+        lat, lon = (float(part) for part in value.split(","))
+    except ValueError:
+        raise ValueError("near deve estar no formato lat,lon")
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+        raise ValueError("Coordenadas fora dos limites")
+    return lat, lon
+
+
+def geo_near_stage(
+    lat: float,
+    lon: float,
+    query: dict,
+    radius_km: Optional[float] = None,
+    min_distance_m: Optional[float] = None
+) -> dict:
+    """$geoNear (índice 2dsphere): documentos do mais próximo ao mais distante, com distance_m"""
+    stage = {
+        "near": {"type": "Point", "coordinates": [lon, lat]},
+        "distanceField": "distance_m",
+        "spherical": True,
+        "query": query,
+    }
+    if radius_km is not None:
+        stage["maxDistance"] = radius_km * 1000
+    if min_distance_m is not None:
+        stage["minDistance"] = min_distance_m
+    return {"$geoNear": stage}
+
+
+def haversine_km(lat: float, lon: float, lats, lons) -> np.ndarray:
+    """Distâncias (km) de um ponto a vários pontos de uma vez"""
+    lat1, lon1 = np.radians(lat), np.radians(lon)
+    lat2 = np.radians(np.asarray(lats, dtype=np.float64))
+    lon2 = np.radians(np.asarray(lons, dtype=np.float64))
+
+    a = (np.sin((lat2 - lat1) / 2) ** 2
+         + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def attach_distances(
+    supermarkets: Iterable[dict],
+    lat: float,
+    lon: float,
+    radius_km: Optional[float] = None
+) -> List[dict]:
+    """Cópias dos supermercados com distance_km, do mais próximo ao mais distante.
+
+    Coordenadas seguem o GeoJSON: location.coordinates = [longitude, latitude].
+    Supermercados fora de radius_km (quando informado) são descartados.
+    """
+    supermarkets = [s for s in supermarkets if s.get("location")]
+    if not supermarkets:
+        return []
+
+    coordinates = np.array([s["location"]["coordinates"] for s in supermarkets], dtype=np.float64)
+    distances = haversine_km(lat, lon, coordinates[:, 1], coordinates[:, 0])
+
+    results = []
+    for index in np.argsort(distances, kind="stable"):
+        distance = float(distances[index])
+        if radius_km is not None and distance > radius_km:
+            break
+        results.append({**supermarkets[index], "distance_km": round(distance, 2)})
+    return results
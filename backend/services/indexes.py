@@ -0,0 +1,125 @@
+from pymongo import ASCENDING, DESCENDING, GEOSPHERE, IndexModel
+from pymongo.errors import OperationFailure
+from typing import Dict, List
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+# Registro declarativo de índices por coleção.
+# Cada índice é nomeado para que o relatório compare pelo nome.
+INDEXES: Dict[str, List[IndexModel]] = {
+    "offers": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        # GET /offers: igualdade em product_id, ordenação (e cursor) por price + id,
+        # filtros de supermarket_id e collected_at resolvidos no próprio índice
+        IndexModel(
+            [("product_id", ASCENDING), ("price", ASCENDING), ("id", ASCENDING),
+             ("supermarket_id", ASCENDING), ("collected_at", DESCENDING)],
+            name="product_price_id_supermarket_collected"
+        ),
+        # Busca (melhor oferta por produto) e histórico ordenado por collected_at + id
+        IndexModel(
+            [("product_id", ASCENDING), ("supermarket_id", ASCENDING),
+             ("collected_at", DESCENDING), ("id", DESCENDING)],
+            name="product_supermarket_collected_id"
+        ),
+        # Arquivamento de ofertas expiradas
+        IndexModel([("expires_at", ASCENDING)], name="expires_at"),
+    ],
+    "offers_history": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel(
+            [("product_id", ASCENDING), ("supermarket_id", ASCENDING),
+             ("collected_at", DESCENDING), ("id", DESCENDING)],
+            name="product_supermarket_collected_id"
+        ),
+    ],
+    "best_prices": [
+        IndexModel(
+            [("product_id", ASCENDING), ("city_id", ASCENDING),
+             ("scope", ASCENDING), ("supermarket_id", ASCENDING)],
+            name="product_city_scope_supermarket_unique", unique=True
+        ),
+    ],
+    "price_daily": [
+        IndexModel(
+            [("product_id", ASCENDING), ("supermarket_id", ASCENDING), ("period_start", ASCENDING)],
+            name="product_supermarket_period_unique", unique=True
+        ),
+    ],
+    "price_weekly": [
+        IndexModel(
+            [("product_id", ASCENDING), ("supermarket_id", ASCENDING), ("period_start", ASCENDING)],
+            name="product_supermarket_period_unique", unique=True
+        ),
+    ],
+    "supermarkets": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("city_id", ASCENDING), ("id", ASCENDING)], name="city_id_id"),
+        # Filtros near/radius_km ($geoWithin); coordenadas em [longitude, latitude]
+        IndexModel([("location", GEOSPHERE)], name="location_2dsphere"),
+    ],
+    "products": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+    ],
+    "cities": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("active", ASCENDING), ("name", ASCENDING), ("id", ASCENDING)], name="active_name_id"),
+        IndexModel([("location", GEOSPHERE)], name="location_2dsphere"),
+    ],
+    "users": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+    ],
+    "alerts": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel(
+            [("user_id", ASCENDING), ("active", ASCENDING),
+             ("created_at", DESCENDING), ("id", DESCENDING)],
+            name="user_active_created_id"
+        ),
+        # Motor de alertas: por produto, só os pendentes com target_price >= preço
+        IndexModel(
+            [("product_id", ASCENDING), ("active", ASCENDING), ("triggered_at", ASCENDING),
+             ("city_id", ASCENDING), ("target_price", DESCENDING)],
+            name="product_pending_city_target"
+        ),
+    ],
+}
+
+
+async def ensure_indexes(db) -> Dict[str, List[str]]:
+    """Cria os índices do registro de forma idempotente"""
+    created = {}
+    for collection, indexes in INDEXES.items():
+        try:
+            created[collection] = await db[collection].create_indexes(indexes)
+        except OperationFailure as e:
+            # Conflito de opções ou dados duplicados não devem derrubar os demais
+            logger.error("Falha ao criar índices de %s: %s", collection, e)
+            created[collection] = []
+    return created
+
+
+async def report_indexes(db) -> Dict[str, dict]:
+    """Compara os índices existentes com o registro e aponta faltantes, extras e sem uso"""
+    report = {}
+    for collection, indexes in INDEXES.items():
+        expected = {index.document["name"] for index in indexes}
+        existing = set((await db[collection].index_information()).keys()) - {"_id_"}
+
+        unused = []
+        try:
+            async for stats in db[collection].aggregate([{"$indexStats": {}}]):
+                if stats["name"] != "_id_" and stats["accesses"]["ops"] == 0:
+                    unused.append(stats["name"])
+        except OperationFailure as e:
+            logger.warning("$indexStats indisponível para %s: %s", collection, e)
+
+        report[collection] = {
+            "missing": sorted(expected - existing),
+            "extra": sorted(existing - expected),
+            "unused": sorted(unused),
+        }
+    return report
@@ -0,0 +1,81 @@
+from datetime import datetime, timedelta, timezone
+import os
+
+from services.scheduler import Scheduler, IntervalSchedule, CronSchedule
+from services.search_index import product_index
+from services.response_cache import response_cache
+from services.offer_archive import archive_expired_offers
+from services.price_rollup import rebuild_rollups, rollups_marker
+from services.price_view import best_prices_marker, rebuild_best_prices
+from services.alert_engine import evaluate_all_alerts
+
+
+async def refresh_search_index(db):
+    if await product_index.refresh(db):
+        await response_cache.invalidate("products")
+
+
+async def bootstrap_best_prices(db):
+    """Primeira construção da visão best_prices (um worker, sob o lease; depois é incremental)"""
+    if not await best_prices_marker.is_built(db):
+        await rebuild_best_prices(db)
+
+
+async def bootstrap_rollups(db):
+    """Primeira construção de price_daily/price_weekly (um worker, sob o lease)"""
+    if not await rollups_marker.is_built(db):
+        await rebuild_rollups(db)
+
+
+async def reconcile_rollups(db):
+    """Reprocessa os agregados dos últimos dias (corrige eventuais falhas do caminho incremental)"""
+    await rebuild_rollups(db, since=datetime.now(timezone.utc) - timedelta(days=2))
+
+
+def register_jobs(scheduler: Scheduler):
+    """Jobs periódicos da API"""
+    # Índice em memória: cada worker atualiza o seu (sem lease)
+    scheduler.add_job(
+        "search_index_refresh",
+        refresh_search_index,
+        IntervalSchedule(float(os.environ.get("SEARCH_INDEX_REFRESH_SECONDS", 60))),
+        jitter=5,
+        lease=False
+    )
+    # Só reconstrói enquanto o marcador não existe; rodar de novo é barato
+    scheduler.add_job(
+        "best_prices_bootstrap",
+        bootstrap_best_prices,
+        IntervalSchedule(float(os.environ.get("VIEW_BOOTSTRAP_CHECK_SECONDS", 600))),
+        jitter=5,
+        run_on_start=True,
+        lease_seconds=900
+    )
+    scheduler.add_job(
+        "rollup_bootstrap",
+        bootstrap_rollups,
+        IntervalSchedule(float(os.environ.get("VIEW_BOOTSTRAP_CHECK_SECONDS", 600))),
+        jitter=5,
+        run_on_start=True,
+        lease_seconds=900
+    )
+    scheduler.add_job(
+        "offer_archive",
+        archive_expired_offers,
+        IntervalSchedule(float(os.environ.get("OFFER_ARCHIVE_INTERVAL_SECONDS", 300))),
+        jitter=30
+    )
+    scheduler.add_job(
+        "rollup_reconcile",
+        reconcile_rollups,
+        CronSchedule(os.environ.get("ROLLUP_RECONCILE_CRON", "30 3 * * *")),
+        jitter=60,
+        lease_seconds=900
+    )
+    scheduler.add_job(
+        "alert_evaluation",
+        evaluate_all_alerts,
+        CronSchedule(os.environ.get("ALERT_EVALUATION_CRON", "15 4 * * *")),
+        jitter=60,
+        lease_seconds=900
+    )
@@ -0,0 +1,63 @@
+from datetime import datetime, timezone
+from typing import Optional
+from pymongo.errors import BulkWriteError
+import logging
+
+from services.price_view import refresh_for_offers
+from services.response_cache import response_cache
+
+logger = logging.getLogger(__name__)
+
+HISTORY_COLLECTION = "offers_history"
+
+# Campos mantidos no histórico (o restante só interessa enquanto a oferta está ativa)
+HISTORY_FIELDS = ("id", "product_id", "supermarket_id", "price", "collected_at", "is_promotion", "source")
+HISTORY_PROJECTION = {field: 1 for field in HISTORY_FIELDS}
+
+DUPLICATE_KEY_ERROR = 11000
+
+
+def to_history_document(offer: dict) -> dict:
+    """Versão compacta de uma oferta para o histórico"""
+    return {field: offer[field] for field in HISTORY_FIELDS if field in offer}
+
+
+async def archive_expired_offers(db, now: Optional[datetime] = None, batch_size: int = 1000) -> int:
+    """Move ofertas expiradas de offers para offers_history, em lotes.
+
+    A cópia é feita antes da remoção e ignora ids já arquivados, então uma
+    execução interrompida pode ser repetida sem perder nem duplicar ofertas.
+    """
+    now = now or datetime.now(timezone.utc)
+    archived = 0
+
+    while True:
+        expired = await db.offers.find(
+            {"expires_at": {"$lte": now}},
+            HISTORY_PROJECTION
+        ).limit(batch_size).to_list(batch_size)
+
+        if not expired:
+            break
+
+        try:
+            await db[HISTORY_COLLECTION].insert_many(
+                [to_history_document(offer) for offer in expired],
+                ordered=False
+            )
+        except BulkWriteError as e:
+            # Ofertas já copiadas em uma execução anterior
+            if any(err["code"] != DUPLICATE_KEY_ERROR for err in e.details.get("writeErrors", [])):
+                raise
+
+        await db.offers.delete_many({"_id": {"$in": [offer["_id"] for offer in expired]}})
+        await refresh_for_offers(db, expired)
+        archived += len(expired)
+
+        if len(expired) < batch_size:
+            break
+
+    if archived:
+        await response_cache.invalidate("prices")
+        logger.info("%d oferta(s) expirada(s) arquivada(s)", archived)
+    return archived
@@ -0,0 +1,239 @@
+from datetime import timedelta
+from typing import AsyncIterator, FrozenSet, Iterable, List, Optional, Set, Tuple
+from pydantic import ValidationError
+from pymongo.errors import BulkWriteError
+import asyncio
+import json
+import logging
+import os
+import time
+import uuid
+
+from models.base import as_utc, to_document
+from models.offer import Offer, OfferIngest, IngestError, BulkIngestResponse
+from services.price_view import refresh_for_offers
+from services.price_rollup import record_offers
+from services.response_cache import response_cache
+
+logger = logging.getLogger(__name__)
+
+# Ofertas por insert_many (e por lote de validação)
+INGEST_CHUNK_SIZE = int(os.environ.get("OFFER_INGEST_CHUNK_SIZE", 1000))
+
+# Erros por linha devolvidos na resposta (o restante só é contado)
+MAX_REPORTED_ERRORS = 1000
+
+OFFER_TTL = timedelta(days=7)
+DUPLICATE_KEY_ERROR = 11000
+
+# Ids determinísticos: reenviar o mesmo feed não duplica ofertas
+OFFER_ID_NAMESPACE = uuid.UUID("5b7f0c8e-2f4e-4c53-9a51-6f1d6c0b9a10")
+
+
+class KnownIds:
+    """Conjunto de ids existentes de uma coleção, recarregado a cada `ttl` segundos"""
+
+    def __init__(self, collection: str, ttl: float = 300.0):
+        self.collection = collection
+        self.ttl = ttl
+        self._ids: FrozenSet[str] = frozenset()
+        self._loaded_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+
+    async def get(self, db) -> FrozenSet[str]:
+        if self._loaded_at is None or time.monotonic() - self._loaded_at > self.ttl:
+            async with self._lock:
+                if self._loaded_at is None or time.monotonic() - self._loaded_at > self.ttl:
+                    ids = set()
+                    async for doc in db[self.collection].find({}, {"_id": 0, "id": 1}).batch_size(10000):
+                        ids.add(doc["id"])
+                    self._ids = frozenset(ids)
+                    self._loaded_at = time.monotonic()
+        return self._ids
+
+    async def missing(self, db, ids: Iterable[str]) -> Set[str]:
+        """Ids fora do conjunto; os desconhecidos são confirmados no banco (criados após a carga)"""
+        known = await self.get(db)
+        unknown = {id_ for id_ in ids if id_ not in known}
+        if not unknown:
+            return set()
+        found = await db[self.collection].find(
+            {"id": {"$in": list(unknown)}}, {"_id": 0, "id": 1}
+        ).to_list(None)
+        if found:
+            self._ids = self._ids | {doc["id"] for doc in found}
+        return unknown - {doc["id"] for doc in found}
+
+    def invalidate(self):
+        self._loaded_at = None
+
+
+known_products = KnownIds("products")
+known_supermarkets = KnownIds("supermarkets")
+
+
+def offer_id(row: OfferIngest) -> uuid.UUID:
+    key = f"{row.source}:{row.product_id}:{row.supermarket_id}:{row.collected_at.isoformat()}"
+    return uuid.uuid5(OFFER_ID_NAMESPACE, key)
+
+
+def _describe(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in err['loc']) or 'row'}: {err['msg']}"
+        for err in error.errors()
+    )
+
+
+class OfferIngestion:
+    """Valida, deduplica e grava um lote de ofertas, acumulando erros por linha"""
+
+    def __init__(self, db, user_id: str):
+        self.db = db
+        self.user_id = user_id
+        self.received = 0
+        self.inserted = 0
+        self.duplicates = 0
+        self.rejected = 0
+        self.errors: List[IngestError] = []
+        self._seen: Set[int] = set()
+        self._pending: List[Tuple[int, OfferIngest]] = []
+        # (produto, supermercado) tocados: a visão de melhores preços é recalculada uma vez no fim
+        self._touched: Set[Tuple[str, str]] = set()
+
+    def _error(self, row: int, message: str):
+        self.rejected += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(IngestError(row=row, error=message))
+
+    async def add_raw(self, row: int, raw):
+        """Aceita uma linha já decodificada (dict) ou em JSON (str/bytes)"""
+        self.received += 1
+        try:
+            if isinstance(raw, (str, bytes)):
+                item = OfferIngest.model_validate_json(raw)
+            else:
+                item = OfferIngest.model_validate(raw)
+        except ValidationError as e:
+            self._error(row, _describe(e))
+            return
+
+        item.collected_at = as_utc(item.collected_at)
+        item.expires_at = as_utc(item.expires_at)
+        self._pending.append((row, item))
+        if len(self._pending) >= INGEST_CHUNK_SIZE:
+            await self.flush()
+
+    async def flush(self):
+        pending, self._pending = self._pending, []
+        if not pending:
+            return
+
+        missing_products = await known_products.missing(self.db, {item.product_id for _, item in pending})
+        missing_supermarkets = await known_supermarkets.missing(self.db, {item.supermarket_id for _, item in pending})
+
+        rows: List[int] = []
+        docs: List[dict] = []
+        for row, item in pending:
+            if item.product_id in missing_products:
+                self._error(row, f"Unknown product_id {item.product_id}")
+                continue
+            if item.supermarket_id in missing_supermarkets:
+                self._error(row, f"Unknown supermarket_id {item.supermarket_id}")
+                continue
+
+            id_ = offer_id(item)
+            if id_.int in self._seen:
+                self.duplicates += 1
+                continue
+            self._seen.add(id_.int)
+
+            offer = Offer(
+                id=str(id_),
+                product_id=item.product_id,
+                supermarket_id=item.supermarket_id,
+                price=item.price,
+                unit_price=item.unit_price or item.price,
+                source=item.source,
+                collected_at=item.collected_at,
+                expires_at=item.expires_at or item.collected_at + OFFER_TTL,
+                is_promotion=item.is_promotion,
+                stock_status=item.stock_status,
+                metadata={"user_id": self.user_id},
+            )
+            rows.append(row)
+            docs.append(to_document(offer))
+
+        if docs:
+            await self._insert(rows, docs)
+
+    async def _insert(self, rows: List[int], docs: List[dict]):
+        failed: Set[int] = set()
+        try:
+            await self.db.offers.insert_many(docs, ordered=False)
+        except BulkWriteError as e:
+            for err in e.details.get("writeErrors", []):
+                failed.add(err["index"])
+                if err["code"] == DUPLICATE_KEY_ERROR:
+                    # Já ingerida em um envio anterior
+                    self.duplicates += 1
+                else:
+                    self._error(rows[err["index"]], err.get("errmsg", "Write error"))
+
+        inserted = [doc for index, doc in enumerate(docs) if index not in failed]
+        self.inserted += len(inserted)
+        if inserted:
+            await record_offers(self.db, inserted)
+            self._touched.update((doc["product_id"], doc["supermarket_id"]) for doc in inserted)
+
+    async def finish(self) -> BulkIngestResponse:
+        await self.flush()
+        if self._touched:
+            await refresh_for_offers(self.db, (
+                {"product_id": product_id, "supermarket_id": supermarket_id}
+                for product_id, supermarket_id in self._touched
+            ))
+            await response_cache.invalidate("prices")
+        logger.info(
+            "Ingestão em lote: %d recebidas, %d inseridas, %d duplicadas, %d rejeitadas",
+            self.received, self.inserted, self.duplicates, self.rejected
+        )
+        return BulkIngestResponse(
+            received=self.received,
+            inserted=self.inserted,
+            duplicates=self.duplicates,
+            rejected=self.rejected,
+            errors=sorted(self.errors, key=lambda error: error.row),
+            errors_truncated=self.rejected > len(self.errors),
+        )
+
+
+async def ingest_json(db, user_id: str, body: bytes) -> BulkIngestResponse:
+    """Corpo JSON: um array de ofertas"""
+    try:
+        rows = json.loads(body)
+    except ValueError as e:
+        raise ValueError(f"Invalid JSON: {e}")
+    if not isinstance(rows, list):
+        raise ValueError("Expected a JSON array of offers")
+
+    ingestion = OfferIngestion(db, user_id)
+    for row, raw in enumerate(rows):
+        await ingestion.add_raw(row, raw)
+    return await ingestion.finish()
+
+
+async def ingest_ndjson(db, user_id: str, chunks: AsyncIterator[bytes]) -> BulkIngestResponse:
+    """Corpo NDJSON: uma oferta por linha, processada conforme o corpo chega"""
+    ingestion = OfferIngestion(db, user_id)
+    row = 0
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                await ingestion.add_raw(row, line)
+                row += 1
+    if buffer.strip():
+        await ingestion.add_raw(row, buffer)
+    return await ingestion.finish()
@@ -0,0 +1,46 @@
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from models.base import as_utc
+
+
+def hours_since(collected_at: datetime, now: Optional[datetime] = None) -> int:
+    """Horas decorridas desde a coleta"""
+    now = now or datetime.now(timezone.utc)
+    return int((now - collected_at).total_seconds() / 3600)
+
+
+def build_best_offer(offer: dict, supermarket: Optional[dict], now: Optional[datetime] = None) -> dict:
+    """Monta o resumo de melhor oferta usado nas respostas da API"""
+    collected_at = as_utc(offer["collected_at"])
+
+    return {
+        "price": offer["price"],
+        "is_promotion": offer.get("is_promotion", False),
+        "hours_ago": hours_since(collected_at, now),
+        "supermarket": {
+            "id": supermarket["id"],
+            "name": supermarket["name"],
+            "distance_km": supermarket.get("distance_km", 0)
+        } if supermarket else None
+    }
+
+
+def attach_best_offers(
+    products: List[dict],
+    best_offers: Dict[str, dict],
+    supermarket_map: Dict[str, dict],
+    skip_missing: bool = True
+) -> List[dict]:
+    """Anexa a melhor oferta a cada produto, preservando a ordem de entrada"""
+    now = datetime.now(timezone.utc)
+    results = []
+    for product in products:
+        offer = best_offers.get(product["id"])
+        if offer:
+            supermarket = supermarket_map.get(offer["supermarket_id"])
+            product["best_offer"] = build_best_offer(offer, supermarket, now)
+        elif skip_missing:
+            continue
+        results.append(product)
+    return results
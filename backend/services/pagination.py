@@ -0,0 +1,145 @@
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Callable, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+import base64
+import binascii
+import json
+
+from bson import json_util
+from fastapi import Response
+
+from models.base import as_utc
+
+# Ordenação de uma página: [(campo, 1 | -1), ...]; o último campo deve ser único (ex.: id)
+SortSpec = Sequence[Tuple[str, int]]
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+# Documentos por lote lidos do cursor (e linhas por bloco enviado) no streaming
+STREAM_BATCH_SIZE = 500
+
+_JSON_OPTIONS = json_util.JSONOptions(tz_aware=True, tzinfo=timezone.utc)
+
+
+class Page(NamedTuple):
+    items: List[dict]
+    next_cursor: Optional[str]
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Cursor opaco com os valores das chaves de ordenação do último item"""
+    return base64.urlsafe_b64encode(json_util.dumps(list(values)).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: SortSpec) -> List[Any]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json_util.loads(raw, json_options=_JSON_OPTIONS)
+    except (binascii.Error, ValueError, UnicodeDecodeError):
+        raise ValueError("Cursor inválido")
+    if not isinstance(values, list) or len(values) != len(sort):
+        raise ValueError("Cursor inválido")
+    return values
+
+
+def cursor_for(doc: dict, sort: SortSpec) -> str:
+    return encode_cursor([doc.get(field) for field, _ in sort])
+
+
+def after_cursor(query: dict, sort: SortSpec, cursor: Optional[str]) -> dict:
+    """Restringe a consulta aos documentos posteriores ao cursor (keyset, sem skip)"""
+    if not cursor:
+        return query
+    values = decode_cursor(cursor, sort)
+
+    clauses = []
+    for position, (field, direction) in enumerate(sort):
+        clause = {previous: values[index] for index, (previous, _) in enumerate(sort[:position])}
+        clause[field] = {"$gt" if direction == 1 else "$lt": values[position]}
+        clauses.append(clause)
+    return {"$and": [query, {"$or": clauses}]} if query else {"$or": clauses}
+
+
+async def find_page(
+    collection,
+    query: dict,
+    sort: SortSpec,
+    limit: int,
+    cursor: Optional[str] = None,
+    projection: Optional[dict] = None
+) -> Page:
+    """Uma página ordenada por `sort`; lê limit + 1 documentos para saber se há próxima"""
+    docs = await collection.find(
+        after_cursor(query, sort, cursor),
+        projection or {"_id": 0}
+    ).sort(list(sort)).limit(limit + 1).to_list(limit + 1)
+
+    if len(docs) <= limit:
+        return Page(docs, None)
+    docs = docs[:limit]
+    return Page(docs, cursor_for(docs[-1], sort))
+
+
+def paginate_sorted(items: List[dict], sort: SortSpec, limit: int, cursor: Optional[str] = None) -> Page:
+    """Mesma paginação para listas já ordenadas em memória (ex.: por distância; só ordem crescente)"""
+    if cursor:
+        start = decode_cursor(cursor, sort)
+        items = [item for item in items if [item.get(field) for field, _ in sort] > start]
+
+    if len(items) <= limit:
+        return Page(items, None)
+    items = items[:limit]
+    return Page(items, cursor_for(items[-1], sort))
+
+
+def set_next_cursor(response: Response, next_cursor: Optional[str]):
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return as_utc(value).isoformat().replace("+00:00", "Z")
+    raise TypeError(f"{type(value).__name__} não é serializável em JSON")
+
+
+async def ndjson_lines(
+    rows: AsyncIterator[Any],
+    transform: Callable[[Any], Any] = lambda row: row,
+    chunk_size: int = STREAM_BATCH_SIZE
+) -> AsyncIterator[str]:
+    """Serializa linhas como NDJSON, enviando em blocos de `chunk_size`"""
+    chunk: List[str] = []
+    async for row in rows:
+        item = transform(row)
+        if hasattr(item, "model_dump_json"):
+            chunk.append(item.model_dump_json())
+        else:
+            chunk.append(json.dumps(item, default=_json_default, ensure_ascii=False))
+        if len(chunk) >= chunk_size:
+            yield "\n".join(chunk) + "\n"
+            chunk = []
+    if chunk:
+        yield "\n".join(chunk) + "\n"
+
+
+async def merge_sorted(cursors: Iterable[AsyncIterator[dict]], key: Callable[[dict], Any]) -> AsyncIterator[dict]:
+    """heapq.merge para cursores assíncronos já ordenados por `key`"""
+    heads = []
+    iterators = [cursor.__aiter__() for cursor in cursors]
+    for index, iterator in enumerate(iterators):
+        try:
+            heads.append([await iterator.__anext__(), index])
+        except StopAsyncIteration:
+            pass
+
+    while heads:
+        position = min(range(len(heads)), key=lambda i: (key(heads[i][0]), heads[i][1]))
+        item, index = heads[position]
+        yield item
+        try:
+            heads[position][0] = await iterators[index].__anext__()
+        except StopAsyncIteration:
+            heads.pop(position)
@@ -0,0 +1,132 @@
+from datetime import datetime, time, timedelta, timezone
+from typing import Dict, Iterable, List, Optional
+from zoneinfo import ZoneInfo
+from pymongo import UpdateOne
+import os
+import logging
+
+from models.base import as_utc
+from services.build_marker import BuildMarker
+from services.offer_archive import HISTORY_COLLECTION
+
+logger = logging.getLogger(__name__)
+
+# Os dias são cortados no fuso dos usuários, não em UTC
+ROLLUP_TIMEZONE = os.environ.get("ROLLUP_TIMEZONE", "America/Sao_Paulo")
+
+ROLLUP_COLLECTIONS = {
+    "daily": "price_daily",
+    "weekly": "price_weekly",
+}
+
+# Gravado ao fim da primeira reconstrução completa (job rollup_bootstrap)
+rollups_marker = BuildMarker("price_rollups_built")
+
+# Acima deste número de dias o histórico passa a ser semanal
+DAILY_MAX_DAYS = 90
+
+
+def period_start(moment: datetime, resolution: str, tz: str = ROLLUP_TIMEZONE) -> datetime:
+    """Início (em UTC) do dia ou da semana (segunda-feira) local que contém `moment`"""
+    zone = ZoneInfo(tz)
+    local_date = as_utc(moment).astimezone(zone).date()
+    if resolution == "weekly":
+        local_date -= timedelta(days=local_date.weekday())
+    return datetime.combine(local_date, time(0), tzinfo=zone).astimezone(timezone.utc)
+
+
+def choose_resolution(days: int) -> str:
+    return "daily" if days <= DAILY_MAX_DAYS else "weekly"
+
+
+def rollup_updates(offers: Iterable[dict]) -> Dict[str, List[UpdateOne]]:
+    """Upserts incrementais ($min/$max/$inc) por resolução para um lote de ofertas"""
+    updates: Dict[str, List[UpdateOne]] = {resolution: [] for resolution in ROLLUP_COLLECTIONS}
+    for offer in offers:
+        for resolution in ROLLUP_COLLECTIONS:
+            key = {
+                "product_id": offer["product_id"],
+                "supermarket_id": offer["supermarket_id"],
+                "period_start": period_start(offer["collected_at"], resolution),
+            }
+            updates[resolution].append(UpdateOne(key, {
+                "$min": {"min": offer["price"]},
+                "$max": {"max": offer["price"]},
+                "$inc": {"sum": offer["price"], "count": 1},
+            }, upsert=True))
+    return updates
+
+
+async def record_offers(db, offers: Iterable[dict]) -> None:
+    """Acumula novas ofertas nos agregados diários e semanais"""
+    for resolution, operations in rollup_updates(offers).items():
+        if operations:
+            await db[ROLLUP_COLLECTIONS[resolution]].bulk_write(operations, ordered=False)
+
+
+async def rebuild_rollups(db, since: Optional[datetime] = None) -> None:
+    """Recalcula os agregados a partir de offers_history + offers (em um pipeline no servidor)"""
+    # Alinhado ao início da semana para não substituir períodos por dados parciais
+    match = {"collected_at": {"$gte": period_start(since, "weekly")}} if since else {}
+    for resolution, collection in ROLLUP_COLLECTIONS.items():
+        trunc = {"date": "$collected_at", "unit": "day", "timezone": ROLLUP_TIMEZONE}
+        if resolution == "weekly":
+            trunc.update({"unit": "week", "startOfWeek": "monday"})
+
+        pipeline = [
+            {"$match": match},
+            {"$unionWith": {"coll": "offers", "pipeline": [
+                {"$match": match},
+                {"$project": {"_id": 0, "id": 1, "product_id": 1, "supermarket_id": 1, "price": 1, "collected_at": 1}},
+                # O arquivamento copia para offers_history antes de remover de offers: uma
+                # oferta nesse intervalo está nas duas coleções e só pode ser contada uma vez
+                {"$lookup": {"from": HISTORY_COLLECTION, "localField": "id", "foreignField": "id", "as": "archived"}},
+                {"$match": {"archived": {"$size": 0}}},
+            ]}},
+            {"$group": {
+                "_id": {
+                    "product_id": "$product_id",
+                    "supermarket_id": "$supermarket_id",
+                    "period_start": {"$dateTrunc": trunc},
+                },
+                "min": {"$min": "$price"},
+                "max": {"$max": "$price"},
+                "sum": {"$sum": "$price"},
+                "count": {"$sum": 1},
+            }},
+            {"$project": {
+                "_id": 0,
+                "product_id": "$_id.product_id",
+                "supermarket_id": "$_id.supermarket_id",
+                "period_start": "$_id.period_start",
+                "min": 1, "max": 1, "sum": 1, "count": 1,
+            }},
+            {"$merge": {
+                "into": collection,
+                "on": ["product_id", "supermarket_id", "period_start"],
+                "whenMatched": "replace",
+                "whenNotMatched": "insert",
+            }},
+        ]
+        await db[HISTORY_COLLECTION].aggregate(pipeline).to_list(None)
+        logger.info("Agregados %s reconstruídos", resolution)
+    if since is None:
+        await rollups_marker.mark(db)
+
+
+async def find_rollups(
+    db,
+    product_id: str,
+    supermarket_ids: List[str],
+    since: datetime,
+    resolution: str
+) -> List[dict]:
+    """Pontos agregados do histórico, em ordem cronológica"""
+    return await db[ROLLUP_COLLECTIONS[resolution]].find(
+        {
+            "product_id": product_id,
+            "supermarket_id": {"$in": supermarket_ids},
+            "period_start": {"$gte": period_start(since, resolution)}
+        },
+        {"_id": 0}
+    ).sort("period_start", 1).to_list(None)
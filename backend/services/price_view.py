@@ -0,0 +1,269 @@
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+from pymongo import UpdateOne, DeleteOne
+import statistics
+import logging
+
+from models.base import as_utc
+from services.alert_engine import evaluate_alerts
+from services.build_marker import BuildMarker
+
+logger = logging.getLogger(__name__)
+
+BEST_PRICES_COLLECTION = "best_prices"
+
+# Gravado ao fim da primeira reconstrução completa; até lá a busca lê as ofertas direto
+best_prices_marker = BuildMarker("best_prices_built")
+
+# Janela de ofertas consideradas "atuais" (a mesma usada pelas rotas de leitura)
+CURRENT_WINDOW = timedelta(days=7)
+
+OFFER_FIELDS = {"_id": 0, "id": 1, "product_id": 1, "supermarket_id": 1, "price": 1,
+                "collected_at": 1, "is_promotion": 1}
+
+
+def _key(scope: str, product_id: str, city_id: str, supermarket_id: Optional[str] = None) -> dict:
+    return {"scope": scope, "product_id": product_id, "city_id": city_id, "supermarket_id": supermarket_id}
+
+
+def summarize(offers: List[dict]) -> dict:
+    """Estatísticas de preço de um grupo de ofertas (menor preço; empate -> mais recente)"""
+    prices = [offer["price"] for offer in offers]
+    best = min(offers, key=lambda o: (o["price"], -as_utc(o["collected_at"]).timestamp()))
+    return {
+        "min": min(prices),
+        "max": max(prices),
+        "median": statistics.median(prices),
+        "count": len(prices),
+        "best_offer": {
+            "id": best["id"],
+            "product_id": best["product_id"],
+            "supermarket_id": best["supermarket_id"],
+            "price": best["price"],
+            "collected_at": best["collected_at"],
+            "is_promotion": best.get("is_promotion", False),
+        },
+    }
+
+
+def _upsert_or_delete(key: dict, offers: List[dict], now: datetime):
+    if not offers:
+        return DeleteOne(key)
+    return UpdateOne(key, {"$set": {**summarize(offers), "updated_at": now}}, upsert=True)
+
+
+async def refresh_best_prices(
+    db,
+    groups: Dict[Tuple[str, str], Iterable[str]],
+    city_supermarkets: Dict[str, List[str]]
+) -> List[dict]:
+    """Recalcula as visões dos (produto, cidade) afetados por inserção ou expiração de ofertas.
+
+    `groups` mapeia cada (produto, cidade) aos supermercados que tiveram ofertas
+    alteradas e `city_supermarkets` lista todos os supermercados de cada cidade.
+    As ofertas atuais são relidas com uma consulta por cidade e as visões gravadas
+    em um único bulk_write. Retorna os novos documentos de escopo cidade (grupos
+    sem ofertas atuais são removidos e não aparecem).
+    """
+    now = datetime.now(timezone.utc)
+    products_by_city: Dict[str, set] = {}
+    for product_id, city_id in groups:
+        products_by_city.setdefault(city_id, set()).add(product_id)
+
+    offers_by_group: Dict[Tuple[str, str], List[dict]] = {}
+    for city_id, product_ids in products_by_city.items():
+        cursor = db.offers.find(
+            {
+                "product_id": {"$in": list(product_ids)},
+                "supermarket_id": {"$in": city_supermarkets.get(city_id, [])},
+                "collected_at": {"$gte": now - CURRENT_WINDOW}
+            },
+            OFFER_FIELDS
+        )
+        async for offer in cursor:
+            offers_by_group.setdefault((offer["product_id"], city_id), []).append(offer)
+
+    operations = []
+    refreshed = []
+    for (product_id, city_id), touched in groups.items():
+        offers = offers_by_group.get((product_id, city_id), [])
+        by_supermarket: Dict[str, List[dict]] = {sid: [] for sid in touched}
+        for offer in offers:
+            if offer["supermarket_id"] in by_supermarket:
+                by_supermarket[offer["supermarket_id"]].append(offer)
+
+        operations.append(_upsert_or_delete(_key("city", product_id, city_id), offers, now))
+        operations.extend(
+            _upsert_or_delete(_key("supermarket", product_id, city_id, sid), group, now)
+            for sid, group in by_supermarket.items()
+        )
+        if offers:
+            refreshed.append({**_key("city", product_id, city_id), **summarize(offers)})
+
+    if operations:
+        await db[BEST_PRICES_COLLECTION].bulk_write(operations, ordered=False)
+    return refreshed
+
+
+async def refresh_for_offers(db, offers: Iterable[dict]) -> None:
+    """Recalcula as visões de todos os (produto, cidade) tocados por um lote de ofertas
+    e dispara os alertas de preço atingidos pelos novos melhores preços"""
+    offers = list(offers)
+    supermarket_ids = {offer["supermarket_id"] for offer in offers}
+    if not supermarket_ids:
+        return
+
+    supermarkets = await db.supermarkets.find(
+        {"id": {"$in": list(supermarket_ids)}},
+        {"_id": 0, "id": 1, "city_id": 1}
+    ).to_list(None)
+    city_of = {s["id"]: s["city_id"] for s in supermarkets}
+
+    groups: Dict[Tuple[str, str], set] = {}
+    for offer in offers:
+        city_id = city_of.get(offer["supermarket_id"])
+        if city_id is not None:
+            groups.setdefault((offer["product_id"], city_id), set()).add(offer["supermarket_id"])
+    if not groups:
+        return
+    city_supermarkets = await _city_supermarkets(db, {city for _, city in groups})
+
+    refreshed = await refresh_best_prices(db, groups, city_supermarkets)
+    await evaluate_alerts(db, refreshed)
+
+
+async def _city_supermarkets(db, city_ids: Iterable[str]) -> Dict[str, List[str]]:
+    result: Dict[str, List[str]] = {}
+    async for s in db.supermarkets.find({"city_id": {"$in": list(city_ids)}}, {"_id": 0, "id": 1, "city_id": 1}):
+        result.setdefault(s["city_id"], []).append(s["id"])
+    return result
+
+
+async def find_city_best_prices(db, product_ids: Iterable[str], city_id: str) -> Dict[str, dict]:
+    """Visão materializada por (produto, cidade), indexada por product_id"""
+    docs = await db[BEST_PRICES_COLLECTION].find(
+        {"product_id": {"$in": list(product_ids)}, "city_id": city_id, "scope": "city"},
+        {"_id": 0}
+    ).to_list(None)
+    return {doc["product_id"]: doc for doc in docs}
+
+
+async def find_product_best_price(db, product_id: str, city_id: Optional[str] = None) -> Optional[dict]:
+    """Melhor preço atual de um produto em uma cidade (ou o menor entre todas as cidades)"""
+    query = {"product_id": product_id, "scope": "city"}
+    if city_id:
+        query["city_id"] = city_id
+    docs = await db[BEST_PRICES_COLLECTION].find(query, {"_id": 0}).sort("best_offer.price", 1).limit(1).to_list(1)
+    return docs[0] if docs else None
+
+
+async def find_nearby_best_prices(
+    db,
+    product_ids: Iterable[str],
+    city_id: str,
+    supermarket_ids: Iterable[str]
+) -> Dict[str, dict]:
+    """Melhor oferta de cada produto restrita a um subconjunto de supermercados (ex.: num raio)"""
+    docs = await db[BEST_PRICES_COLLECTION].find(
+        {
+            "product_id": {"$in": list(product_ids)},
+            "city_id": city_id,
+            "scope": "supermarket",
+            "supermarket_id": {"$in": list(supermarket_ids)}
+        },
+        {"_id": 0, "product_id": 1, "best_offer": 1}
+    ).to_list(None)
+
+    best: Dict[str, dict] = {}
+    for doc in docs:
+        current = best.get(doc["product_id"])
+        if current is None or doc["best_offer"]["price"] < current["best_offer"]["price"]:
+            best[doc["product_id"]] = doc
+    return best
+
+
+async def _current_offers(db, product_ids: Iterable[str], supermarket_ids: Optional[Iterable[str]]) -> List[dict]:
+    query = {
+        "product_id": {"$in": list(product_ids)},
+        "collected_at": {"$gte": datetime.now(timezone.utc) - CURRENT_WINDOW}
+    }
+    if supermarket_ids is not None:
+        query["supermarket_id"] = {"$in": list(supermarket_ids)}
+    return await db.offers.find(query, OFFER_FIELDS).to_list(None)
+
+
+async def find_live_best_prices(
+    db,
+    product_ids: Iterable[str],
+    supermarket_ids: Optional[Iterable[str]]
+) -> Dict[str, dict]:
+    """Mesmo resultado da visão, calculado das ofertas atuais (enquanto ela não foi construída).
+
+    `supermarket_ids` None considera todas as cidades (o menor preço entre elas).
+    """
+    groups: Dict[str, List[dict]] = {}
+    for offer in await _current_offers(db, product_ids, supermarket_ids):
+        groups.setdefault(offer["product_id"], []).append(offer)
+    return {product_id: summarize(group) for product_id, group in groups.items()}
+
+
+async def find_live_supermarket_best_prices(
+    db,
+    product_ids: Iterable[str],
+    supermarket_ids: Iterable[str]
+) -> Dict[Tuple[str, str], dict]:
+    """Equivalente ao vivo do escopo supermercado, indexado por (product_id, supermarket_id)"""
+    groups: Dict[Tuple[str, str], List[dict]] = {}
+    for offer in await _current_offers(db, product_ids, supermarket_ids):
+        groups.setdefault((offer["product_id"], offer["supermarket_id"]), []).append(offer)
+    return {key: summarize(group) for key, group in groups.items()}
+
+
+async def rebuild_best_prices(db, batch_size: int = 1000) -> int:
+    """Reconstrói a coleção inteira a partir das ofertas atuais (ex.: após deploy ou migração)"""
+    now = datetime.now(timezone.utc)
+    supermarkets = await db.supermarkets.find({}, {"_id": 0, "id": 1, "city_id": 1}).to_list(None)
+    city_of = {s["id"]: s["city_id"] for s in supermarkets}
+
+    # Ofertas ordenadas por produto: cada produto é processado e descartado da memória
+    cursor = db.offers.find(
+        {"collected_at": {"$gte": now - CURRENT_WINDOW}},
+        OFFER_FIELDS
+    ).sort("product_id", 1).batch_size(batch_size)
+
+    operations: List = []
+    written = 0
+    current_product: Optional[str] = None
+    groups: Dict[Tuple[str, Optional[str]], List[dict]] = {}
+
+    def flush_product():
+        for (city_id, supermarket_id), group in groups.items():
+            scope = "supermarket" if supermarket_id else "city"
+            operations.append(_upsert_or_delete(_key(scope, current_product, city_id, supermarket_id), group, now))
+        groups.clear()
+
+    async for offer in cursor:
+        city_id = city_of.get(offer["supermarket_id"])
+        if city_id is None:
+            continue
+        if offer["product_id"] != current_product:
+            flush_product()
+            current_product = offer["product_id"]
+        groups.setdefault((city_id, None), []).append(offer)
+        groups.setdefault((city_id, offer["supermarket_id"]), []).append(offer)
+
+        if len(operations) >= batch_size:
+            await db[BEST_PRICES_COLLECTION].bulk_write(operations, ordered=False)
+            written += len(operations)
+            operations.clear()
+
+    flush_product()
+    if operations:
+        await db[BEST_PRICES_COLLECTION].bulk_write(operations, ordered=False)
+        written += len(operations)
+
+    # Grupos que não têm mais nenhuma oferta atual
+    await db[BEST_PRICES_COLLECTION].delete_many({"updated_at": {"$lt": now}})
+    await best_prices_marker.mark(db)
+    logger.info("Visão de melhores preços reconstruída (%d grupos)", written)
+    return written
@@ -0,0 +1,214 @@
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Protocol, Sequence, Tuple
+from urllib.parse import parse_qsl, urlencode
+import hashlib
+import logging
+import os
+import re
+
+from services.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CachedResponse:
+    status: int
+    headers: List[Tuple[bytes, bytes]]
+    body: bytes
+    etag: str
+
+
+class CacheBackend(Protocol):
+    """Armazenamento das respostas e dos contadores de versão por namespace.
+
+    A interface cabe em GET/SETEX/INCR de um Redis: invalidar um namespace é
+    incrementar seu contador, o que muda a chave de todas as entradas dele.
+    """
+
+    async def get(self, key: str) -> Optional[CachedResponse]: ...
+
+    async def set(self, key: str, value: CachedResponse, ttl: float) -> None: ...
+
+    async def versions(self, namespaces: Sequence[str]) -> List[int]: ...
+
+    async def bump(self, namespace: str) -> int: ...
+
+
+class MemoryBackend:
+    """Backend LRU em memória (por processo)"""
+
+    def __init__(self, maxsize: int = 2048):
+        self._entries = TTLCache(maxsize=maxsize)
+        self._versions: Dict[str, int] = {}
+
+    async def get(self, key: str) -> Optional[CachedResponse]:
+        return self._entries.get(key)
+
+    async def set(self, key: str, value: CachedResponse, ttl: float) -> None:
+        self._entries.set(key, value, ttl=ttl)
+
+    async def versions(self, namespaces: Sequence[str]) -> List[int]:
+        return [self._versions.get(namespace, 0) for namespace in namespaces]
+
+    async def bump(self, namespace: str) -> int:
+        self._versions[namespace] = self._versions.get(namespace, 0) + 1
+        return self._versions[namespace]
+
+    def stats(self) -> dict:
+        return self._entries.stats()
+
+
+@dataclass(frozen=True)
+class CacheRule:
+    """Rotas GET cacheáveis: padrão do path, TTL e namespaces que as invalidam"""
+    pattern: str
+    ttl: float
+    namespaces: Tuple[str, ...]
+    regex: "re.Pattern" = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, "regex", re.compile(self.pattern))
+
+
+# Ordem importa: a primeira regra que casar é usada
+CACHE_RULES = [
+    CacheRule(r"^/api/cities$", ttl=300, namespaces=("cities",)),
+    CacheRule(r"^/api/supermarkets(/[^/]+)?$", ttl=300, namespaces=("supermarkets",)),
+    # A busca traz a melhor oferta: também depende dos preços
+    CacheRule(r"^/api/products/search$", ttl=60, namespaces=("products", "prices")),
+    CacheRule(r"^/api/products/[^/]+$", ttl=300, namespaces=("products",)),
+]
+
+
+def make_etag(body: bytes) -> str:
+    """ETag forte: hash do corpo exato da resposta"""
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+class ResponseCache:
+    def __init__(self, backend: CacheBackend, rules: Sequence[CacheRule] = CACHE_RULES, enabled: bool = True):
+        self.backend = backend
+        self.rules = list(rules)
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    def match(self, path: str) -> Optional[CacheRule]:
+        for rule in self.rules:
+            if rule.regex.match(path):
+                return rule
+        return None
+
+    async def key_for(self, rule: CacheRule, path: str, query_string: bytes) -> str:
+        # Parâmetros ordenados: ?a=1&b=2 e ?b=2&a=1 compartilham a entrada
+        query = urlencode(sorted(parse_qsl(query_string.decode("latin-1"), keep_blank_values=True)))
+        versions = await self.backend.versions(rule.namespaces)
+        scope = ",".join(f"{namespace}@{version}" for namespace, version in zip(rule.namespaces, versions))
+        return f"{scope}|{path}?{query}"
+
+    async def invalidate(self, *namespaces: str) -> None:
+        """Descarta (por versão) todas as respostas dos namespaces informados"""
+        for namespace in namespaces:
+            try:
+                await self.backend.bump(namespace)
+            except Exception:
+                logger.exception("Falha ao invalidar o cache de respostas (%s)", namespace)
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "not_modified": self.not_modified}
+
+
+class ResponseCacheMiddleware:
+    """Middleware ASGI: serve GETs cacheáveis da memória e responde 304 a If-None-Match"""
+
+    def __init__(self, app, cache: ResponseCache):
+        self.app = app
+        self.cache = cache
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "GET" or not self.cache.enabled:
+            return await self.app(scope, receive, send)
+
+        rule = self.cache.match(scope["path"])
+        if rule is None:
+            return await self.app(scope, receive, send)
+
+        headers = dict(scope["headers"])
+        if_none_match = headers.get(b"if-none-match", b"").decode("latin-1")
+
+        try:
+            key = await self.cache.key_for(rule, scope["path"], scope["query_string"])
+            cached = await self.cache.backend.get(key)
+        except Exception:
+            # Backend indisponível não pode derrubar a rota
+            logger.exception("Cache de respostas indisponível")
+            return await self.app(scope, receive, send)
+
+        if cached is not None:
+            self.cache.hits += 1
+            return await self._send_cached(send, cached, if_none_match, b"HIT")
+
+        self.cache.misses += 1
+        start: dict = {}
+        chunks: List[bytes] = []
+
+        async def capture(message):
+            if message["type"] == "http.response.start":
+                start.update(message)
+                return
+            if message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+                if not message.get("more_body", False):
+                    await finish()
+
+        async def finish():
+            body = b"".join(chunks)
+            if start["status"] != 200:
+                await send(start)
+                await send({"type": "http.response.body", "body": body})
+                return
+            response_headers = [
+                (name, value) for name, value in start.get("headers", [])
+                if name.lower() not in (b"content-length", b"etag", b"cache-control")
+            ]
+            response = CachedResponse(start["status"], response_headers, body, make_etag(body))
+            try:
+                await self.cache.backend.set(key, response, rule.ttl)
+            except Exception:
+                logger.exception("Falha ao gravar no cache de respostas")
+            await self._send_cached(send, response, if_none_match, b"MISS")
+
+        await self.app(scope, receive, capture)
+
+    async def _send_cached(self, send, response: CachedResponse, if_none_match: str, state: bytes):
+        headers = response.headers + [
+            (b"etag", response.etag.encode("latin-1")),
+            # O navegador guarda a resposta, mas sempre revalida com If-None-Match
+            (b"cache-control", b"no-cache"),
+            (b"x-cache", state),
+        ]
+        if etag_matches(if_none_match, response.etag):
+            self.cache.not_modified += 1
+            headers = [(name, value) for name, value in headers if name.lower() != b"content-type"]
+            await send({"type": "http.response.start", "status": 304, "headers": headers})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        headers.append((b"content-length", str(len(response.body)).encode("latin-1")))
+        await send({"type": "http.response.start", "status": response.status, "headers": headers})
+        await send({"type": "http.response.body", "body": response.body})
+
+
+response_cache = ResponseCache(
+    backend=MemoryBackend(maxsize=int(os.environ.get("RESPONSE_CACHE_MAX_SIZE", 2048))),
+    enabled=os.environ.get("RESPONSE_CACHE_ENABLED", "true").lower() == "true"
+)
@@ -0,0 +1,313 @@
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Dict, List, Optional, Set
+from zoneinfo import ZoneInfo
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+import asyncio
+import logging
+import os
+import random
+import socket
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+LEASE_COLLECTION = "scheduler_leases"
+
+# Expressões cron são avaliadas no fuso dos usuários, como os agregados de preço
+SCHEDULER_TIMEZONE = os.environ.get("SCHEDULER_TIMEZONE", "America/Sao_Paulo")
+
+JobFunc = Callable[..., Awaitable[object]]
+
+
+class IntervalSchedule:
+    def __init__(self, seconds: float):
+        if seconds <= 0:
+            raise ValueError("Intervalo deve ser positivo")
+        self.seconds = seconds
+
+    def next_after(self, moment: datetime) -> datetime:
+        return moment + timedelta(seconds=self.seconds)
+
+    def __repr__(self):
+        return f"every {self.seconds:g}s"
+
+
+class CronSchedule:
+    """Cron de 5 campos (minuto hora dia mês dia-da-semana) com *, */n, a-b, a-b/n e listas"""
+
+    RANGES = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 6)]
+
+    def __init__(self, expression: str, tz: str = SCHEDULER_TIMEZONE):
+        parts = expression.split()
+        if len(parts) != 5:
+            raise ValueError(f"Expressão cron inválida: {expression!r}")
+        self.expression = expression
+        self.zone = ZoneInfo(tz)
+        self.minutes, self.hours, self.days, self.months, self.weekdays = (
+            self._parse(part, low, high) for part, (low, high) in zip(parts, self.RANGES)
+        )
+        # Como no cron: se dia e dia-da-semana forem restritos, basta um dos dois casar
+        self._any_day = parts[2] == "*"
+        self._any_weekday = parts[4] == "*"
+        # Expressões que nunca casam (ex.: 31 de fevereiro) falham já no registro do job
+        self.next_after(datetime.now(timezone.utc))
+
+    @staticmethod
+    def _parse(field: str, low: int, high: int) -> Set[int]:
+        values: Set[int] = set()
+        for item in field.split(","):
+            spec, slash, step = item.partition("/")
+            try:
+                if spec == "*":
+                    start, end = low, high
+                elif "-" in spec:
+                    start, end = (int(v) for v in spec.split("-"))
+                else:
+                    # "a/n": de a até o máximo do campo, de n em n
+                    start = int(spec)
+                    end = high if slash else start
+                step = int(step) if slash else 1
+            except ValueError:
+                raise ValueError(f"Campo cron inválido: {item!r}")
+            if start < low or end > high or start > end or step < 1:
+                raise ValueError(f"Campo cron fora do intervalo: {item!r}")
+            values.update(range(start, end + 1, step))
+        return values
+
+    def _day_matches(self, moment: datetime) -> bool:
+        day_ok = moment.day in self.days
+        # Python: segunda = 0; cron: domingo = 0
+        weekday_ok = (moment.weekday() + 1) % 7 in self.weekdays
+        if self._any_day or self._any_weekday:
+            return day_ok and weekday_ok
+        return day_ok or weekday_ok
+
+    def next_after(self, moment: datetime) -> datetime:
+        local = moment.astimezone(self.zone).replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = local + timedelta(days=366 * 4)
+        while local < limit:
+            if local.month not in self.months or not self._day_matches(local):
+                local = (local + timedelta(days=1)).replace(hour=0, minute=0)
+                continue
+            if local.hour not in self.hours:
+                local = (local + timedelta(hours=1)).replace(minute=0)
+                continue
+            if local.minute not in self.minutes:
+                local += timedelta(minutes=1)
+                continue
+            return local.astimezone(timezone.utc)
+        raise ValueError(f"Expressão cron sem próxima execução: {self.expression!r}")
+
+    def __repr__(self):
+        return f"cron {self.expression!r}"
+
+
+class LeaseLock:
+    """Lease no MongoDB: só o dono (um worker) executa o job até o lease expirar"""
+
+    def __init__(self, db, owner: str):
+        self.db = db
+        self.owner = owner
+
+    async def acquire(self, name: str, seconds: float) -> bool:
+        now = datetime.now(timezone.utc)
+        try:
+            lease = await self.db[LEASE_COLLECTION].find_one_and_update(
+                {"_id": name, "$or": [{"expires_at": {"$lte": now}}, {"owner": self.owner}]},
+                {"$set": {"owner": self.owner, "expires_at": now + timedelta(seconds=seconds), "acquired_at": now}},
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+        except DuplicateKeyError:
+            # Outro worker tem um lease válido (o upsert colidiu com o documento existente)
+            return False
+        return lease is not None and lease["owner"] == self.owner
+
+    async def renew(self, name: str, seconds: float) -> bool:
+        result = await self.db[LEASE_COLLECTION].update_one(
+            {"_id": name, "owner": self.owner},
+            {"$set": {"expires_at": datetime.now(timezone.utc) + timedelta(seconds=seconds)}}
+        )
+        return result.matched_count == 1
+
+    async def release(self, name: str, until: Optional[datetime] = None):
+        """Mantém o lease até `until` (próximo horário do job) para que os demais workers,
+        que acordam no mesmo horário com outro jitter, não repitam a execução"""
+        now = datetime.now(timezone.utc)
+        await self.db[LEASE_COLLECTION].update_one(
+            {"_id": name, "owner": self.owner},
+            {"$set": {"expires_at": max(until, now) if until else now}}
+        )
+
+
+@dataclass
+class Job:
+    name: str
+    func: JobFunc
+    schedule: object
+    jitter: float = 0.0
+    max_concurrency: int = 1
+    # Jobs de estado em memória (ex.: índice de busca) rodam em todos os workers: lease=False
+    lease: bool = True
+    lease_seconds: float = 300.0
+    run_on_start: bool = False
+    # Métricas
+    runs: int = 0
+    failures: int = 0
+    skipped: int = 0
+    running: int = 0
+    last_started: Optional[datetime] = None
+    last_finished: Optional[datetime] = None
+    last_duration: Optional[float] = None
+    last_error: Optional[str] = None
+    next_run: Optional[datetime] = None
+    _tasks: Set[asyncio.Task] = field(default_factory=set, repr=False)
+
+    def stats(self) -> dict:
+        return {
+            "schedule": repr(self.schedule),
+            "lease": self.lease,
+            "runs": self.runs,
+            "failures": self.failures,
+            "skipped": self.skipped,
+            "running": self.running,
+            "last_started": self.last_started,
+            "last_finished": self.last_finished,
+            "last_duration_seconds": self.last_duration,
+            "last_error": self.last_error,
+            "next_run": self.next_run,
+        }
+
+
+class Scheduler:
+    """Agendador asyncio do próprio processo da API (jobs por intervalo ou cron)"""
+
+    def __init__(self):
+        self.jobs: Dict[str, Job] = {}
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._db = None
+        self._lock: Optional[LeaseLock] = None
+        self._loops: List[asyncio.Task] = []
+
+    def add_job(self, name: str, func: JobFunc, schedule, **options) -> Job:
+        if name in self.jobs:
+            raise ValueError(f"Job já registrado: {name}")
+        job = Job(name=name, func=func, schedule=schedule, **options)
+        self.jobs[name] = job
+        return job
+
+    @property
+    def started(self) -> bool:
+        return self._db is not None
+
+    def start(self, db):
+        self._db = db
+        self._lock = LeaseLock(db, self.owner)
+        self._loops = [asyncio.create_task(self._loop(job), name=f"job:{job.name}") for job in self.jobs.values()]
+        logger.info("Agendador iniciado com %d job(s)", len(self._loops))
+
+    async def stop(self):
+        tasks = self._loops + [task for job in self.jobs.values() for task in job._tasks]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._loops = []
+
+    def _reschedule(self, job: Job) -> bool:
+        """Calcula o próximo horário do job; sem ele o job para e o erro fica visível em /admin/jobs"""
+        try:
+            job.next_run = job.schedule.next_after(datetime.now(timezone.utc))
+            return True
+        except Exception as e:
+            job.failures += 1
+            job.last_error = f"{type(e).__name__}: {e}"
+            job.next_run = None
+            logger.exception("Falha ao calcular a próxima execução do job %s; job interrompido", job.name)
+            return False
+
+    async def _loop(self, job: Job):
+        if job.run_on_start:
+            job.next_run = datetime.now(timezone.utc)
+        elif not self._reschedule(job):
+            return
+        while True:
+            delay = (job.next_run - datetime.now(timezone.utc)).total_seconds()
+            # Jitter evita que vários workers (ou jobs) acordem no mesmo instante
+            await asyncio.sleep(max(0.0, delay) + random.uniform(0, job.jitter))
+            if not self._reschedule(job):
+                return
+
+            if job.running >= job.max_concurrency:
+                job.skipped += 1
+                logger.warning("Job %s ainda em execução; execução pulada", job.name)
+                continue
+
+            task = asyncio.create_task(self._run(job))
+            job._tasks.add(task)
+            task.add_done_callback(job._tasks.discard)
+
+    async def run_now(self, name: str) -> None:
+        """Executa um job imediatamente (respeitando lease e concorrência)"""
+        if not self.started:
+            raise RuntimeError("Agendador não iniciado")
+        await self._run(self.jobs[name])
+
+    async def _run(self, job: Job):
+        if job.running >= job.max_concurrency:
+            job.skipped += 1
+            return
+        job.running += 1
+        heartbeat = None
+        try:
+            if job.lease:
+                try:
+                    acquired = await self._lock.acquire(job.name, job.lease_seconds)
+                except Exception:
+                    logger.exception("Falha ao obter o lease do job %s", job.name)
+                    acquired = False
+                if not acquired:
+                    job.skipped += 1
+                    return
+                heartbeat = asyncio.create_task(self._heartbeat(job))
+
+            job.last_started = datetime.now(timezone.utc)
+            started = time.perf_counter()
+            try:
+                await job.func(self._db)
+                job.last_error = None
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                job.failures += 1
+                job.last_error = f"{type(e).__name__}: {e}"
+                logger.exception("Falha no job %s", job.name)
+            finally:
+                job.runs += 1
+                job.last_duration = time.perf_counter() - started
+                job.last_finished = datetime.now(timezone.utc)
+        finally:
+            job.running -= 1
+            if heartbeat:
+                heartbeat.cancel()
+                try:
+                    await self._lock.release(job.name, until=job.next_run)
+                except Exception:
+                    logger.exception("Falha ao liberar o lease do job %s", job.name)
+
+    async def _heartbeat(self, job: Job):
+        """Renova o lease enquanto o job roda, para que execuções longas não sejam duplicadas"""
+        while True:
+            await asyncio.sleep(job.lease_seconds / 3)
+            try:
+                await self._lock.renew(job.name, job.lease_seconds)
+            except Exception:
+                logger.exception("Falha ao renovar o lease do job %s", job.name)
+
+    def stats(self) -> dict:
+        return {"owner": self.owner, "jobs": {name: job.stats() for name, job in self.jobs.items()}}
+
+
+scheduler = Scheduler()
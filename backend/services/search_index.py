@@ -0,0 +1,241 @@
+from bisect import bisect_left
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set
+import logging
+import re
+
+from services.search_service import normalize_text, text_normalizer
+from services.fuzzy_matcher import FuzzyMatcher
+from models.base import as_utc
+
+logger = logging.getLogger(__name__)
+
+INDEXED_FIELDS = ("canonical_name", "display_name", "brand")
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Pesos por tipo de casamento de um termo da busca com um token do catálogo
+EXACT_SCORE = 3.0
+PREFIX_SCORE = 2.0
+SUBSTRING_SCORE = 1.0
+# Bônus quando o termo abre o nome canônico ("leite" > "chocolate ao leite")
+LEADING_BONUS = 0.5
+# Correções por similaridade consideradas para um termo sem nenhum casamento
+MAX_CORRECTIONS = 3
+
+
+def tokenize(text: str) -> List[str]:
+    """Quebra um texto já normalizado em tokens alfanuméricos"""
+    return TOKEN_PATTERN.findall(text)
+
+
+def trigrams(token: str) -> Set[str]:
+    return {token[i:i + 3] for i in range(len(token) - 2)}
+
+
+def _changed_at(product: dict) -> Optional[datetime]:
+    dates = [as_utc(product.get(field)) for field in ("updated_at", "created_at")]
+    return max(filter(None, dates), default=None)
+
+
+class ProductSearchIndex:
+    """Índice invertido em memória (tokens + trigramas) sobre o catálogo de produtos"""
+
+    def __init__(self):
+        self.products: Dict[str, dict] = {}
+        self.ready = False
+        self.last_refresh: Optional[datetime] = None
+        self._postings: Dict[str, Set[str]] = defaultdict(set)   # token -> ids de produto
+        self._trigrams: Dict[str, Set[str]] = defaultdict(set)   # trigrama -> tokens
+        self._doc_tokens: Dict[str, Set[str]] = {}
+        self._leading_tokens: Dict[str, str] = {}
+        self._sorted_tokens: List[str] = []
+        self._dirty = False
+        self._fuzzy: Optional[FuzzyMatcher] = None
+
+    def __len__(self):
+        return len(self.products)
+
+    # ---------- manutenção ----------
+
+    def _document_tokens(self, product: dict) -> Set[str]:
+        texts = [product.get(field) or "" for field in INDEXED_FIELDS]
+        texts.extend(product.get("synonyms") or [])
+        tokens = set()
+        for text in text_normalizer.normalize_many(texts):
+            tokens.update(tokenize(text))
+        return tokens
+
+    def upsert(self, product: dict):
+        """Adiciona ou atualiza um produto no índice"""
+        product_id = product["id"]
+        self.remove(product_id)
+
+        tokens = self._document_tokens(product)
+        for token in tokens:
+            if token not in self._postings:
+                for gram in trigrams(token):
+                    self._trigrams[gram].add(token)
+                self._dirty = True
+                self._fuzzy = None
+            self._postings[token].add(product_id)
+
+        leading = tokenize(text_normalizer.normalize_many([product.get("canonical_name") or ""])[0])
+        self._doc_tokens[product_id] = tokens
+        self._leading_tokens[product_id] = leading[0] if leading else ""
+        self.products[product_id] = product
+
+    def remove(self, product_id: str):
+        """Remove um produto do índice"""
+        tokens = self._doc_tokens.pop(product_id, None)
+        self._leading_tokens.pop(product_id, None)
+        self.products.pop(product_id, None)
+        if not tokens:
+            return
+
+        for token in tokens:
+            postings = self._postings.get(token)
+            if postings is None:
+                continue
+            postings.discard(product_id)
+            if not postings:
+                del self._postings[token]
+                for gram in trigrams(token):
+                    self._trigrams[gram].discard(token)
+                    if not self._trigrams[gram]:
+                        del self._trigrams[gram]
+                self._dirty = True
+                self._fuzzy = None
+
+    def load(self, products: Iterable[dict]):
+        """Reconstrói o índice a partir de uma lista completa de produtos"""
+        self.products.clear()
+        self._postings.clear()
+        self._trigrams.clear()
+        self._doc_tokens.clear()
+        self._leading_tokens.clear()
+        for product in products:
+            self.upsert(product)
+        self.ready = True
+
+    # ---------- consulta ----------
+
+    def _tokens_with_prefix(self, prefix: str) -> Iterable[str]:
+        if self._dirty:
+            self._sorted_tokens = sorted(self._postings)
+            self._dirty = False
+
+        i = bisect_left(self._sorted_tokens, prefix)
+        while i < len(self._sorted_tokens) and self._sorted_tokens[i].startswith(prefix):
+            yield self._sorted_tokens[i]
+            i += 1
+
+    def _match_term(self, term: str) -> Dict[str, float]:
+        scores: Dict[str, float] = {}
+
+        def add(token: str, score: float):
+            for product_id in self._postings.get(token, ()):
+                if scores.get(product_id, 0) < score:
+                    scores[product_id] = score
+
+        if len(term) >= 3:
+            # Casamento por substring: tokens que contêm todos os trigramas do termo
+            grams = sorted(trigrams(term), key=lambda g: len(self._trigrams.get(g, ())))
+            candidates = set(self._trigrams.get(grams[0], ()))
+            for gram in grams[1:]:
+                candidates &= self._trigrams.get(gram, set())
+                if not candidates:
+                    break
+            for token in candidates:
+                if term in token:
+                    add(token, SUBSTRING_SCORE)
+
+        for token in self._tokens_with_prefix(term):
+            add(token, EXACT_SCORE if token == term else PREFIX_SCORE)
+
+        if not scores:
+            # Tolerância a erros de digitação: "lete" -> "leite", "arros" -> "arroz"
+            for token, similarity in self._fuzzy_matcher().top(term, MAX_CORRECTIONS):
+                add(token, EXACT_SCORE * similarity)
+
+        return scores
+
+    def _fuzzy_matcher(self) -> FuzzyMatcher:
+        # Matcher vetorizado sobre o vocabulário, reconstruído quando ele muda
+        if self._fuzzy is None:
+            self._fuzzy = FuzzyMatcher.from_texts(self._postings.keys())
+        return self._fuzzy
+
+    def search_ids(self, query: str, limit: int = 20) -> List[str]:
+        """Retorna ids de produtos ranqueados; todos os termos da busca precisam casar"""
+        terms = tokenize(normalize_text(query))
+        if not terms:
+            return []
+
+        scores: Optional[Dict[str, float]] = None
+        for term in dict.fromkeys(terms):
+            matches = self._match_term(term)
+            if scores is None:
+                scores = matches
+            else:
+                scores = {pid: score + matches[pid] for pid, score in scores.items() if pid in matches}
+            if not scores:
+                return []
+
+        for product_id in scores:
+            if self._leading_tokens[product_id].startswith(terms[0]):
+                scores[product_id] += LEADING_BONUS
+
+        ranked = sorted(
+            scores.items(),
+            key=lambda item: (-item[1], self.products[item[0]].get("display_name", ""))
+        )
+        return [product_id for product_id, _ in ranked[:limit]]
+
+    def search(self, query: str, limit: int = 20) -> List[dict]:
+        """Retorna cópias dos documentos de produto ranqueados"""
+        return [dict(self.products[pid]) for pid in self.search_ids(query, limit)]
+
+    # ---------- sincronização com o MongoDB ----------
+
+    async def build(self, db):
+        """Carrega o catálogo completo do banco"""
+        products = await db.products.find({}, {"_id": 0}).to_list(None)
+        self.load(products)
+        self.last_refresh = max(filter(None, map(_changed_at, products)), default=None)
+        logger.info("Índice de busca construído com %d produtos", len(self.products))
+
+    async def refresh(self, db) -> int:
+        """Aplica incrementalmente produtos criados, alterados ou removidos desde o último refresh.
+
+        Alterações são detectadas por `updated_at`/`created_at`; inclusões sem data e
+        remoções, comparando os ids do catálogo (consulta coberta pelo índice de id).
+        Retorna o número de produtos (re)indexados ou removidos.
+        """
+        if not self.ready:
+            await self.build(db)
+            return len(self.products)
+
+        ids = set()
+        async for product in db.products.find({}, {"_id": 0, "id": 1}):
+            ids.add(product["id"])
+        removed = [product_id for product_id in self.products if product_id not in ids]
+        for product_id in removed:
+            self.remove(product_id)
+
+        clauses = [{"id": {"$in": list(ids - self.products.keys())}}]
+        if self.last_refresh:
+            clauses.append({"created_at": {"$gt": self.last_refresh}})
+            clauses.append({"updated_at": {"$gt": self.last_refresh}})
+
+        changed = 0
+        async for product in db.products.find({"$or": clauses}, {"_id": 0}):
+            self.upsert(product)
+            changed += 1
+            changed_at = _changed_at(product)
+            if changed_at and (self.last_refresh is None or changed_at > self.last_refresh):
+                self.last_refresh = changed_at
+        return changed + len(removed)
+
+
+product_index = ProductSearchIndex()
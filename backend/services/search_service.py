@@ -1,40 +1,104 @@
 import unicodedata
 import re
-from typing import List
+import json
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
 
+from services.fuzzy_matcher import ngram_similarity
 
-def normalize_text(text: str) -> str:
-    """Normaliza texto para busca"""
-    # Lowercase
-    text = text.lower()
-    
-    # Remover acentos
-    text = ''.join(
+SEARCH_TERMS_PATH = Path(__file__).parent / "data" / "search_terms.json"
+
+
+def _build_accent_table() -> Dict[int, Optional[str]]:
+    """Tabela de tradução que remove acentos dos caracteres latinos"""
+    table: Dict[int, Optional[str]] = {}
+    for codepoint in range(0xC0, 0x250):
+        char = chr(codepoint)
+        base = ''.join(
+            c for c in unicodedata.normalize('NFD', char)
+            if unicodedata.category(c) != 'Mn'
+        )
+        if base != char:
+            table[codepoint] = base
+    # Marcas combinantes soltas (texto já decomposto)
+    for codepoint in range(0x300, 0x370):
+        table[codepoint] = None
+    return table
+
+
+def _strip_accents_slow(text: str) -> str:
+    return ''.join(
         c for c in unicodedata.normalize('NFD', text)
         if unicodedata.category(c) != 'Mn'
     )
-    
-    # Remover stopwords
-    stopwords = ["de", "da", "do", "para", "com", "sem", "o", "a"]
-    words = text.split()
-    words = [w for w in words if w not in stopwords]
-    
-    text = ' '.join(words)
-    
-    # Normalizar unidades
-    text = re.sub(r'\b1\s?l\b', '1000ml', text)
-    text = re.sub(r'\b2\s?l\b', '2000ml', text)
-    text = re.sub(r'\b(\d+)\s?kg\b', lambda m: f"{int(m.group(1))*1000}g", text)
-    text = re.sub(r'\b(\d+)\s?litros?\b', lambda m: f"{int(m.group(1))*1000}ml", text)
-    
-    # Sinônimos comuns
-    text = text.replace("refri", "refrigerante")
-    text = text.replace("coca", "coca-cola")
-    
-    return text.strip()
+
+
+class TextNormalizer:
+    """Normalizador de texto para busca com regexes pré-compiladas e cache LRU"""
+
+    ACCENT_TABLE = _build_accent_table()
+    # Números decimais ("1,5l") ficam de fora para não virarem "1,5000ml"
+    LITERS_PATTERN = re.compile(r'(?<![\d.,])\b(\d+)\s?(?:l|litros?)\b')
+    KILOS_PATTERN = re.compile(r'(?<![\d.,])\b(\d+)\s?kg\b')
+
+    def __init__(self, stopwords: Iterable[str], synonyms: Dict[str, str], cache_size: int = 4096):
+        self.stopwords = frozenset(stopwords)
+        self.synonyms = dict(synonyms)
+        # Sinônimos só casam palavras inteiras: "coca" não pode virar "coca-cola-cola"
+        self.synonyms_pattern = re.compile(
+            r'(?<![\w-])(' + '|'.join(
+                re.escape(term) for term in sorted(self.synonyms, key=len, reverse=True)
+            ) + r')(?![\w-])'
+        ) if self.synonyms else None
+        self._cached = lru_cache(maxsize=cache_size)(self._normalize)
+
+    @classmethod
+    def from_file(cls, path: Path = SEARCH_TERMS_PATH, **kwargs) -> "TextNormalizer":
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(data.get("stopwords", []), data.get("synonyms", {}), **kwargs)
+
+    def _normalize(self, text: str) -> str:
+        # Lowercase e remoção de acentos
+        text = text.lower().translate(self.ACCENT_TABLE)
+        if not text.isascii():
+            text = _strip_accents_slow(text)
+
+        # Remover stopwords
+        text = ' '.join(w for w in text.split() if w not in self.stopwords)
+
+        # Normalizar unidades
+        text = self.LITERS_PATTERN.sub(lambda m: f"{int(m.group(1)) * 1000}ml", text)
+        text = self.KILOS_PATTERN.sub(lambda m: f"{int(m.group(1)) * 1000}g", text)
+
+        # Sinônimos comuns
+        if self.synonyms_pattern is not None:
+            text = self.synonyms_pattern.sub(lambda m: self.synonyms[m.group(1)], text)
+
+        return text.strip()
+
+    def __call__(self, text: str) -> str:
+        """Normaliza um texto (com cache para buscas repetidas)"""
+        return self._cached(text)
+
+    def normalize_many(self, texts: Iterable[str]) -> List[str]:
+        """Normaliza textos em lote (ex.: catálogo inteiro) sem poluir o cache de buscas"""
+        normalize = self._normalize
+        return [normalize(text) for text in texts]
+
+    def cache_info(self):
+        return self._cached.cache_info()
+
+
+text_normalizer = TextNormalizer.from_file()
+
+
+def normalize_text(text: str) -> str:
+    """Normaliza texto para busca"""
+    return text_normalizer(text)
 
 
 def calculate_similarity(str1: str, str2: str) -> float:
     """Calcula similaridade entre duas strings (0-1)"""
-    from difflib import SequenceMatcher
-    return SequenceMatcher(None, str1, str2).ratio()
+    return ngram_similarity(str1, str2)
@@ -0,0 +1,93 @@
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+import asyncio
+import os
+
+from services.cache import TTLCache
+
+# Campos usados para enriquecer respostas (ofertas, busca, histórico e distância)
+DIRECTORY_PROJECTION = {"_id": 0, "id": 1, "name": 1, "chain": 1, "address": 1, "location": 1}
+
+
+@dataclass(frozen=True)
+class CityDirectory:
+    """Supermercados de uma cidade: ids para filtros $in e um mapa enxuto por id"""
+    city_id: str
+    version: Tuple[int, int]
+    ids: Tuple[str, ...]
+    supermarkets: Dict[str, dict]
+
+    def get(self, supermarket_id: str) -> Optional[dict]:
+        return self.supermarkets.get(supermarket_id)
+
+    def name_of(self, supermarket_id: str, default: str = "Desconhecido") -> str:
+        supermarket = self.supermarkets.get(supermarket_id)
+        return supermarket["name"] if supermarket else default
+
+
+class SupermarketDirectory:
+    """Cache cidade -> supermercados, compartilhado pelas rotas de leitura.
+
+    Nenhuma rota da API grava supermercados: eles mudam só por scripts
+    (generate_data, migrate_geo), em outro processo. Na prática o cache é
+    invalidado apenas pelo TTL (SUPERMARKET_CACHE_TTL_SECONDS, 5 min por padrão),
+    e é esse o atraso máximo para uma alteração aparecer nas rotas de leitura.
+
+    invalidate() serve a escritas no próprio processo (ex.: o benchmark, que
+    regera os dados): cada cidade tem um número de versão, invalidar incrementa
+    a versão, e uma carga iniciada antes da invalidação não grava seu resultado.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 300.0):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._generation = 0
+        self._versions: Dict[str, int] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    def version(self, city_id: str) -> Tuple[int, int]:
+        return self._generation, self._versions.get(city_id, 0)
+
+    async def get(self, db, city_id: str) -> CityDirectory:
+        directory = self._cache.get(city_id)
+        if directory is not None and directory.version == self.version(city_id):
+            return directory
+
+        # Uma única carga por cidade, mesmo com várias requisições simultâneas
+        lock = self._locks.setdefault(city_id, asyncio.Lock())
+        async with lock:
+            directory = self._cache.get(city_id)
+            if directory is not None and directory.version == self.version(city_id):
+                return directory
+
+            version = self.version(city_id)
+            supermarkets = await db.supermarkets.find(
+                {"city_id": city_id},
+                DIRECTORY_PROJECTION
+            ).sort("id", 1).to_list(None)
+            directory = CityDirectory(
+                city_id=city_id,
+                version=version,
+                ids=tuple(s["id"] for s in supermarkets),
+                supermarkets={s["id"]: s for s in supermarkets},
+            )
+            if version == self.version(city_id):
+                self._cache.set(city_id, directory)
+            return directory
+
+    def invalidate(self, city_id: Optional[str] = None):
+        """Descarta uma cidade (ou todas, sem argumento)"""
+        if city_id is None:
+            self._generation += 1
+            self._cache.clear()
+            return
+        self._versions[city_id] = self._versions.get(city_id, 0) + 1
+        self._cache.invalidate(city_id)
+
+    def stats(self) -> dict:
+        return self._cache.stats()
+
+
+supermarket_directory = SupermarketDirectory(
+    maxsize=int(os.environ.get("SUPERMARKET_CACHE_MAX_SIZE", 1024)),
+    ttl=float(os.environ.get("SUPERMARKET_CACHE_TTL_SECONDS", 300))
+)
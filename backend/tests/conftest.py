@@ -0,0 +1,42 @@
+import pytest
+
+from services.auth_service import create_access_token, user_cache
+from services.database import database
+from services.offer_ingest import known_products, known_supermarkets
+from services.price_view import best_prices_marker
+from services.price_rollup import rollups_marker
+from services.response_cache import MemoryBackend, response_cache
+from services.supermarket_directory import supermarket_directory
+
+
+@pytest.fixture
+def db():
+    """Banco em memória (mongomock) no lugar do pool compartilhado; singletons zerados"""
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+    mock_db = mongomock_motor.AsyncMongoMockClient(tz_aware=True)["test_database"]
+    database.use(mock_db)
+    for cache in (known_products, known_supermarkets):
+        cache.invalidate()
+    for marker in (best_prices_marker, rollups_marker):
+        marker.reset()
+    user_cache.clear()
+    supermarket_directory.invalidate()
+    response_cache.backend = MemoryBackend()
+    yield mock_db
+    database.close()
+
+
+@pytest.fixture
+def client(db):
+    """TestClient da API sem o lifespan (sem índices, índice de busca nem agendador)"""
+    from fastapi.testclient import TestClient
+    from server import app
+    return TestClient(app)
+
+
+@pytest.fixture
+def auth_header():
+    """Bearer token para um usuário; claims extras (ex.: role) simulam AUTH_EMBED_CLAIMS"""
+    def make(user_id: str, **claims) -> dict:
+        return {"Authorization": f"Bearer {create_access_token({'sub': user_id, **claims})}"}
+    return make
@@ -0,0 +1,95 @@
+from datetime import datetime, timedelta, timezone
+import asyncio
+
+import pytest
+
+from services.alert_engine import evaluate_alerts, evaluate_all_alerts, evaluate_new_alert
+
+T0 = datetime(2026, 3, 2, 12, 0, tzinfo=timezone.utc)
+
+
+def best_price(product_id: str, city_id: str, price: float, supermarket_id: str = "s1") -> dict:
+    return {
+        "scope": "city", "product_id": product_id, "city_id": city_id, "supermarket_id": None,
+        "best_offer": {"id": f"{product_id}-{city_id}-{price}", "product_id": product_id,
+                       "supermarket_id": supermarket_id, "price": price},
+    }
+
+
+def alert(alert_id: str, target_price: float, product_id: str = "p1", city_id=None, active: bool = True) -> dict:
+    return {"id": alert_id, "product_id": product_id, "city_id": city_id, "target_price": target_price,
+            "active": active, "triggered_at": None}
+
+
+def insert_alerts(db, *alerts):
+    asyncio.run(db.alerts.insert_many([dict(a) for a in alerts]))
+
+
+def find_alert(db, alert_id: str) -> dict:
+    return asyncio.run(db.alerts.find_one({"id": alert_id}, {"_id": 0}))
+
+
+def test_triggers_only_alerts_whose_target_is_reached(db):
+    insert_alerts(
+        db,
+        alert("reached", 10.0),
+        alert("exact", 9.5),
+        alert("above", 9.0),
+        alert("other_city", 20.0, city_id="c2"),
+        alert("inactive", 20.0, active=False),
+        alert("other_product", 20.0, product_id="p2"),
+    )
+
+    triggered = asyncio.run(evaluate_alerts(db, [best_price("p1", "c1", 9.5)], now=T0))
+
+    assert triggered == 2
+    assert {doc["id"] for doc in asyncio.run(db.alerts.find({"triggered_at": T0}).to_list(None))} == {"reached", "exact"}
+    assert find_alert(db, "reached")["trigger"] == {
+        "price": 9.5, "offer_id": "p1-c1-9.5", "supermarket_id": "s1", "city_id": "c1"
+    }
+
+
+def test_alert_is_never_triggered_twice(db):
+    insert_alerts(db, alert("a1", 10.0, city_id="c1"))
+
+    assert asyncio.run(evaluate_alerts(db, [best_price("p1", "c1", 9.0)], now=T0)) == 1
+    # Preço cai mais, o job diário reavalia tudo: o disparo original é mantido
+    later = T0 + timedelta(days=1)
+    assert asyncio.run(evaluate_alerts(db, [best_price("p1", "c1", 8.0)], now=later)) == 0
+    asyncio.run(db.best_prices.insert_one(best_price("p1", "c1", 7.0)))
+    assert asyncio.run(evaluate_all_alerts(db)) == 0
+
+    doc = find_alert(db, "a1")
+    assert doc["triggered_at"] == T0
+    assert doc["trigger"]["price"] == 9.0
+
+
+def test_city_less_alert_records_the_cheapest_city(db):
+    insert_alerts(db, alert("anywhere", 10.0))
+
+    batch = [best_price("p1", "c1", 9.0), best_price("p1", "c2", 8.0, supermarket_id="s2")]
+    assert asyncio.run(evaluate_alerts(db, batch, now=T0)) == 1
+    assert find_alert(db, "anywhere")["trigger"]["city_id"] == "c2"
+
+
+def test_evaluate_all_alerts_keeps_each_product_in_one_batch(db):
+    insert_alerts(db, alert("p1", 10.0), alert("p2", 10.0, product_id="p2"))
+    asyncio.run(db.best_prices.insert_many([
+        best_price("p1", "c1", 9.0),
+        best_price("p1", "c2", 7.0, supermarket_id="s2"),
+        best_price("p2", "c1", 5.0),
+    ]))
+
+    assert asyncio.run(evaluate_all_alerts(db, batch_size=1)) == 2
+    assert find_alert(db, "p1")["trigger"]["price"] == 7.0
+
+
+@pytest.mark.parametrize("current, expected", [(9.0, True), (10.0, True), (11.0, False), (None, False)])
+def test_new_alert_triggers_against_the_current_best_price(db, current, expected):
+    new = alert("new", 10.0, city_id="c1")
+    insert_alerts(db, new)
+    price = best_price("p1", "c1", current) if current is not None else None
+
+    assert asyncio.run(evaluate_new_alert(db, new, price, now=T0)) is expected
+    # Já disparado: não dispara de novo
+    assert asyncio.run(evaluate_new_alert(db, new, price, now=T0)) is False
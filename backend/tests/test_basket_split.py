@@ -0,0 +1,129 @@
+import itertools
+
+import numpy as np
+import pytest
+
+import services.basket as basket
+from services.basket import PriceMatrix, solve_split
+
+
+def make_matrix(rng: np.random.Generator, products: int, stores: int, missing: float) -> PriceMatrix:
+    base = rng.uniform(2, 40, products)[:, None]
+    prices = base * rng.uniform(0.8, 1.25, (products, stores))
+    prices[rng.random((products, stores)) < missing] = np.nan
+    return PriceMatrix(
+        product_ids=tuple(f"prod-{i}" for i in range(products)),
+        supermarket_ids=tuple(f"market-{j}" for j in range(stores)),
+        quantities=rng.integers(1, 4, products).astype(float),
+        prices=prices,
+        offers={},
+    )
+
+
+def brute_force(matrix: PriceMatrix, max_stores: int, visit_cost: float):
+    """(itens sem oferta nas lojas escolhidas, custo total) ótimos por enumeração"""
+    covered = matrix.available.any(axis=1)
+    costs = np.where(matrix.available, matrix.costs, np.inf)[covered]
+    best = (int(covered.sum()), 0.0)  # nenhuma loja visitada
+    for size in range(1, max_stores + 1):
+        for columns in itertools.combinations(range(costs.shape[1]), size):
+            cheapest = costs[:, columns].min(axis=1)
+            found = np.isfinite(cheapest)
+            best = min(best, (int((~found).sum()), cheapest[found].sum() + visit_cost * size))
+    return best
+
+
+def score(matrix: PriceMatrix, max_stores: int, visit_cost: float):
+    solution = solve_split(matrix, max_stores, visit_cost)
+    assignment = solution.assignment
+    rows = np.flatnonzero(assignment >= 0)
+    used = set(assignment[rows].tolist())
+
+    assert len(solution.columns) <= max_stores
+    assert used <= set(solution.columns)
+    # Itens sem oferta na cidade nunca são atribuídos
+    assert (assignment[~matrix.available.any(axis=1)] == -1).all()
+    # Cada item atribuído tem preço na loja escolhida
+    assert matrix.available[rows, assignment[rows]].all()
+
+    missing = int((matrix.available.any(axis=1) & (assignment < 0)).sum())
+    return missing, matrix.costs[rows, assignment[rows]].sum() + visit_cost * len(used), solution.method
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_exact_matches_brute_force(seed):
+    rng = np.random.default_rng(seed)
+    matrix = make_matrix(rng, int(rng.integers(1, 12)), int(rng.integers(1, 8)), float(rng.choice([0.0, 0.3, 0.7])))
+    max_stores = int(rng.integers(1, 4))
+    visit_cost = float(rng.choice([0.0, 3.0, 15.0]))
+
+    missing, total, method = score(matrix, max_stores, visit_cost)
+    expected_missing, expected_total = brute_force(matrix, max_stores, visit_cost)
+
+    assert method == "exact"
+    assert missing == expected_missing
+    assert total == pytest.approx(expected_total)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_heuristic_respects_limit_and_stays_close(seed, monkeypatch):
+    monkeypatch.setattr(basket, "EXACT_COMBINATION_LIMIT", 0)
+    rng = np.random.default_rng(1000 + seed)
+    matrix = make_matrix(rng, int(rng.integers(5, 20)), int(rng.integers(3, 9)), 0.2)
+    max_stores = int(rng.integers(1, 4))
+
+    missing, total, method = score(matrix, max_stores, 2.0)
+    expected_missing, expected_total = brute_force(matrix, max_stores, 2.0)
+
+    assert method == "heuristic"
+    assert missing == expected_missing
+    assert total <= expected_total * 1.05
+
+
+def test_store_limit_trades_price_for_fewer_stores():
+    # Cada loja é a mais barata em um item; com uma loja só, vence a de menor total
+    prices = np.array([
+        [1.0, 5.0, 5.0],
+        [5.0, 1.0, 5.0],
+        [5.0, 5.0, 1.0],
+    ])
+    matrix = PriceMatrix(("a", "b", "c"), ("m0", "m1", "m2"), np.ones(3), prices, {})
+
+    assert len(solve_split(matrix, 3).columns) == 3
+    single = solve_split(matrix, 1)
+    assert len(single.columns) == 1
+    assert (single.assignment == single.columns[0]).all()
+
+
+def test_visit_cost_can_use_fewer_stores_than_allowed():
+    prices = np.array([
+        [1.0, 2.0],
+        [2.0, 1.0],
+    ])
+    matrix = PriceMatrix(("a", "b"), ("m0", "m1"), np.ones(2), prices, {})
+
+    assert len(solve_split(matrix, 2, visit_cost=0.0).columns) == 2
+    assert len(solve_split(matrix, 2, visit_cost=5.0).columns) == 1
+
+
+def test_coverage_beats_price_and_unavailable_items_are_skipped():
+    nan = np.nan
+    prices = np.array([
+        [1.0, 9.0],   # mais barato em m0
+        [nan, 9.0],   # só m1 tem
+        [nan, nan],   # nenhuma loja tem
+    ])
+    matrix = PriceMatrix(("a", "b", "c"), ("m0", "m1"), np.ones(3), prices, {})
+
+    solution = solve_split(matrix, 1)
+    assert solution.columns == (1,)
+    assert solution.assignment.tolist() == [1, 1, -1]
+
+
+def test_no_item_available_anywhere():
+    prices = np.full((2, 3), np.nan)
+    matrix = PriceMatrix(("a", "b"), ("m0", "m1", "m2"), np.ones(2), prices, {})
+
+    solution = solve_split(matrix, 2)
+    assert solution.columns == ()
+    assert solution.assignment.tolist() == [-1, -1]
@@ -0,0 +1,125 @@
+from datetime import datetime, timezone
+import asyncio
+
+import pytest
+
+from services.scheduler import CronSchedule, Scheduler
+
+
+def utc(*args) -> datetime:
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+def next_run(expression: str, moment: datetime, tz: str = "UTC") -> datetime:
+    return CronSchedule(expression, tz=tz).next_after(moment)
+
+
+@pytest.mark.parametrize("expression, moment, expected", [
+    # */n
+    ("*/15 * * * *", utc(2026, 3, 2, 10, 7), utc(2026, 3, 2, 10, 15)),
+    ("*/15 * * * *", utc(2026, 3, 2, 10, 45), utc(2026, 3, 2, 11, 0)),
+    ("0 */6 * * *", utc(2026, 3, 2, 13, 0), utc(2026, 3, 2, 18, 0)),
+    # Intervalos e intervalos com passo
+    ("10-30/10 * * * *", utc(2026, 3, 2, 10, 21), utc(2026, 3, 2, 10, 30)),
+    ("10-30/10 * * * *", utc(2026, 3, 2, 10, 31), utc(2026, 3, 2, 11, 10)),
+    ("0 9-17 * * 1-5", utc(2026, 3, 6, 18, 0), utc(2026, 3, 9, 9, 0)),  # sexta à noite -> segunda
+    # Listas
+    ("0,30 * * * *", utc(2026, 3, 2, 10, 5), utc(2026, 3, 2, 10, 30)),
+    # Sempre estritamente depois do momento informado
+    ("*/15 * * * *", utc(2026, 3, 2, 10, 15), utc(2026, 3, 2, 10, 30)),
+    ("*/15 * * * *", utc(2026, 3, 2, 10, 14, 59, 999), utc(2026, 3, 2, 10, 15)),
+    # Virada de mês e de ano
+    ("0 0 31 * *", utc(2026, 3, 31, 0, 0), utc(2026, 5, 31, 0, 0)),
+    ("0 0 1 1 *", utc(2026, 3, 2, 0, 0), utc(2027, 1, 1, 0, 0)),
+])
+def test_next_after(expression, moment, expected):
+    assert next_run(expression, moment) == expected
+
+
+def test_day_of_month_or_day_of_week_when_both_restricted():
+    # Dia 10 OU sexta-feira (como no cron), não dia 10 E sexta-feira
+    assert next_run("0 0 10 * 5", utc(2026, 3, 1)) == utc(2026, 3, 6)    # sexta antes do dia 10
+    assert next_run("0 0 10 * 5", utc(2026, 3, 7)) == utc(2026, 3, 10)   # dia 10 (terça)
+    assert next_run("0 0 10 * 5", utc(2026, 3, 10)) == utc(2026, 3, 13)  # próxima sexta
+
+
+def test_only_one_day_field_restricted():
+    assert next_run("0 0 10 * *", utc(2026, 3, 1)) == utc(2026, 3, 10)
+    assert next_run("0 0 * * 5", utc(2026, 3, 7)) == utc(2026, 3, 13)
+    # Domingo é 0 no cron
+    assert next_run("0 0 * * 0", utc(2026, 3, 2)) == utc(2026, 3, 8)
+
+
+def test_evaluated_in_the_configured_timezone():
+    # 03:30 em São Paulo (UTC-3) = 06:30 UTC
+    assert next_run("30 3 * * *", utc(2026, 3, 2, 0, 0), tz="America/Sao_Paulo") == utc(2026, 3, 2, 6, 30)
+
+
+@pytest.mark.parametrize("expression", [
+    "* * * *",          # 4 campos
+    "60 * * * *",       # minuto fora do intervalo
+    "* 24 * * *",
+    "* * 0 * *",
+    "* * * 13 *",
+    "* * * * 7",
+    "30-10 * * * *",    # intervalo invertido
+])
+def test_invalid_expressions(expression):
+    with pytest.raises(ValueError):
+        CronSchedule(expression, tz="UTC")
+
+
+def test_expression_without_next_run():
+    with pytest.raises(ValueError):
+        next_run("0 0 31 2 *", utc(2026, 1, 1))
+
+
+@pytest.mark.parametrize("expression, moment, expected", [
+    # "a/n": de a até o fim do campo, de n em n
+    ("5/20 * * * *", utc(2026, 3, 2, 10, 6), utc(2026, 3, 2, 10, 25)),
+    ("5/20 * * * *", utc(2026, 3, 2, 10, 46), utc(2026, 3, 2, 11, 5)),
+    ("0 2/12 * * *", utc(2026, 3, 2, 3, 0), utc(2026, 3, 2, 14, 0)),
+])
+def test_start_with_step(expression, moment, expected):
+    assert next_run(expression, moment) == expected
+
+
+@pytest.mark.parametrize("expression", [
+    "*/0 * * * *",      # passo zero
+    "a * * * *",        # não numérico
+    "1,,2 * * * *",     # item vazio
+    "0 0 31 2 *",       # nunca casa: falha já na construção
+])
+def test_invalid_expressions_fail_at_construction(expression):
+    with pytest.raises(ValueError):
+        CronSchedule(expression, tz="UTC")
+
+
+class BrokenSchedule:
+    def __init__(self, fail_after: int):
+        self.calls = 0
+        self.fail_after = fail_after
+
+    def next_after(self, moment: datetime) -> datetime:
+        self.calls += 1
+        if self.calls > self.fail_after:
+            raise ValueError("sem próxima execução")
+        return moment
+
+
+async def _noop(db):
+    pass
+
+
+@pytest.mark.parametrize("run_on_start, fail_after", [(False, 0), (True, 0), (False, 1)])
+def test_loop_records_rescheduling_failures(run_on_start, fail_after):
+    scheduler = Scheduler()
+    job = scheduler.add_job("broken", _noop, BrokenSchedule(fail_after), lease=False, run_on_start=run_on_start)
+
+    # O loop termina (em vez de a task morrer em silêncio) e o erro aparece nas métricas
+    asyncio.run(asyncio.wait_for(scheduler._loop(job), timeout=5))
+
+    stats = job.stats()
+    assert stats["failures"] == 1
+    assert stats["last_error"] == "ValueError: sem próxima execução"
+    assert stats["next_run"] is None
@@ -0,0 +1,116 @@
+from datetime import datetime, timedelta, timezone
+import asyncio
+import json
+
+import pytest
+
+from models.offer import OfferIngest
+from services.offer_ingest import offer_id
+
+COLLECTED_AT = datetime.now(timezone.utc).replace(microsecond=0).isoformat()
+STALE_AT = (datetime.now(timezone.utc) - timedelta(days=30)).replace(microsecond=0).isoformat()
+
+
+def row(**overrides) -> dict:
+    return {"product_id": "p1", "supermarket_id": "s1", "price": 9.9, "collected_at": COLLECTED_AT, **overrides}
+
+
+@pytest.fixture
+def seeded(db):
+    async def seed():
+        await db.offers.create_index("id", unique=True)
+        await db.products.insert_many([{"id": "p1", "name": "Arroz"}, {"id": "p2", "name": "Feijão"}])
+        await db.supermarkets.insert_one({"id": "s1", "name": "Mercado", "city_id": "c1"})
+        await db.users.insert_many([
+            {"id": "partner", "email": "partner@example.com", "name": "Parceiro", "password_hash": "x", "role": "partner"},
+            {"id": "user", "email": "user@example.com", "name": "Usuário", "password_hash": "x", "role": "user"},
+        ])
+    asyncio.run(seed())
+    return db
+
+
+def ingest(client, auth_header, rows, user_id="partner", **claims):
+    return client.post("/api/offers/bulk", json=rows, headers=auth_header(user_id, **claims))
+
+
+def test_row_errors_are_reported_without_rejecting_the_batch(client, seeded, auth_header):
+    rows = [
+        row(),
+        row(product_id="p2", collected_at=None),
+        row(product_id="p2", price=-1),
+        row(product_id="missing"),
+        row(product_id="p2", supermarket_id="missing"),
+        "not an object",
+    ]
+    response = ingest(client, auth_header, rows)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["received"], body["inserted"], body["duplicates"], body["rejected"]) == (6, 1, 0, 5)
+    errors = {error["row"]: error["error"] for error in body["errors"]}
+    assert sorted(errors) == [1, 2, 3, 4, 5]
+    assert errors[1].startswith("collected_at")
+    assert errors[2].startswith("price")
+    assert errors[3] == "Unknown product_id missing"
+    assert errors[4] == "Unknown supermarket_id missing"
+    assert body["errors_truncated"] is False
+
+
+def test_invalid_body_is_a_400(client, seeded, auth_header):
+    response = client.post("/api/offers/bulk", content=b"{", headers=auth_header("partner"))
+    assert response.status_code == 400
+
+    response = ingest(client, auth_header, {"rows": []})
+    assert response.status_code == 400
+
+
+def test_resent_feed_is_deduplicated_by_deterministic_id(client, seeded, auth_header):
+    rows = [row(), row(product_id="p2", price=4.5)]
+
+    first = ingest(client, auth_header, rows + [row()]).json()
+    assert (first["inserted"], first["duplicates"]) == (2, 1)
+
+    # Reenvio (ex.: scraper reiniciado): nada é inserido de novo
+    second = ingest(client, auth_header, rows).json()
+    assert (second["inserted"], second["duplicates"], second["rejected"]) == (0, 2, 0)
+
+    stored = asyncio.run(seeded.offers.find({}, {"_id": 0, "id": 1}).to_list(None))
+    expected = {str(offer_id(OfferIngest.model_validate(raw))) for raw in rows}
+    assert {doc["id"] for doc in stored} == expected
+
+
+def test_ndjson_body_shares_ids_with_json(client, seeded, auth_header):
+    ingest(client, auth_header, [row()])
+
+    body = "\n".join(json.dumps(raw) for raw in [row(), row(product_id="p2")]) + "\n"
+    response = client.post(
+        "/api/offers/bulk",
+        content=body.encode(),
+        headers={**auth_header("partner"), "Content-Type": "application/x-ndjson"},
+    )
+    assert (response.json()["inserted"], response.json()["duplicates"]) == (1, 1)
+
+
+def test_ingest_updates_best_prices(client, seeded, auth_header):
+    ingest(client, auth_header, [row(price=9.9), row(price=7.5, collected_at=STALE_AT)])
+    ingest(client, auth_header, [row(product_id="p1", price=8.0, source="api")])
+
+    view = asyncio.run(seeded.best_prices.find_one({"scope": "city", "product_id": "p1", "city_id": "c1"}))
+    # A oferta de 30 dias atrás está fora da janela de ofertas atuais
+    assert (view["min"], view["count"]) == (8.0, 2)
+
+
+@pytest.mark.parametrize("user_id, claims, status", [
+    ("partner", {}, 200),
+    ("user", {}, 403),
+    # Claims embutidas não valem para a ingestão: o perfil salvo é que decide
+    ("user", {"role": "partner"}, 403),
+    ("partner", {"role": "user"}, 200),
+])
+def test_role_is_read_from_the_stored_user(client, seeded, auth_header, user_id, claims, status):
+    response = ingest(client, auth_header, [row()], user_id=user_id, **claims)
+    assert response.status_code == status
+
+
+def test_requires_authentication(client, seeded):
+    assert client.post("/api/offers/bulk", json=[row()]).status_code == 401
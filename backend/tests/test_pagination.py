@@ -0,0 +1,117 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import Response
+
+from services.pagination import (
+    NEXT_CURSOR_HEADER, after_cursor, cursor_for, decode_cursor, encode_cursor, paginate_sorted, set_next_cursor
+)
+
+SORT = [("price", 1), ("id", 1)]
+T0 = datetime(2026, 3, 2, 12, 0, tzinfo=timezone.utc)
+
+
+def matches(doc: dict, query: dict) -> bool:
+    """Avalia o subconjunto de filtros gerado por after_cursor ($and, $or, igualdade, $gt, $lt)"""
+    for key, condition in query.items():
+        if key == "$and":
+            if not all(matches(doc, clause) for clause in condition):
+                return False
+        elif key == "$or":
+            if not any(matches(doc, clause) for clause in condition):
+                return False
+        elif isinstance(condition, dict):
+            for operator, value in condition.items():
+                if operator == "$gt" and not doc[key] > value:
+                    return False
+                if operator == "$lt" and not doc[key] < value:
+                    return False
+        elif doc[key] != condition:
+            return False
+    return True
+
+
+def find_page(docs, query, sort, limit, cursor=None):
+    """Equivalente em memória de services.pagination.find_page"""
+    selected = [doc for doc in docs if matches(doc, after_cursor(query, sort, cursor))]
+    for field, direction in reversed(sort):
+        selected.sort(key=lambda doc: doc[field], reverse=direction == -1)
+    if len(selected) <= limit:
+        return selected, None
+    return selected[:limit], cursor_for(selected[limit - 1], sort)
+
+
+def all_pages(fetch, limit):
+    items, cursor, pages = [], None, 0
+    while True:
+        page, cursor = fetch(limit, cursor)
+        items.extend(page)
+        pages += 1
+        if cursor is None:
+            return items, pages
+
+
+# Muitos empates na chave de ordenação: só o id desempata
+DOCS = [{"id": f"offer-{i:02d}", "price": [1.99, 2.49, 2.49, 2.49, 3.0][i % 5], "collected_at": T0 - timedelta(hours=i)}
+        for i in range(23)]
+
+
+def test_cursor_round_trip_preserves_types():
+    values = [2.49, "offer-07", T0, None]
+    cursor = encode_cursor(values)
+    assert "=" not in cursor
+    decoded = decode_cursor(cursor, [("a", 1), ("b", 1), ("c", 1), ("d", 1)])
+    assert decoded == values
+    assert decoded[2].tzinfo is not None
+
+
+@pytest.mark.parametrize("cursor", ["not-base64!", encode_cursor([1]), encode_cursor({"price": 1}), "e30"])
+def test_invalid_cursor(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor, SORT)
+
+
+@pytest.mark.parametrize("limit", [1, 2, 3, 5, 22, 23, 50])
+def test_keyset_pages_cover_every_document_once_with_ties(limit):
+    items, pages = all_pages(lambda size, cursor: find_page(DOCS, {}, SORT, size, cursor), limit)
+    expected = sorted(DOCS, key=lambda doc: (doc["price"], doc["id"]))
+    assert [doc["id"] for doc in items] == [doc["id"] for doc in expected]
+    assert pages == max(1, -(-len(DOCS) // limit))
+
+
+def test_keyset_descending_with_filter():
+    sort = [("collected_at", -1), ("id", -1)]
+    query = {"price": 2.49}
+    items, _ = all_pages(lambda size, cursor: find_page(DOCS, query, sort, size, cursor), 2)
+    expected = sorted((doc for doc in DOCS if doc["price"] == 2.49), key=lambda doc: (doc["collected_at"], doc["id"]), reverse=True)
+    assert [doc["id"] for doc in items] == [doc["id"] for doc in expected]
+
+
+def test_after_cursor_without_cursor_keeps_query():
+    assert after_cursor({"product_id": "p"}, SORT, None) == {"product_id": "p"}
+
+
+@pytest.mark.parametrize("limit", [1, 4, 10, 23])
+def test_paginate_sorted_with_ties(limit):
+    docs = sorted(DOCS, key=lambda doc: (doc["price"], doc["id"]))
+    items, pages = all_pages(lambda size, cursor: paginate_sorted(docs, SORT, size, cursor), limit)
+    assert [doc["id"] for doc in items] == [doc["id"] for doc in docs]
+    assert pages == max(1, -(-len(DOCS) // limit))
+
+
+def test_last_page_has_no_next_cursor():
+    docs = sorted(DOCS, key=lambda doc: (doc["price"], doc["id"]))
+    first = paginate_sorted(docs, SORT, 20)
+    last = paginate_sorted(docs, SORT, 20, first.next_cursor)
+    assert first.next_cursor is not None
+    assert len(last.items) == 3
+    assert last.next_cursor is None
+
+    # Página exatamente do tamanho do restante também é a última
+    assert paginate_sorted(docs, SORT, 23).next_cursor is None
+
+    response = Response()
+    set_next_cursor(response, last.next_cursor)
+    assert NEXT_CURSOR_HEADER not in response.headers
+    set_next_cursor(response, first.next_cursor)
+    assert response.headers[NEXT_CURSOR_HEADER] == first.next_cursor
@@ -0,0 +1,103 @@
+from datetime import datetime, timezone
+import asyncio
+
+import pytest
+
+from services.response_cache import make_etag, etag_matches
+
+PRODUCT = {
+    "id": "p1", "canonical_name": "arroz tipo 1 5000g", "display_name": "Arroz Tipo 1 5kg",
+    "category": "Mercearia", "subcategory": None, "brand": "Marca", "size": "5kg", "unit": "kg",
+    "ean": None, "image_url": None, "synonyms": [],
+}
+
+
+@pytest.fixture
+def seeded(db):
+    async def seed():
+        await db.cities.insert_many([
+            {"id": "c1", "name": "Campinas", "state": "São Paulo", "state_code": "SP",
+             "location": {"type": "Point", "coordinates": [-47.06, -22.9]}, "active": True},
+        ])
+        await db.products.insert_one(dict(PRODUCT))
+        await db.supermarkets.insert_one({"id": "s1", "name": "Mercado", "city_id": "c1"})
+        await db.offers.insert_one({
+            "id": "o1", "product_id": "p1", "supermarket_id": "s1", "price": 25.0,
+            "collected_at": datetime.now(timezone.utc), "is_promotion": False,
+        })
+        await db.users.insert_one(
+            {"id": "u1", "email": "u1@example.com", "name": "Usuário", "password_hash": "x", "role": "user"}
+        )
+    asyncio.run(seed())
+    return db
+
+
+def test_second_request_is_served_from_cache_with_the_same_etag(client, seeded):
+    first = client.get("/api/cities")
+    second = client.get("/api/cities")
+
+    assert first.status_code == second.status_code == 200
+    assert (first.headers["x-cache"], second.headers["x-cache"]) == ("MISS", "HIT")
+    assert first.headers["etag"] == second.headers["etag"] == make_etag(first.content)
+    assert first.headers["cache-control"] == "no-cache"
+    assert second.json() == first.json()
+
+
+def test_if_none_match_returns_304_without_body(client, seeded):
+    etag = client.get("/api/cities").headers["etag"]
+
+    response = client.get("/api/cities", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+
+    # ETag diferente: resposta completa
+    response = client.get("/api/cities", headers={"If-None-Match": '"stale"'})
+    assert response.status_code == 200
+    assert response.content
+
+
+def test_query_parameter_order_shares_the_entry(client, seeded):
+    client.get("/api/cities?search=camp&limit=5")
+    assert client.get("/api/cities?limit=5&search=camp").headers["x-cache"] == "HIT"
+
+
+def test_errors_and_uncached_routes_are_not_stored(client, seeded):
+    assert client.get("/api/products/missing").status_code == 404
+    response = client.get("/api/products/missing")
+    assert response.status_code == 404
+    assert "x-cache" not in response.headers
+
+    assert "etag" not in client.get("/api/cities/c1").headers
+
+
+def test_create_offer_invalidates_cached_search(client, seeded, auth_header):
+    search = "/api/products/search?q=arroz&city_id=c1"
+    before = client.get(search)
+    assert before.json()[0]["best_offer"]["price"] == 25.0
+    assert client.get(search, headers={"If-None-Match": before.headers["etag"]}).status_code == 304
+
+    response = client.post(
+        "/api/offers",
+        json={"product_id": "p1", "supermarket_id": "s1", "price": 21.9},
+        headers=auth_header("u1"),
+    )
+    assert response.status_code == 200
+
+    # A busca traz a melhor oferta: a entrada antiga não pode mais ser servida nem validada
+    after = client.get(search, headers={"If-None-Match": before.headers["etag"]})
+    assert after.status_code == 200
+    assert after.headers["x-cache"] == "MISS"
+    assert after.headers["etag"] != before.headers["etag"]
+    assert after.json()[0]["best_offer"]["price"] == 21.9
+
+
+@pytest.mark.parametrize("header, expected", [
+    (None, False),
+    ('"a"', True),
+    ('"b", "a"', True),
+    ("*", True),
+    ('"b"', False),
+])
+def test_etag_matches(header, expected):
+    assert etag_matches(header, '"a"') is expected
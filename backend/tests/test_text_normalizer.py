@@ -0,0 +1,50 @@
+import pytest
+
+from services.search_service import TextNormalizer, normalize_text, text_normalizer
+
+
+@pytest.mark.parametrize("text, expected", [
+    # Sinônimos: só palavras inteiras, e o termo já expandido não muda
+    ("coca", "coca-cola"),
+    ("coca-cola", "coca-cola"),
+    ("Refrigerante COCA", "refrigerante coca-cola"),
+    ("refri", "refrigerante"),
+    ("cocada", "cocada"),
+    # Unidades: inteiros viram ml/g; decimais ficam como estão
+    ("5kg", "5000g"),
+    ("5 kg", "5000g"),
+    ("1l", "1000ml"),
+    ("2 litros", "2000ml"),
+    ("1,5l", "1,5l"),
+    ("1.5l", "1.5l"),
+    ("0,5kg", "0,5kg"),
+    ("500g", "500g"),
+    ("1000ml", "1000ml"),
+    # Acentos e stopwords
+    ("Açúcar", "acucar"),
+    ("Pão de Queijo", "pao queijo"),
+    ("  Leite   Integral  ", "leite integral"),
+])
+def test_normalize_text(text, expected):
+    assert normalize_text(text) == expected
+
+
+def test_normalize_many_matches_single_calls_without_touching_cache():
+    texts = ["Coca 2L", "Arroz 5kg", "Feijão de corda"]
+    before = text_normalizer.cache_info()
+    assert text_normalizer.normalize_many(texts) == [text_normalizer._normalize(t) for t in texts]
+    assert text_normalizer.cache_info().currsize == before.currsize
+
+
+def test_repeated_queries_hit_the_cache():
+    normalizer = TextNormalizer([], {"refri": "refrigerante"})
+    normalizer("refri lata")
+    normalizer("refri lata")
+    info = normalizer.cache_info()
+    assert (info.hits, info.misses) == (1, 1)
+
+
+def test_longest_synonym_wins_and_empty_synonyms_are_allowed():
+    normalizer = TextNormalizer([], {"coca": "coca-cola", "coca zero": "coca-cola zero"})
+    assert normalizer("coca zero") == "coca-cola zero"
+    assert TextNormalizer(["de"], {})("Doce de Leite") == "doce leite"